@@ -1,142 +1,64 @@
-import argparse, json, os
+import argparse, os, sys
 
-# Optional heavy deps: try to import and fall back gracefully with helpful messages.
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    HAS_REPORTLAB = True
-except Exception:
-    HAS_REPORTLAB = False
+# shared analysis helpers live in scripts/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from run_model import RunModel
+import results_store
+import teastore_perf
 
-# optional pandas for JMeter CSV parsing
-try:
-    import pandas as pd
-    HAS_PANDAS = True
-except Exception:
-    pd = None
-    HAS_PANDAS = False
+# Locust CSVs of the default scenario (locust --csv=locust-teastore/locust), used
+# when the report given in --locust is missing
+LEGACY_LOCUST_CSV = os.path.join('locust-teastore', 'locust')
 
 parser = argparse.ArgumentParser(description="Gerar dashboard consolidado")
 parser.add_argument("--k6", required=True, help="Arquivo JSON do K6")
 parser.add_argument("--jmeter", required=True, help="Arquivo .jtl do JMeter")
 parser.add_argument("--locust", required=True, help="Relatório HTML do Locust")
+parser.add_argument("--generator-summary",
+                    help="Saturação do gerador do Locust (padrão: <prefixo do --locust>_generator_summary.json)")
+parser.add_argument("--k6-raw", help="Saída bruta do k6 (k6 run --out json=...) para séries e grupos")
 parser.add_argument("--out", default="dashboard.html", help="Saída HTML")
 parser.add_argument("--pdf", default="relatorio.pdf", help="Saída PDF")
+parser.add_argument("--stream", action="store_true",
+                    help="Resumo do JMeter pelos histogramas (memória constante) em vez de percentis exatos")
+parser.add_argument("--workers", type=int, default=0,
+                    help="Processos de parsing (0 = um por núcleo)")
+parser.add_argument("--history-db", help="Banco SQLite do histórico (scripts/results_store.py) para gravar esta execução")
+parser.add_argument("--scenario", default=os.getenv("SCENARIO", "unknown"), help="Cenário gravado no histórico")
+parser.add_argument("--run-id", default=results_store.default_run_id(), help="Identificador da execução no histórico")
 args = parser.parse_args()
 
-k6_data = {}
-if os.path.exists(args.k6):
-    with open(args.k6) as f:
-        try:
-            k6_data = json.load(f)
-        except Exception:
-            k6_data = {}
+locust = args.locust
+if not os.path.exists(locust) and os.path.exists(f'{LEGACY_LOCUST_CSV}_stats.csv'):
+    locust = LEGACY_LOCUST_CSV
 
-# JMeter summary (supports CSV produced by CI)
-jmeter_summary = {}
-if os.path.exists(args.jmeter) and pd is not None:
-    try:
-        df = pd.read_csv(args.jmeter)
-        # normalize column names
-        cols = [c.lower() for c in df.columns]
-        df.columns = cols
-        # basic metrics
-        total = len(df)
-        elapsed_col = 'elapsed' if 'elapsed' in df.columns else df.columns[0]
-        avg_latency = float(df[elapsed_col].mean()) if total > 0 else None
-        p50 = float(df[elapsed_col].quantile(0.5)) if total > 0 else None
-        p95 = float(df[elapsed_col].quantile(0.95)) if total > 0 else None
-        p99 = float(df[elapsed_col].quantile(0.99)) if total > 0 else None
-        # success column
-        success = None
-        if 'success' in df.columns:
-            success = df['success'].astype(str).map(lambda s: s.lower() in ('true','1','t','y'))
-        error_rate = (1.0 - float(success.mean())) if success is not None and total>0 else None
-        # throughput (req/s)
-        throughput = None
-        if 'timestamp' in df.columns:
-            try:
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                df.set_index('timestamp', inplace=True)
-                throughput = float(df.resample('1s').size().mean())
-            except Exception:
-                throughput = None
+# every input is parsed once and shared by the JSON summary, the history and the dashboard
+model = RunModel(args.jmeter, args.k6, args.k6_raw, locust, args.workers or None, exact=not args.stream,
+                 generator_json=args.generator_summary)
 
-        jmeter_summary = {
-            'tool': 'jmeter',
-            'requests': total,
-            'avg_latency_ms': avg_latency,
-            'p50_ms': p50,
-            'p95_ms': p95,
-            'p99_ms': p99,
-            'error_rate': error_rate,
-            'throughput_rps': throughput,
-        }
-    except Exception:
-        jmeter_summary = {}
-else:
-    # cannot parse without pandas or file missing
-    jmeter_summary = {}
+# unified summary JSON for downstream analysis (scripts/compare_runs.py, slo.py)
+teastore_perf.write_unified(model, 'summary-unified.json')
 
-# Locust: try parse locust CSV stats if present (locust --csv=locust-teastore/locust)
-locust_summary = {}
-locust_csv = os.path.join('locust-teastore', 'locust_stats.csv')
-if os.path.exists(locust_csv) and pd is not None:
+# Historical store: append this run, then read back the recent trend
+history = None
+if args.history_db:
     try:
-        ldf = pd.read_csv(locust_csv)
-        # locust stats has a summary row 'Total' often; try to find it
-        if 'Name' in ldf.columns:
-            total_row = ldf[ldf['Name'].str.lower() == 'total']
-            if not total_row.empty:
-                total_row = total_row.iloc[0]
-                locust_summary = {
-                    'requests': int(total_row.get('Request Count', total_row.get('Requests', 0))),
-                    'avg_latency_ms': float(total_row.get('Average Response Time', 0) or 0),
-                    'min_ms': float(total_row.get('Min Response Time', 0) or 0),
-                    'max_ms': float(total_row.get('Max Response Time', 0) or 0),
-                    'error_rate': float(total_row.get('Failure Count', 0) or 0) / max(1, int(total_row.get('Request Count', total_row.get('Requests', 1) or 1)))
-                }
-    except Exception:
-        locust_summary = {}
-
-# merge into unified
-unified = { 'k6': k6_data.get('metrics', {}), 'jmeter': jmeter_summary, 'locust': locust_summary }
-with open('summary-unified.json', 'w') as uf:
-    json.dump(unified, uf, indent=2)
-
-html = f"""
-<html>
-<head><title>Dashboard Consolidado — TeaStore</title></head>
-<body>
-<h1>Dashboard Consolidado — TeaStore</h1>
-<h2>Resumo K6</h2>
-<pre>{json.dumps(k6_data.get("metrics", {}), indent=2)}</pre>
-
-<h2>Resumo JMeter (unificado)</h2>
-<pre>{json.dumps(jmeter_summary, indent=2)}</pre>
-
-<h2>Resumo Unificado</h2>
-<pre>{json.dumps({ 'k6_metrics': k6_data.get('metrics', {}), 'jmeter': jmeter_summary }, indent=2)}</pre>
-
-<h2>Relatórios</h2>
-<ul>
-<li><a href="{args.jmeter}">JMeter Report</a></li>
-<li><a href="{args.locust}">Locust Report</a></li>
-</ul>
-</body>
-</html>
-"""
-
-with open(args.out, "w") as f:
-    f.write(html)
+        history = teastore_perf.record_history(model, args.history_db, args.scenario, args.run_id)
+    except Exception as e:
+        print("⚠️  Falha ao gravar o histórico:", e)
 
-# write unified summary JSON for downstream analysis
-unified = { 'k6': k6_data.get('metrics', {}), 'jmeter': jmeter_summary }
-with open('summary-unified.json', 'w') as uf:
-    json.dump(unified, uf, indent=2)
+teastore_perf.write_dashboard(model, args.out, history, args.scenario,
+                              [('JMeter Report', args.jmeter), ('Locust Report', args.locust)])
 
 # --- Gera PDF (opcional) ---
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    HAS_REPORTLAB = True
+except Exception:
+    HAS_REPORTLAB = False
+
 if not HAS_REPORTLAB:
     print("⚠️  reportlab não está instalado. Pulei a geração de PDF. Instale as dependências: pip install -r requirements.txt")
 else:
@@ -3,9 +3,13 @@ import { check, group, sleep } from 'k6';
 
 const BASE_URL = `${__ENV.HOST || 'http://localhost'}:${__ENV.PORT || '8080'}/tools.descartes.teastore.webui`;
 
+// per-endpoint SLOs (slo.json) as thresholds with abortOnFail: python3 scripts/slo.py k6 slo.json --out k6-teastore/thresholds.json
+const THRESHOLDS = __ENV.K6_THRESHOLDS ? JSON.parse(open(__ENV.K6_THRESHOLDS)) : {};
+
 export const options = {
   vus: 10,
   duration: '30s',
+  thresholds: THRESHOLDS,
 };
 
 export default function () {
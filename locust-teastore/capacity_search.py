@@ -0,0 +1,210 @@
+"""Busca automática de capacidade (knee point) numa única execução do Locust.
+
+Substitui as três execuções fixas (cenario-100/500/1000-vus) por uma forma
+de carga adaptativa: a carga sobe em degraus geométricos até o primeiro
+degrau que viola o SLO e depois faz bisseção entre o último degrau
+sustentável e o primeiro que falhou, até a resolução pedida. Cada degrau
+espera o spawn terminar, descarta um aquecimento e só então mede uma
+janela em regime; p95 e taxa de erro são calculados só sobre a janela
+(diferença dos histogramas acumulados do Locust), por endpoint, com o
+mesmo avaliador de scripts/slo.py e o mesmo slo.json. Sem slo.json vale o
+limite de LOCUST_SEARCH_P95_MS / LOCUST_SEARCH_ERROR_RATE no agregado.
+
+Uso (modo headless; o run-time do Locust deve ser folgado ou omitido):
+  locust --config locust-teastore/capacity-search.conf
+
+Variáveis (além das de teastore_scenario.py):
+  LOCUST_SEARCH_START       usuários do primeiro degrau (padrão 10)
+  LOCUST_SEARCH_GROWTH      fator entre degraus na subida (padrão 2)
+  LOCUST_SEARCH_MAX_USERS   teto da busca (padrão 2000)
+  LOCUST_SEARCH_RESOLUTION  para quando o intervalo for menor que esta fração (padrão 0.05)
+  LOCUST_SEARCH_SPAWN_RATE  usuários/s ao mudar de degrau (padrão 20)
+  LOCUST_SEARCH_WARMUP      segundos descartados após o spawn (padrão 20)
+  LOCUST_SEARCH_WINDOW      segundos medidos por degrau (padrão 30)
+  LOCUST_SEARCH_MIN_REQUESTS  requisições mínimas na janela; a janela é
+                            estendida até 3x antes de o degrau ser reprovado (padrão 50)
+  LOCUST_SEARCH_OUT         JSON com a curva e o knee point (padrão locust-teastore/capacity.json)
+
+Durante a busca o slo_guard não interrompe o teste: violar o SLO é o que
+delimita a capacidade.
+"""
+import json
+import logging
+import os
+import sys
+
+from locust import LoadTestShape
+from locust.stats import calculate_response_time_percentile
+
+from teastore_scenario import TeaStoreUser  # noqa: F401  (usuário exercitado pela busca)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+from slo import AGGREGATED, SloEvaluator, load_slo  # noqa: E402
+
+SLO_FILE = os.getenv("LOCUST_SLO_FILE", os.path.join(ROOT, "slo.json"))
+START = int(os.getenv("LOCUST_SEARCH_START", "10"))
+GROWTH = float(os.getenv("LOCUST_SEARCH_GROWTH", "2"))
+MAX_USERS = int(os.getenv("LOCUST_SEARCH_MAX_USERS", "2000"))
+RESOLUTION = float(os.getenv("LOCUST_SEARCH_RESOLUTION", "0.05"))
+SPAWN_RATE = float(os.getenv("LOCUST_SEARCH_SPAWN_RATE", "20"))
+WARMUP = float(os.getenv("LOCUST_SEARCH_WARMUP", "20"))
+WINDOW = float(os.getenv("LOCUST_SEARCH_WINDOW", "30"))
+MIN_REQUESTS = int(os.getenv("LOCUST_SEARCH_MIN_REQUESTS", "50"))
+OUT = os.getenv("LOCUST_SEARCH_OUT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "capacity.json"))
+
+FALLBACK_SLO = {"endpoints": {AGGREGATED: {
+    "p95_ms": float(os.getenv("LOCUST_SEARCH_P95_MS", "2000")),
+    "error_rate": float(os.getenv("LOCUST_SEARCH_ERROR_RATE", "0.01")),
+    "min_samples": 0}}}
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot(stats):
+    """Cumulative counters per request name (methods merged) and for the total."""
+    out = {}
+    for entry in stats.entries.values():
+        requests, failures, times = out.get(entry.name, (0, 0, {}))
+        times = dict(times)
+        for ms, n in entry.response_times.items():
+            times[ms] = times.get(ms, 0) + n
+        out[entry.name] = (requests + entry.num_requests, failures + entry.num_failures, times)
+    total = stats.total
+    out[AGGREGATED] = (total.num_requests, total.num_failures, dict(total.response_times))
+    return out
+
+
+def window_stats(before, after):
+    """{name: (requests, failures, p95_ms, p50_ms)} of what happened between two snapshots."""
+    out = {}
+    for name, (requests, failures, times) in after.items():
+        req0, fail0, times0 = before.get(name, (0, 0, {}))
+        delta = {ms: n - times0.get(ms, 0) for ms, n in times.items() if n > times0.get(ms, 0)}
+        count = sum(delta.values())
+        p95 = calculate_response_time_percentile(delta, count, 0.95) if count else None
+        p50 = calculate_response_time_percentile(delta, count, 0.5) if count else None
+        out[name] = (requests - req0, failures - fail0, p95, p50)
+    return out
+
+
+class CapacitySearch(LoadTestShape):
+    """Degraus geométricos até a primeira violação, depois bisseção."""
+
+    # slo_guard leaves the run alone: breaching the SLO is how the search works
+    judges_slo = True
+
+    def __init__(self):
+        super().__init__()
+        slo = load_slo(SLO_FILE) if os.path.exists(SLO_FILE) else FALLBACK_SLO
+        self.evaluator = SloEvaluator(slo, "locust")
+        self.level = START
+        self.good = None  # highest level that met the SLO
+        self.bad = None  # lowest level that breached it
+        self.steps = []
+        self._reset_step()
+
+    def _reset_step(self):
+        self.step_start = None
+        self.measure_start = None
+        self.before = None
+
+    def tick(self):
+        now = self.get_run_time()
+        if self.step_start is None:
+            self.step_start = now
+            logger.info("Busca de capacidade: degrau de %d usuários", self.level)
+            return self.level, SPAWN_RATE
+        if self.measure_start is None:
+            # measure only once the spawn is complete and the warm-up is over
+            if self.get_current_user_count() != self.level:
+                self.step_start = now
+            elif now - self.step_start >= WARMUP:
+                self.measure_start = now
+                self.before = snapshot(self.runner.stats)
+            return self.level, SPAWN_RATE
+        elapsed = now - self.measure_start
+        if elapsed < WINDOW:
+            return self.level, SPAWN_RATE
+        stats = window_stats(self.before, snapshot(self.runner.stats))
+        requests = stats.get(AGGREGATED, (0,))[0]
+        if requests < MIN_REQUESTS and elapsed < 3 * WINDOW:
+            return self.level, SPAWN_RATE
+        self._judge(stats, elapsed)
+        self._reset_step()
+        nxt = self._next_level()
+        if nxt is None:
+            self._finish()
+            return None
+        self.level = nxt
+        return self.tick()
+
+    def _judge(self, stats, elapsed):
+        requests, failures, p95, p50 = stats.get(AGGREGATED, (0, 0, None, None))
+        breaches = self.evaluator.evaluate({name: s[:3] for name, s in stats.items()})
+        if requests < MIN_REQUESTS:
+            breaches.append(f"apenas {requests} requisições em {elapsed:.0f}s (gerador ou sistema travado)")
+        ok = not breaches
+        self.steps.append({
+            "users": self.level, "ok": ok, "requests": requests, "rps": requests / elapsed,
+            "error_rate": failures / requests if requests else None, "p50_ms": p50, "p95_ms": p95,
+            "window_s": round(elapsed, 1), "breaches": breaches,
+        })
+        if ok:
+            self.good = max(self.good or 0, self.level)
+        else:
+            self.bad = self.level if self.bad is None else min(self.bad, self.level)
+        logger.info("Degrau %d usuários: %s (%.1f req/s, p95 %s ms)%s", self.level,
+                    "OK" if ok else "VIOLOU", requests / elapsed, p95,
+                    "" if ok else " — " + "; ".join(breaches))
+        self._write()
+
+    def _next_level(self):
+        if self.bad is None:
+            if self.level >= MAX_USERS:
+                return None
+            return min(MAX_USERS, max(self.level + 1, int(round(self.level * GROWTH))))
+        lo = self.good or 0
+        if self.bad - lo <= max(1, RESOLUTION * max(lo, 1)):
+            return None
+        return (lo + self.bad) // 2 if lo else max(1, self.bad // 2)
+
+    def result(self):
+        passing = [s for s in self.steps if s["ok"]]
+        knee = max(passing, key=lambda s: s["users"]) if passing else None
+        peak = max(self.steps, key=lambda s: s["rps"], default=None)
+        return {
+            "knee": knee,
+            "first_breach_users": self.bad,
+            "max_users_reached": self.bad is None and self.level >= MAX_USERS,
+            # past this point more users only add queueing, not throughput
+            "peak_rps": peak and peak["rps"],
+            "peak_rps_users": peak and peak["users"],
+            "curve": sorted(self.steps, key=lambda s: s["users"]),
+            "steps": self.steps,
+        }
+
+    def _write(self):
+        tmp = f"{OUT}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.result(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp, OUT)
+
+    def _finish(self):
+        result = self.result()
+        print("\n=== Curva de capacidade (janela em regime por degrau) ===")
+        print(f"{'usuários':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'erros':>7}  SLO")
+        for s in result["curve"]:
+            err = "-" if s["error_rate"] is None else f"{s['error_rate']:.1%}"
+            print(f"{s['users']:>9} {s['rps']:>9.1f} {s['p50_ms'] or '-':>8} {s['p95_ms'] or '-':>8} "
+                  f"{err:>7}  {'✅' if s['ok'] else '❌'}")
+        knee = result["knee"]
+        if knee is None:
+            print(f"❌ Nem o primeiro degrau ({START} usuários) atendeu o SLO.")
+        else:
+            note = " (teto da busca atingido sem violação)" if result["max_users_reached"] else ""
+            print(f"✅ Knee point: {knee['users']} usuários, {knee['rps']:.1f} req/s, "
+                  f"p95 {knee['p95_ms']} ms{note}")
+        if result["peak_rps"] is not None:
+            print(f"Throughput máximo: {result['peak_rps']:.1f} req/s com {result['peak_rps_users']} usuários")
+        print(f"Curva gravada em {OUT}")
@@ -0,0 +1,195 @@
+"""Instrumentação do gerador de carga: detecta quando o Locust, e não o TeaStore, é o gargalo.
+
+Importar este módulo no locustfile registra os listeners (teastore_scenario.py
+já importa). A cada segundo, em cada processo Locust, são amostrados:
+
+  - CPU do processo gerador (psutil; 100% = um núcleo, limite do GIL)
+  - atraso do event loop do gevent (quanto o sleep de 1 s atrasou)
+  - requisições em voo, pela lei de Little: soma das latências da janela / duração da janela
+
+Com --csv, as amostras vão para <prefixo>_generator_history.csv, ao lado de
+<prefixo>_stats_history.csv (workers enviam as suas ao master no loop de
+report). Ao final, <prefixo>_generator_summary.json marca a execução como
+saturada quando algum nó passou de LOCUST_SATURATION_SHARE das amostras
+acima de LOCUST_SATURATION_CPU (%) ou LOCUST_SATURATION_LAG_MS (ms);
+generate_dashboard.py exibe esse alerta.
+"""
+import csv
+import json
+import logging
+import os
+import time
+
+import gevent
+from locust import events
+from locust.runners import WorkerRunner
+
+try:
+    import psutil
+except Exception:
+    psutil = None
+
+CPU_LIMIT = float(os.getenv("LOCUST_SATURATION_CPU", "90"))
+LAG_LIMIT_MS = float(os.getenv("LOCUST_SATURATION_LAG_MS", "100"))
+SATURATION_SHARE = float(os.getenv("LOCUST_SATURATION_SHARE", "0.1"))
+SAMPLE_INTERVAL = 1.0
+
+FIELDS = ["Timestamp", "Node", "User Count", "CPU %", "Loop Lag ms", "In-flight", "Requests", "Saturated"]
+
+logger = logging.getLogger(__name__)
+
+
+class NodeStats:
+    __slots__ = ("samples", "saturated", "max_cpu", "max_lag_ms", "max_inflight")
+
+    def __init__(self):
+        self.samples = 0
+        self.saturated = 0
+        self.max_cpu = 0.0
+        self.max_lag_ms = 0.0
+        self.max_inflight = 0.0
+
+    def add(self, sample):
+        self.samples += 1
+        self.saturated += int(sample["Saturated"])
+        self.max_cpu = max(self.max_cpu, sample["CPU %"] or 0.0)
+        self.max_lag_ms = max(self.max_lag_ms, sample["Loop Lag ms"])
+        self.max_inflight = max(self.max_inflight, sample["In-flight"])
+
+
+class GeneratorMonitor:
+    def __init__(self, environment):
+        self.environment = environment
+        self.process = psutil.Process() if psutil else None
+        self.latency_ms = 0.0
+        self.requests = 0
+        self.pending = []
+        self.nodes = {}
+        self.greenlet = None
+        self.file = None
+        self.writer = None
+        prefix = getattr(environment.parsed_options, "csv_prefix", None)
+        self.prefix = prefix or None
+        self.is_worker = isinstance(environment.runner, WorkerRunner)
+
+    @property
+    def node(self):
+        runner = self.environment.runner
+        if self.is_worker:
+            return runner.client_id
+        return "master" if type(runner).__name__ == "MasterRunner" else "local"
+
+    # --- event listeners -------------------------------------------------
+    def on_request(self, response_time=None, **kwargs):
+        self.latency_ms += response_time or 0.0
+        self.requests += 1
+
+    def on_test_start(self, **kwargs):
+        if self.greenlet is None:
+            self.greenlet = gevent.spawn(self._sample_loop)
+
+    def on_test_stop(self, **kwargs):
+        if self.greenlet is not None:
+            self.greenlet.kill(block=False)
+            self.greenlet = None
+
+    def on_report_to_master(self, client_id, data):
+        data["generator"] = self.pending
+        self.pending = []
+
+    def on_worker_report(self, client_id, data):
+        for sample in data.get("generator", []):
+            sample["Node"] = client_id
+            self._record(sample)
+
+    def on_quitting(self, **kwargs):
+        self.on_test_stop()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.is_worker:
+            return
+        summary = self.summary()
+        if summary["saturated"]:
+            logger.warning("Gerador de carga saturado (%s): latências infladas pelo cliente.",
+                           ", ".join(summary["saturated_nodes"]))
+        if self.prefix:
+            with open(f"{self.prefix}_generator_summary.json", "w") as f:
+                json.dump(summary, f, indent=2)
+
+    # --- sampling --------------------------------------------------------
+    def _sample_loop(self):
+        if self.process:
+            self.process.cpu_percent(None)
+        last = time.monotonic()
+        while True:
+            gevent.sleep(SAMPLE_INTERVAL)
+            now = time.monotonic()
+            window = now - last
+            last = now
+            lag_ms = max(0.0, (window - SAMPLE_INTERVAL) * 1000)
+            cpu = self.process.cpu_percent(None) if self.process else None
+            inflight = self.latency_ms / 1000.0 / window
+            sample = {
+                "Timestamp": int(time.time()),
+                "Node": self.node,
+                "User Count": self.environment.runner.user_count,
+                "CPU %": cpu,
+                "Loop Lag ms": round(lag_ms, 1),
+                "In-flight": round(inflight, 2),
+                "Requests": self.requests,
+                "Saturated": (cpu is not None and cpu >= CPU_LIMIT) or lag_ms >= LAG_LIMIT_MS,
+            }
+            self.latency_ms = 0.0
+            self.requests = 0
+            if self.is_worker:
+                self.pending.append(sample)
+            else:
+                self._record(sample)
+
+    def _record(self, sample):
+        self.nodes.setdefault(sample["Node"], NodeStats()).add(sample)
+        if not self.prefix:
+            return
+        if self.writer is None:
+            self.file = open(f"{self.prefix}_generator_history.csv", "w", newline="")
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            self.writer.writeheader()
+        self.writer.writerow(sample)
+        self.file.flush()
+
+    def summary(self):
+        nodes = {}
+        saturated_nodes = []
+        for node, stats in self.nodes.items():
+            share = stats.saturated / stats.samples if stats.samples else 0.0
+            nodes[node] = {
+                "samples": stats.samples,
+                "saturated_samples": stats.saturated,
+                "saturated_share": round(share, 3),
+                "max_cpu_percent": stats.max_cpu,
+                "max_loop_lag_ms": stats.max_lag_ms,
+                "max_inflight": stats.max_inflight,
+            }
+            if stats.samples and share >= SATURATION_SHARE:
+                saturated_nodes.append(str(node))
+        return {
+            "saturated": bool(saturated_nodes),
+            "saturated_nodes": saturated_nodes,
+            "limits": {"cpu_percent": CPU_LIMIT, "loop_lag_ms": LAG_LIMIT_MS, "share": SATURATION_SHARE},
+            "nodes": nodes,
+        }
+
+
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    monitor = GeneratorMonitor(environment)
+    environment.generator_monitor = monitor
+    environment.events.request.add_listener(monitor.on_request)
+    environment.events.test_start.add_listener(monitor.on_test_start)
+    environment.events.test_stop.add_listener(monitor.on_test_stop)
+    environment.events.quitting.add_listener(monitor.on_quitting)
+    if monitor.is_worker:
+        environment.events.report_to_master.add_listener(monitor.on_report_to_master)
+    else:
+        environment.events.worker_report.add_listener(monitor.on_worker_report)
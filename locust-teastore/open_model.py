@@ -0,0 +1,198 @@
+"""Modelo aberto (taxa de chegada constante) para o cenário TeaStore.
+
+Como o executor constant-arrival-rate do k6: os fluxos são iniciados numa
+taxa fixa (LOCUST_ARRIVAL_RATE fluxos/s no total), independentemente de o
+TeaStore responder rápido ou não. Os usuários do Locust funcionam como o
+pool de VUs: cada usuário livre pega o próximo horário da agenda, espera
+até ele e executa o fluxo. Quando todos estão ocupados, os horários passam
+e o fluxo começa atrasado; esse atraso é o que o modelo fechado esconde
+(coordinated omission).
+
+Com master e workers, o master divide a taxa: no test_start envia a cada
+worker a sua parte (LOCUST_ARRIVAL_RATE / número de workers) e o prefixo
+--csv; os workers devolvem quantos fluxos iniciaram e, no fim, o master
+compara a taxa total com a pedida.
+
+Cada requisição é registrada em <csv>_arrivals.csv (um arquivo por worker)
+com o horário pretendido do fluxo, o início real, a latência e o atraso da
+agenda. scripts/coordinated_omission.py calcula os percentis corrigidos
+(latência + atraso da agenda) a partir desses arquivos.
+"""
+import csv
+import logging
+import os
+import time
+
+from locust import events
+from locust.runners import STATE_MISSING, MasterRunner, WorkerRunner
+
+ARRIVAL_RATE = float(os.getenv("LOCUST_ARRIVAL_RATE", "0"))
+SHARE_MESSAGE = "open_model_share"
+# started flows may trail the schedule by the flows in progress; beyond this the rate is off
+RATE_TOLERANCE = 0.1
+
+FIELDS = ["Intended Start", "Actual Start", "Name", "Response Time", "Schedule Delay", "Success"]
+
+logger = logging.getLogger(__name__)
+
+
+class ArrivalSchedule:
+    """Fixed-rate start times shared by all users of this process."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.start = None
+        self.next = 0
+        self.reported = 0
+
+    def claim(self):
+        """Intended start time (epoch seconds) of the next flow."""
+        if self.start is None:
+            self.start = time.time()
+        intended = self.start + self.next / self.rate
+        self.next += 1
+        return intended
+
+
+class ArrivalRecorder:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(FIELDS)
+
+    def on_request(self, name=None, response_time=None, exception=None, context=None, **kwargs):
+        if not context or "intended_start" not in context:
+            return
+        response_time = response_time or 0.0
+        self.writer.writerow([
+            f'{context["intended_start"]:.3f}',
+            f"{time.time() - response_time / 1000.0:.3f}",
+            name,
+            round(response_time, 3),
+            round(context["schedule_delay_ms"], 3),
+            exception is None,
+        ])
+
+    def close(self, **kwargs):
+        if not self.file.closed:
+            self.file.close()
+
+
+_schedule = None
+# this worker's part of the rate and the master's --csv prefix (SHARE_MESSAGE)
+_share = None
+
+
+def schedule(environment):
+    """Process-wide schedule; a worker runs the share the master sent it."""
+    global _schedule
+    if _schedule is None:
+        rate = ARRIVAL_RATE
+        if isinstance(environment.runner, WorkerRunner):
+            if _share is None:
+                logger.warning("Modelo aberto: worker sem a parte da taxa enviada pelo master; "
+                               "usando a taxa total (%.1f fluxos/s).", rate)
+            else:
+                rate = _share["rate"]
+        _schedule = ArrivalSchedule(rate)
+    return _schedule
+
+
+class RateCheck:
+    """Master side: splits the rate among the workers and checks the total."""
+
+    def __init__(self, environment):
+        self.environment = environment
+        self.started = None
+        self.last_report = None
+        self.flows = 0
+
+    def on_test_start(self, environment, **kwargs):
+        runner = environment.runner
+        workers = [w.id for w in runner.clients.values() if w.state != STATE_MISSING]
+        if not workers:
+            return
+        prefix = getattr(environment.parsed_options, "csv_prefix", None)
+        share = {"rate": ARRIVAL_RATE / len(workers), "csv_prefix": prefix}
+        for client_id in workers:
+            runner.send_message(SHARE_MESSAGE, share, client_id=client_id)
+        self.started = time.time()
+        self.last_report = None
+        self.flows = 0
+        logger.info("Modelo aberto: %.1f fluxos/s divididos entre %d workers (%.2f cada)",
+                    ARRIVAL_RATE, len(workers), share["rate"])
+
+    def on_worker_report(self, client_id, data):
+        if "open_model_flows" in data:
+            self.flows += data["open_model_flows"]
+            self.last_report = time.time()
+
+    def on_test_stop(self, **kwargs):
+        if self.started is None:
+            return
+        # the counts cover the run up to the last worker report
+        elapsed = (self.last_report or self.started) - self.started
+        self.started = None
+        if elapsed <= 0:
+            return
+        rate = self.flows / elapsed
+        if abs(rate - ARRIVAL_RATE) > RATE_TOLERANCE * ARRIVAL_RATE:
+            logger.warning("Modelo aberto: %.1f fluxos/s iniciados no total, pedido %.1f "
+                           "(pool de usuários pequeno ou workers sem a parte da taxa?)", rate, ARRIVAL_RATE)
+        else:
+            logger.info("Modelo aberto: %.1f fluxos/s iniciados no total (pedido %.1f)", rate, ARRIVAL_RATE)
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    global _schedule
+    _schedule = None
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data):
+    # flows claimed since the last report, summed by the master's RateCheck
+    if _schedule is not None:
+        data["open_model_flows"] = _schedule.next - _schedule.reported
+        _schedule.reported = _schedule.next
+
+
+def open_recorder(environment, prefix):
+    path = f"{prefix}_arrivals.csv"
+    if isinstance(environment.runner, WorkerRunner):
+        path = f"{prefix}_arrivals_{environment.runner.client_id}.csv"
+    recorder = ArrivalRecorder(path)
+    environment.events.request.add_listener(recorder.on_request)
+    environment.events.quitting.add_listener(recorder.close)
+    return recorder
+
+
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    if ARRIVAL_RATE <= 0:
+        return
+    runner = environment.runner
+    if isinstance(runner, MasterRunner):
+        check = RateCheck(environment)
+        environment.events.test_start.add_listener(check.on_test_start)
+        environment.events.worker_report.add_listener(check.on_worker_report)
+        environment.events.test_stop.add_listener(check.on_test_stop)
+        return
+    if isinstance(runner, WorkerRunner):
+        recorder = None
+
+        def on_share(msg, **kwargs):
+            # workers are started without --csv: the master's prefix names their files
+            nonlocal recorder
+            global _share
+            _share = msg.data
+            if recorder is None and _share.get("csv_prefix"):
+                recorder = open_recorder(environment, _share["csv_prefix"])
+
+        runner.register_message(SHARE_MESSAGE, on_share)
+        return
+    prefix = getattr(environment.parsed_options, "csv_prefix", None)
+    if not prefix:
+        logger.warning("Modelo aberto sem --csv: atrasos da agenda não serão registrados.")
+        return
+    open_recorder(environment, prefix)
@@ -0,0 +1,86 @@
+"""Interrompe o teste do Locust assim que um SLO por endpoint é violado.
+
+Importar este módulo no locustfile registra o listener (teastore_scenario.py
+já importa). Os limites vêm de LOCUST_SLO_FILE (padrão: slo.json na raiz do
+repositório, formato descrito em scripts/slo.py) e são avaliados a cada
+LOCUST_SLO_INTERVAL segundos (padrão 2) sobre as estatísticas acumuladas do
+master (ou do processo único), com o mesmo avaliador usado para o JMeter e
+o k6. Na primeira violação o runner é encerrado (workers incluídos) e o
+código de saída do processo passa a 1.
+"""
+import logging
+import os
+import sys
+
+import gevent
+from locust import events
+from locust.runners import WorkerRunner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SLO_FILE = os.getenv("LOCUST_SLO_FILE", os.path.join(ROOT, "slo.json"))
+SLO_INTERVAL = float(os.getenv("LOCUST_SLO_INTERVAL", "2"))
+
+logger = logging.getLogger(__name__)
+
+# the evaluator is shared with the JMeter/k6 tooling in scripts/
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+try:
+    from slo import AGGREGATED, SloEvaluator, load_slo
+except Exception:
+    SloEvaluator = None
+
+
+def current_stats(stats):
+    """{name: (requests, errors, p95_ms)} from Locust's RequestStats."""
+    out = {}
+    for entry in stats.entries.values():
+        requests, errors, p95 = out.get(entry.name, (0, 0, None))
+        # the same name may be used with several methods: keep the worst p95
+        if entry.num_requests:
+            entry_p95 = entry.get_response_time_percentile(0.95)
+            p95 = entry_p95 if p95 is None else max(p95, entry_p95)
+        out[entry.name] = (requests + entry.num_requests, errors + entry.num_failures, p95)
+    total = stats.total
+    out[AGGREGATED] = (total.num_requests, total.num_failures,
+                       total.get_response_time_percentile(0.95) if total.num_requests else None)
+    return out
+
+
+def _guard(environment, evaluator):
+    while True:
+        gevent.sleep(SLO_INTERVAL)
+        breaches = evaluator.evaluate(current_stats(environment.runner.stats))
+        if breaches:
+            for breach in breaches:
+                logger.error("SLO violado: %s", breach)
+            environment.process_exit_code = 1
+            # quit from another greenlet: test_stop kills this one
+            gevent.spawn(environment.runner.quit)
+            return
+
+
+@events.init.add_listener
+def on_locust_init(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    if getattr(environment.shape_class, "judges_slo", False):
+        # capacity_search.py evaluates the SLO per load step instead
+        return
+    if SloEvaluator is None:
+        logger.warning("scripts/slo.py indisponível: SLOs não serão aplicados.")
+        return
+    if not os.path.exists(SLO_FILE):
+        return
+    evaluator = SloEvaluator(load_slo(SLO_FILE), "locust")
+    greenlets = []
+
+    def on_test_start(**kwargs):
+        if not greenlets:
+            greenlets.append(gevent.spawn(_guard, environment, evaluator))
+
+    def on_test_stop(**kwargs):
+        while greenlets:
+            greenlets.pop().kill(block=False)
+
+    environment.events.test_start.add_listener(on_test_start)
+    environment.events.test_stop.add_listener(on_test_stop)
@@ -0,0 +1,160 @@
+"""Mix realista de sessões TeaStore: navegação, carrinho, pedido e recomendações.
+
+    locust -f locust-teastore/teastore_mix.py --headless -u 500 -r 8 -t 5m
+
+Os IDs reais de categorias e produtos são coletados uma vez por processo no
+início do teste (home -> páginas de categoria) e compartilhados em memória
+por todos os usuários simulados, em vez de cada usuário raspar as páginas.
+Cada usuário faz login com uma credencial do pool, de modo que sessões,
+carrinhos e pedidos ficam espalhados pelo banco como em produção.
+
+Variáveis (além das de teastore_scenario.py para backend/pool/keep-alive):
+  LOCUST_MIX          pesos das tarefas, ex.: browse=50,cart=25,order=10,recommender=15
+  LOCUST_USERS_FILE   CSV username,password com as credenciais do pool
+  LOCUST_USER_POOL    sem arquivo: user1..userN com senha "password" (padrão 90)
+  LOCUST_CATALOG_PAGES páginas de cada categoria lidas na coleta de produtos (padrão 1)
+  LOCUST_RECOMMENDATION_HOPS produtos recomendados seguidos a partir do primeiro (padrão 2)
+"""
+import csv
+import itertools
+import logging
+import os
+import random
+import re
+
+import requests
+from locust import events
+
+from teastore_scenario import TeaStoreHttpUser
+
+MIX = os.getenv("LOCUST_MIX", "browse=50,cart=25,order=10,recommender=15")
+USERS_FILE = os.getenv("LOCUST_USERS_FILE")
+USER_POOL = int(os.getenv("LOCUST_USER_POOL", "90"))
+CATALOG_PAGES = int(os.getenv("LOCUST_CATALOG_PAGES", "1"))
+RECOMMENDATION_HOPS = int(os.getenv("LOCUST_RECOMMENDATION_HOPS", "2"))
+
+# TeaStore's default database: categories 2..6, products 7..506
+FALLBACK_CATEGORIES = list(range(2, 7))
+FALLBACK_PRODUCTS = list(range(7, 507))
+
+CATEGORY_RE = re.compile(r'category\?category=(\d+)')
+PRODUCT_RE = re.compile(r'product\?id=(\d+)')
+
+CHECKOUT_DATA = {
+    "firstname": "User", "lastname": "User", "adress1": "Road", "adress2": "City",
+    "cardtype": "volvo", "cardnumber": "314159265359", "expirydate": "12/2050",
+    "confirm": "Confirm",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class Catalog:
+    """Category/product IDs and credentials shared by every user of the process."""
+
+    def __init__(self):
+        # usable before test_start: users spawned before the catalog loads get the default IDs
+        self.categories = FALLBACK_CATEGORIES
+        self.products = FALLBACK_PRODUCTS
+        self.credentials = itertools.cycle(load_credentials())
+
+    def load(self, host):
+        """Refresh the IDs from the running TeaStore (the credentials are fixed)."""
+        categories, products = set(), set()
+        try:
+            with requests.Session() as session:
+                home = session.get(f"{host}/", timeout=30)
+                categories.update(int(c) for c in CATEGORY_RE.findall(home.text))
+                for category in sorted(categories):
+                    for page in range(1, CATALOG_PAGES + 1):
+                        r = session.get(f"{host}/category",
+                                        params={"category": category, "page": page}, timeout=30)
+                        products.update(int(p) for p in PRODUCT_RE.findall(r.text))
+        except requests.RequestException as e:
+            logger.warning("Coleta do catálogo falhou (%s); usando IDs padrão do TeaStore.", e)
+        self.categories = sorted(categories) or FALLBACK_CATEGORIES
+        self.products = sorted(products) or FALLBACK_PRODUCTS
+        logger.info("Catálogo: %d categorias, %d produtos", len(self.categories), len(self.products))
+
+    def category(self):
+        return random.choice(self.categories)
+
+    def product(self):
+        return random.choice(self.products)
+
+
+def load_credentials():
+    if USERS_FILE:
+        with open(USERS_FILE, newline="", encoding="utf-8") as f:
+            return [(row[0], row[1]) for row in csv.reader(f) if len(row) >= 2 and row[0] != "username"]
+    return [(f"user{i}", "password") for i in range(1, USER_POOL + 1)]
+
+
+catalog = Catalog()
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    if type(environment.runner).__name__ == "MasterRunner":
+        return
+    catalog.load(environment.host or TeaStoreHttpUser.host)
+
+
+def browse(user):
+    user.call("GET", f"/category?category={catalog.category()}&page=1", "GET /category")
+    user.call("GET", f"/product?id={catalog.product()}", "GET /product")
+
+
+def add_to_cart(user):
+    product = catalog.product()
+    user.call("GET", f"/product?id={product}", "GET /product")
+    user.call("POST", "/cartAction", "POST /cartAction addToCart", (200, 302),
+              data={"addToCart": "", "productid": product})
+
+
+def order(user):
+    add_to_cart(user)
+    user.call("GET", "/cart", "GET /cart")
+    user.call("POST", "/cartAction", "POST /cartAction proceedtoCheckout", (200, 302),
+              data={"proceedtoCheckout": ""})
+    user.call("GET", "/order", "GET /order")
+    user.call("POST", "/cartAction", "POST /cartAction confirm", (200, 302), data=CHECKOUT_DATA)
+
+
+def recommender(user):
+    # follow the recommended products ("Are you interested in?") of each product page,
+    # so every hop is a recommender call for a product the recommender itself chose
+    product = catalog.product()
+    for _ in range(RECOMMENDATION_HOPS + 1):
+        response = user.call("GET", f"/product?id={product}", "GET /product (recomendação)")
+        recommended = [int(p) for p in PRODUCT_RE.findall(response.text or "") if int(p) != product]
+        if not recommended:
+            break
+        product = random.choice(recommended)
+
+
+TASKS = {"browse": browse, "cart": add_to_cart, "order": order, "recommender": recommender}
+
+
+def parse_mix(spec):
+    weights = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in TASKS:
+            raise ValueError(f"LOCUST_MIX: tarefa desconhecida '{name}' (use {', '.join(TASKS)})")
+        weights[TASKS[name]] = int(weight or 1)
+    return weights
+
+
+class TeaStoreMixUser(TeaStoreHttpUser):
+    tasks = parse_mix(MIX)
+
+    def on_start(self):
+        super().on_start()
+        username, password = next(catalog.credentials)
+        self.call("GET", "/login", "GET /login")
+        self.call("POST", "/loginAction", "POST /loginAction", (200, 302), "Login falhou",
+                  data={"username": username, "password": password})
+
+    def on_stop(self):
+        self.call("POST", "/loginAction?logout=", "POST /logout", (200, 302), "Logout falhou")
@@ -0,0 +1,129 @@
+"""Cenário TeaStore parametrizado (substitui as cópias cenario-*-vus.py).
+
+Fluxo, backend HTTP e pool de conexões vêm de variáveis de ambiente; o
+número de usuários, spawn rate e duração vêm dos arquivos cenario-*.conf
+(`locust --config locust-teastore/cenario-1000-vus.conf`) ou da CLI.
+
+Variáveis:
+  LOCUST_BACKEND      fast (FastHttpUser/geventhttpclient, padrão) | requests (HttpUser)
+  LOCUST_POOL_SIZE    conexões simultâneas por usuário (padrão 1)
+  LOCUST_SHARED_POOL  >0: um pool geventhttpclient com esse tamanho compartilhado por todos os usuários
+  LOCUST_KEEPALIVE    1 (padrão) reaproveita conexões; 0 envia "Connection: close"
+  LOCUST_TIMEOUT      timeout de conexão/rede em segundos (padrão 60)
+  LOCUST_WAIT_MIN/MAX intervalo entre iterações em segundos (padrão 1 e 2)
+  LOCUST_FLOW_FILE    JSON com a lista de passos do fluxo (padrão: FLOW abaixo)
+  LOCUST_ARRIVAL_RATE >0: modelo aberto, fluxos/s iniciados em taxa fixa (ver open_model.py);
+                      os usuários (-u) são o pool que executa os fluxos
+"""
+import json
+import os
+import time
+from collections import namedtuple
+
+import gevent
+from locust import FastHttpUser, HttpUser, between, constant, task
+
+import generator_monitor  # noqa: F401  (registra a detecção de saturação do gerador)
+import open_model
+import slo_guard  # noqa: F401  (registra a interrupção por violação de SLO)
+
+
+BASE_HOST = os.getenv("HOST", "http://localhost")
+BASE_PORT = os.getenv("PORT", "8080")
+BASE_PATH = os.getenv("BASE_PATH", "/tools.descartes.teastore.webui")
+
+BACKEND = os.getenv("LOCUST_BACKEND", "fast").lower()
+POOL_SIZE = int(os.getenv("LOCUST_POOL_SIZE", "1"))
+SHARED_POOL = int(os.getenv("LOCUST_SHARED_POOL", "0"))
+KEEPALIVE = os.getenv("LOCUST_KEEPALIVE", "1").lower() not in ("0", "false", "no")
+TIMEOUT = float(os.getenv("LOCUST_TIMEOUT", "60"))
+WAIT_MIN = float(os.getenv("LOCUST_WAIT_MIN", "1"))
+WAIT_MAX = float(os.getenv("LOCUST_WAIT_MAX", "2"))
+
+# method, path, request name, accepted status codes, form data, failure message prefix
+Step = namedtuple("Step", "method path name ok_status data fail_msg")
+
+FLOW = [
+    Step("GET", "/login", "GET /login", (200,), None, "GET /login falhou"),
+    Step("POST", "/loginAction", "POST /loginAction", (200, 302),
+         {"username": "user1", "password": "password"}, "Login falhou"),
+    Step("GET", "/", "GET /", (200,), None, "GET / falhou"),
+    Step("GET", "/category", "GET /category", (200,), None, "GET /category falhou"),
+    Step("GET", "/product", "GET /product", (200,), None, "GET /produto falhou"),
+    Step("POST", "/loginAction?logout=", "POST /logout", (200, 302), None, "Logout falhou"),
+]
+
+
+def load_flow(path):
+    """Steps from a JSON list of objects with the Step field names."""
+    with open(path, encoding="utf-8") as f:
+        steps = json.load(f)
+    return [Step(s["method"].upper(), s["path"], s.get("name") or f'{s["method"].upper()} {s["path"]}',
+                 tuple(s.get("ok_status", (200,))), s.get("data"),
+                 s.get("fail_msg") or f'{s["method"].upper()} {s["path"]} falhou')
+            for s in steps]
+
+
+if os.getenv("LOCUST_FLOW_FILE"):
+    FLOW = load_flow(os.environ["LOCUST_FLOW_FILE"])
+
+
+_BaseUser = HttpUser if BACKEND == "requests" else FastHttpUser
+
+
+class TeaStoreHttpUser(_BaseUser):
+    """HTTP backend, pool and keep-alive settings shared by the TeaStore users."""
+    abstract = True
+    wait_time = between(WAIT_MIN, WAIT_MAX)
+    host = f"{BASE_HOST}:{BASE_PORT}{BASE_PATH}"
+
+    if _BaseUser is FastHttpUser:
+        concurrency = POOL_SIZE
+        connection_timeout = TIMEOUT
+        network_timeout = TIMEOUT
+        default_headers = None if KEEPALIVE else {"Connection": "close"}
+        if SHARED_POOL > 0:
+            from geventhttpclient.client import HTTPClientPool
+            client_pool = HTTPClientPool(concurrency=SHARED_POOL)
+
+    def on_start(self):
+        if BACKEND == "requests":
+            from requests.adapters import HTTPAdapter
+
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            self.client.mount("http://", adapter)
+            self.client.mount("https://", adapter)
+            if not KEEPALIVE:
+                self.client.headers["Connection"] = "close"
+
+    def call(self, method, path, name, ok_status=(200,), fail_msg=None, **kwargs):
+        """Request with pass/fail decided by status code; returns the response."""
+        with self.client.request(method, path, name=name, catch_response=True, **kwargs) as response:
+            if response.status_code in ok_status:
+                response.success()
+            else:
+                response.failure(f"{fail_msg or name + ' falhou'}: {response.status_code}")
+        return response
+
+
+class TeaStoreUser(TeaStoreHttpUser):
+    # open model: pacing comes from the arrival schedule, not from think time
+    if open_model.ARRIVAL_RATE > 0:
+        wait_time = constant(0)
+
+    @task
+    def test_flow(self):
+        context = None
+        if open_model.ARRIVAL_RATE > 0:
+            intended = open_model.schedule(self.environment).claim()
+            if intended > time.time():
+                gevent.sleep(intended - time.time())
+            context = {"intended_start": intended,
+                       "schedule_delay_ms": max(0.0, time.time() - intended) * 1000}
+        for step in FLOW:
+            kwargs = {}
+            if context is not None:
+                kwargs["context"] = context
+            if step.data is not None:
+                kwargs["data"] = step.data
+            self.call(step.method, step.path, step.name, step.ok_status, step.fail_msg, **kwargs)
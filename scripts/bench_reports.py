@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""Benchmark of the report scripts on synthetic results (scripts/gen_results.py).
+
+For each size (--rows, e.g. 1M 10M) the datasets are generated once into
+--data-dir (JTL CSV and XML, Locust CSVs, k6 NDJSON + summary; reused by
+later runs with the same parameters), then every case runs as its own
+process and records:
+
+  wall_s      elapsed time, cold: the columnar cache (<jtl>.cache) and the
+              PDF cache (.report-cache) are removed first; --warm adds a
+              second, cached run per case
+  peak_rss_mb peak resident memory of the largest process of the case
+              (worker processes included), polled from /proc (VmHWM);
+              ru_maxrss from wait4() where /proc is missing
+  rows_per_s  input rows (JTL samples + history rows + NDJSON lines read by
+              the case) / wall_s
+
+Results are compared against --baseline (JSON keyed by case and size): a
+case regresses when its wall time or peak RSS grows by more than
+--tolerance-pct and by more than --min-delta-s / --min-delta-mb (noise
+floor). The exit code is 1 when any case regresses; --save-baseline stores
+the current numbers instead. Baselines are machine specific: compare only
+runs made on the same kind of machine.
+
+Usage: python scripts/bench_reports.py [--rows 1M 10M] [--cases unify_jmeter_graphs ...] [--warm]
+                                       [--baseline .bench/baseline.json] [--save-baseline] [--out bench.json]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import gen_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIR = os.path.join(ROOT, '.bench')
+
+# name -> (argv, inputs read); {placeholders} are dataset paths and {out}
+CASES = {
+    'unify_jmeter_graphs': (['scripts/unify_jmeter_graphs.py', '{jtl}', '{out}/graphs'], ('jtl',)),
+    'extract_jmeter_failures_csv': (['scripts/extract_jmeter_failures.py', '{jtl}', '{out}/failures'], ('jtl',)),
+    'extract_jmeter_failures_xml': (['scripts/extract_jmeter_failures.py', '{jtl_xml}', '{out}/failures-xml'],
+                                    ('jtl_xml',)),
+    'generate_custom_jmeter_report': (['scripts/generate_custom_jmeter_report.py', '--csv', '{jtl}',
+                                       '--out', '{out}/custom.html'], ('jtl',)),
+    'generate_dashboard': (['generate_dashboard.py', '--k6', '{k6_summary}', '--k6-raw', '{k6_raw}',
+                            '--jmeter', '{jtl}', '--locust', '{locust}', '--out', '{out}/dashboard.html',
+                            '--pdf', '{out}/dashboard.pdf'], ('jtl', 'k6_raw', 'locust')),
+    'generate_dashboard_stream': (['generate_dashboard.py', '--stream', '--k6', '{k6_summary}',
+                                   '--k6-raw', '{k6_raw}', '--jmeter', '{jtl}', '--locust', '{locust}',
+                                   '--out', '{out}/dashboard.html', '--pdf', '{out}/dashboard.pdf'],
+                                  ('jtl', 'k6_raw', 'locust')),
+    'build_report': (['scripts/build_report.py', '--jmeter', '{jtl}', '--k6', '{k6_summary}',
+                      '--k6-raw', '{k6_raw}', '--locust', '{locust}', '--out', '{out}/relatorio.pdf',
+                      '--cache-dir', '{out}/.report-cache'], ('jtl', 'k6_raw', 'locust')),
+    'failure_clusters': (['scripts/failure_clusters.py', '--jtl', '{jtl}', '--k6-raw', '{k6_raw}',
+                          '--locust-csv', '{locust}', '--out', '{out}/failure-clusters.json'],
+                         ('jtl', 'k6_raw', 'locust')),
+    # every output above (but the XML failures) from one load of the inputs
+    'teastore_perf': (['teastore-perf', '--jmeter', '{jtl}', '--k6', '{k6_summary}', '--k6-raw', '{k6_raw}',
+                       '--locust', '{locust}', '--exact', '--all', '{out}/all',
+                       '--cache-dir', '{out}/.report-cache'], ('jtl', 'k6_raw', 'locust')),
+}
+
+
+def dataset(data_dir, rows, params):
+    """Paths of the synthetic inputs for `rows`, generated when missing."""
+    key = hashlib.sha256(json.dumps([rows, params], sort_keys=True).encode()).hexdigest()[:10]
+    base = os.path.join(data_dir, f'data-{rows}-{key}')
+    paths = {
+        'jtl': os.path.join(base, 'results.csv'),
+        'jtl_xml': os.path.join(base, 'results.xml'),
+        'locust': os.path.join(base, 'locust'),
+        'k6_raw': os.path.join(base, 'k6-raw.json'),
+    }
+    paths['k6_summary'] = gen_results.k6_summary_path(paths['k6_raw'])
+    done = os.path.join(base, '.complete')
+    if not os.path.exists(done):
+        os.makedirs(base, exist_ok=True)
+        for kind, path, xml in (('jtl', paths['jtl'], False), ('jtl', paths['jtl_xml'], True),
+                                ('locust', paths['locust'], False), ('k6', paths['k6_raw'], False)):
+            started = time.perf_counter()
+            gen_results.generate(kind, rows, path, xml=xml, **params)
+            print(f'   gerado {os.path.relpath(path, data_dir)} ({time.perf_counter() - started:.1f}s)', flush=True)
+        open(done, 'w').close()
+    return paths
+
+
+def clear_caches(paths, out):
+    for path in (paths['jtl'], paths['jtl_xml']):
+        shutil.rmtree(f'{path}.cache', ignore_errors=True)
+    shutil.rmtree(os.path.join(out, '.report-cache'), ignore_errors=True)
+
+
+def _children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [int(c) for c in f.read().split()]
+    except (OSError, ValueError):
+        return []
+
+
+def _hwm_kb(pid):
+    """VmHWM (peak RSS since exec) of one process, 0 when it is gone."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def run_case(argv, cwd, timeout, poll_s=0.02):
+    """(wall seconds, peak RSS MB, return code) of one process tree.
+
+    With /proc the peak is the largest VmHWM seen in the tree while polling:
+    ru_maxrss of a child also counts the memory of the (forked) caller
+    before exec, which would hide small scripts behind the harness itself.
+    """
+    started = time.perf_counter()
+    peak_kb = 0
+    has_proc = os.path.exists(f'/proc/{os.getpid()}/status')
+    with open(os.path.join(cwd, 'output.log'), 'ab') as log:
+        proc = subprocess.Popen(argv, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+        deadline = started + timeout
+        while True:
+            if has_proc:
+                stack = [proc.pid]
+                while stack:
+                    pid = stack.pop()
+                    peak_kb = max(peak_kb, _hwm_kb(pid))
+                    stack.extend(_children(pid))
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.perf_counter() > deadline:
+                proc.kill()
+                pid, status, usage = os.wait4(proc.pid, 0)
+                break
+            time.sleep(poll_s)
+    wall = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if not peak_kb:
+        # ru_maxrss: kilobytes on Linux, bytes on macOS
+        peak_kb = usage.ru_maxrss / (1024 if sys.platform == 'darwin' else 1)
+    return wall, peak_kb / 1024, proc.returncode
+
+
+def input_rows(paths, inputs, rows):
+    # each generated input holds `rows` data rows (the Locust history is the largest Locust file)
+    return rows * len([k for k in inputs if k in paths])
+
+
+def compare(results, baseline, tolerance_pct, min_delta_s, min_delta_mb):
+    regressions = []
+    for key, r in results.items():
+        b = baseline.get(key)
+        if not b or r.get('error'):
+            continue
+        slower = r['wall_s'] - b['wall_s']
+        bigger = r['peak_rss_mb'] - b['peak_rss_mb']
+        r['vs_baseline'] = {'wall_pct': 100.0 * slower / b['wall_s'] if b['wall_s'] else None,
+                            'rss_pct': 100.0 * bigger / b['peak_rss_mb'] if b['peak_rss_mb'] else None}
+        if slower > max(b['wall_s'] * tolerance_pct / 100.0, min_delta_s):
+            regressions.append(f"{key}: tempo {b['wall_s']:.1f}s -> {r['wall_s']:.1f}s")
+        if bigger > max(b['peak_rss_mb'] * tolerance_pct / 100.0, min_delta_mb):
+            regressions.append(f"{key}: memória {b['peak_rss_mb']:.0f} MB -> {r['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def _pct(value):
+    return '' if value is None else f'{value:+.0f}%'
+
+
+def print_results(results):
+    print(f"\n{'caso':<42} {'tempo s':>9} {'pico MB':>9} {'linhas/s':>12} {'Δ tempo':>8} {'Δ mem':>7}")
+    for key, r in results.items():
+        if r.get('error'):
+            print(f"{key:<42} ❌ {r['error']}")
+            continue
+        delta = r.get('vs_baseline') or {}
+        print(f"{key:<42} {r['wall_s']:>9.2f} {r['peak_rss_mb']:>9.0f} {r['rows_per_s']:>12,.0f} "
+              f"{_pct(delta.get('wall_pct')):>8} {_pct(delta.get('rss_pct')):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dos scripts de relatório em dados sintéticos')
+    parser.add_argument('--rows', nargs='+', default=['1M'], help='Tamanhos (ex.: 1M 10M 100M)')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), help='Só estes casos (padrão: todos)')
+    parser.add_argument('--warm', action='store_true', help='Mede também uma segunda execução, com cache')
+    parser.add_argument('--data-dir', default=DEFAULT_DIR, help='Onde os dados sintéticos são gerados e reusados')
+    parser.add_argument('--failure-rate', type=float, default=0.01)
+    parser.add_argument('--labels', help='Mix de labels (formato de gen_results.py --labels)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=3600, help='Tempo máximo por caso (s)')
+    parser.add_argument('--baseline', default=os.path.join(DEFAULT_DIR, 'baseline.json'), help='Baseline (JSON)')
+    parser.add_argument('--save-baseline', action='store_true', help='Grava os resultados como baseline')
+    parser.add_argument('--tolerance-pct', type=float, default=25.0, help='Piora tolerada (%%)')
+    parser.add_argument('--min-delta-s', type=float, default=1.0, help='Piora de tempo ignorada abaixo disto (s)')
+    parser.add_argument('--min-delta-mb', type=float, default=50.0, help='Piora de memória ignorada abaixo disto (MB)')
+    parser.add_argument('--out', help='Grava os resultados neste JSON')
+    args = parser.parse_args()
+
+    if not gen_results.HAS_NUMPY:
+        print('ERROR: numpy is required. Install with: pip install -r requirements.txt')
+        sys.exit(1)
+    params = {'mix': gen_results.parse_mix(args.labels), 'failure_rate': args.failure_rate, 'seed': args.seed}
+    results = {}
+    for size in args.rows:
+        rows = gen_results.parse_rows(size)
+        print(f'== {size} ({rows} linhas por entrada)', flush=True)
+        paths = dataset(args.data_dir, rows, params)
+        for name in args.cases or CASES:
+            template, inputs = CASES[name]
+            out = os.path.join(args.data_dir, 'out', f'{name}-{size}')
+            shutil.rmtree(out, ignore_errors=True)
+            os.makedirs(out)
+            argv = [sys.executable] + [os.path.join(ROOT, a) if i == 0 else a.format(out=out, **paths)
+                                       for i, a in enumerate(template)]
+            runs = [('', True)] + ([(' [cache]', False)] if args.warm else [])
+            for suffix, cold in runs:
+                if cold:
+                    clear_caches(paths, out)
+                wall, rss, code = run_case(argv, out, args.timeout)
+                key = f'{name}{suffix} @ {size}'
+                if code:
+                    results[key] = {'error': f'saiu com código {code} (ver {out}/output.log)'}
+                else:
+                    n = input_rows(paths, inputs, rows)
+                    results[key] = {'wall_s': round(wall, 3), 'peak_rss_mb': round(rss, 1),
+                                    'rows': n, 'rows_per_s': n / wall if wall else 0.0}
+                print(f'   {key}: {wall:.1f}s, {rss:.0f} MB' + (' ❌' if code else ''), flush=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.tolerance_pct, args.min_delta_s, args.min_delta_mb)
+    print_results(results)
+    report = {'python': sys.version.split()[0], 'machine': os.uname().machine, 'cpus': os.cpu_count(),
+              'results': results, 'regressions': regressions}
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        merged = dict(baseline)
+        merged.update({k: v for k, v in results.items() if not v.get('error')})
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({'python': report['python'], 'machine': report['machine'], 'cpus': report['cpus'],
+                       'results': merged}, f, indent=2)
+        print(f'\n✅ Baseline gravada em {args.baseline}')
+        return
+    if not baseline:
+        print(f'\n⚠️  Sem baseline em {args.baseline} (use --save-baseline)')
+    elif regressions:
+        print('\n❌ Regressões em relação à baseline:')
+        for line in regressions:
+            print(f'   {line}')
+        sys.exit(1)
+    else:
+        print('\n✅ Nenhuma regressão em relação à baseline')
+
+
+if __name__ == '__main__':
+    main()
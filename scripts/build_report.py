@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""Unified PDF report (JMeter, k6, Locust) with parallel, cached rendering.
+
+The report is described as plain data first: every chart is a spec with its
+(downsampled) lines and every section a list of text, table and chart
+blocks. Each artifact is stored in the cache directory under the sha256 of
+its spec, so only artifacts whose input changed are rendered again:
+
+  1. charts -> PNG (matplotlib), rendered in a process pool
+  2. sections -> one PDF fragment each (reportlab Tables, not HTML strings),
+     also in the pool; a section's spec holds the keys of its charts, so a
+     chart that changed also invalidates the section that shows it
+  3. the fragments are concatenated into the final PDF (PyPDF2); without
+     PyPDF2 the sections are laid out in a single document instead
+
+Usage: python scripts/build_report.py --jmeter results.jtl --k6 k6-complex.json \
+           [--k6-raw k6-raw.json] [--locust report.html|prefix|stats.json] \
+           [--out relatorio.pdf] [--cache-dir .report-cache] [--workers N]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+from downsample import downsample
+from jtl_parallel import default_workers, pool_context
+
+# optional heavy deps
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    HAS_MATPLOTLIB = True
+except Exception:
+    HAS_MATPLOTLIB = False
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Image, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    HAS_REPORTLAB = True
+except Exception:
+    HAS_REPORTLAB = False
+
+try:
+    from PyPDF2 import PdfWriter
+    HAS_PYPDF = True
+except Exception:
+    HAS_PYPDF = False
+
+# bump when the rendering code changes, so cached artifacts are not reused
+RENDER_VERSION = 1
+DEFAULT_CACHE_DIR = '.report-cache'
+MAX_POINTS = 1000
+
+ENDPOINT_COLUMNS = ('Req.', 'Erros', 'Média', 'p50', 'p95', 'p99')
+
+
+# --- specs -------------------------------------------------------------------
+def artifact_key(spec):
+    """Content hash of an artifact spec (stable across runs and processes)."""
+    payload = json.dumps([RENDER_VERSION, spec], sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _round(value):
+    # merges done in a different order differ in the last bits; those must
+    # not change the hash of an otherwise identical artifact
+    return None if value is None else round(float(value), 3)
+
+
+def fmt(value):
+    if value is None:
+        return '—'
+    if isinstance(value, float):
+        return f'{value:,.2f}'
+    return str(value)
+
+
+def chart(title, ylabel, lines, max_points=MAX_POINTS):
+    """Chart spec: `lines` = [(name, xs, ys)], downsampled to the point budget."""
+    spec = {'title': title, 'ylabel': ylabel, 'lines': []}
+    for name, xs, ys in lines:
+        xs, ys = downsample(xs, ys, max_points, 'lttb')
+        if xs:
+            spec['lines'].append({'name': name, 'x': [_round(x) for x in xs], 'y': [_round(y) for y in ys]})
+    return spec
+
+
+def table(columns, rows):
+    """Table block: cells are formatted here so the spec is what gets printed."""
+    return {'type': 'table', 'columns': list(columns), 'rows': [[fmt(c) for c in row] for row in rows]}
+
+
+def text(value, style='Normal'):
+    return {'type': 'text', 'text': value, 'style': style}
+
+
+class Section:
+    """A titled list of blocks plus the charts it shows."""
+
+    def __init__(self, title):
+        self.title = title
+        self.blocks = []
+        self.charts = {}
+
+    def add(self, block):
+        self.blocks.append(block)
+
+    def add_chart(self, spec):
+        if not spec['lines']:
+            return
+        key = artifact_key(spec)
+        self.charts[key] = spec
+        self.blocks.append({'type': 'chart', 'key': key})
+
+    def spec(self):
+        return {'title': self.title, 'blocks': self.blocks}
+
+
+# --- sections per tool -------------------------------------------------------
+def _endpoint_rows(label_summary):
+    return [[name, s['requests'], s['errors'], s['avg_latency_ms'], s['p50_ms'], s['p95_ms'], s['p99_ms']]
+            for name, s in sorted(label_summary.items())]
+
+
+def _aggregate_charts(section, agg, tool, max_points):
+    """Latency, throughput and error-rate charts of a JtlAggregate (JMeter, k6)."""
+    total = agg.series()
+    xs = [x for x, _ in total]
+    width = agg.bucket_width()
+    section.add_chart(chart(f'{tool}: tempo de resposta (ms)', 'ms', [
+        (name, xs, [b.hist.quantile(q) if b else None for _, b in total])
+        for q, name in ((0.5, 'p50'), (0.95, 'p95'), (0.99, 'p99'))], max_points))
+    section.add_chart(chart(f'{tool}: p95 por label (ms)', 'ms', [
+        (label, [x for x, _ in s], [b.hist.quantile(0.95) if b else None for _, b in s])
+        for label, s in ((label, agg.series(label)) for label in sorted(agg.label_seconds))], max_points))
+    section.add_chart(chart(f'{tool}: throughput (req/s)', 'req/s',
+                            [('total', xs, [b.count / width if b else 0 for _, b in total])], max_points))
+    section.add_chart(chart(f'{tool}: taxa de erro (%)', '%',
+                            [('total', xs, [100.0 * b.errors / b.count if b else None for _, b in total])],
+                            max_points))
+
+
+def _round_cell(value):
+    return _round(value) if isinstance(value, float) else value
+
+
+def summary_section(columns):
+    """Side-by-side comparison; `columns` = {tool: summary dict (jmeter_summary keys)}."""
+    rows = (('requests', 'Requisições'), ('avg_latency_ms', 'Média (ms)'), ('p50_ms', 'p50 (ms)'),
+            ('p95_ms', 'p95 (ms)'), ('p99_ms', 'p99 (ms)'), ('error_rate', 'Taxa de erro'),
+            ('throughput_rps', 'Throughput (req/s)'))
+    section = Section('Resumo por ferramenta')
+    section.add(table([''] + list(columns), [[label] + [_round_cell(col.get(key)) for col in columns.values()]
+                                             for key, label in rows]))
+    return section
+
+
+def phases_blocks(section, phases):
+    """Connect / server / download table and diagnosis (jtl_phases summary)."""
+    from jtl_phases import FIELDS, flat_rows
+    rows = flat_rows(phases)
+    section.add(text('Fases por label: conexão, servidor (TTFB) e download (ms)', 'Heading3'))
+    section.add(table(('Label',) + tuple(h for _, h in FIELDS),
+                      [[label] + [_round_cell(r[k]) for k, _ in FIELDS] for label, r in rows.items()]))
+    for label, r in rows.items():
+        if r['diagnosis']:
+            section.add(text(f"{label}: {r['diagnosis']}"))
+
+
+def jmeter_section(agg, max_points=MAX_POINTS, phases=None):
+    section = Section('JMeter')
+    summary = agg.summary()
+    section.add(text(f"{summary['requests']} amostras, p95 {fmt(summary['p95_ms'])} ms, "
+                     f"throughput {fmt(summary['throughput_rps'])} req/s"))
+    if agg.labels:
+        section.add(text('Por label', 'Heading3'))
+        section.add(table(('Label',) + ENDPOINT_COLUMNS, _endpoint_rows(agg.label_summary())))
+    if phases:
+        phases_blocks(section, phases)
+    if agg.seconds:
+        _aggregate_charts(section, agg, 'JMeter', max_points)
+    return section
+
+
+def _k6_values(metric):
+    # handleSummary JSON nests the values; --summary-export keeps them flat
+    return metric.get('values', metric) if isinstance(metric, dict) else {}
+
+
+def _k6_checks(group, path=''):
+    for check in group.get('checks', []) or []:
+        yield [path or '(raiz)', check.get('name'), check.get('passes'), check.get('fails')]
+    for sub in group.get('groups', []) or []:
+        yield from _k6_checks(sub, f"{path} › {sub.get('name')}" if path else sub.get('name'))
+
+
+def k6_section(summary=None, k6_agg=None, max_points=MAX_POINTS):
+    """k6 section from the summary export and/or the raw point aggregate."""
+    section = Section('k6')
+    metrics = (summary or {}).get('metrics', {})
+    trends = []
+    others = []
+    for name, metric in sorted(metrics.items()):
+        values = _k6_values(metric)
+        if 'avg' in values:
+            trends.append([name] + [_round_cell(values.get(k)) for k in ('avg', 'min', 'med', 'p(90)', 'p(95)', 'max')])
+        else:
+            others.append([name] + [_round_cell(values.get(k)) for k in ('count', 'rate', 'value', 'passes', 'fails')])
+    if trends:
+        section.add(text('Métricas de tempo (ms)', 'Heading3'))
+        section.add(table(('Métrica', 'Média', 'Mín', 'Mediana', 'p90', 'p95', 'Máx'), trends))
+    if others:
+        section.add(text('Contadores, taxas e gauges', 'Heading3'))
+        section.add(table(('Métrica', 'count', 'rate', 'value', 'passes', 'fails'), others))
+    checks = list(_k6_checks((summary or {}).get('root_group', {})))
+    if checks:
+        section.add(text('Checks', 'Heading3'))
+        section.add(table(('Grupo', 'Check', 'Passou', 'Falhou'), checks))
+    if k6_agg is not None and k6_agg.requests.labels:
+        requests = k6_agg.requests
+        section.add(text('Por grupo (http_req_duration)', 'Heading3'))
+        section.add(table(('Grupo',) + ENDPOINT_COLUMNS, _endpoint_rows(requests.label_summary())))
+        if requests.seconds:
+            _aggregate_charts(section, requests, 'k6', max_points)
+    return section
+
+
+def locust_section(report, max_points=MAX_POINTS):
+    """Locust section from a locust_report dict (HTML, CSV or JSON input)."""
+    section = Section('Locust')
+    rows = []
+    for e in report['endpoints'] + ([report['aggregated']] if report.get('aggregated') else []):
+        pcts = e.get('percentiles', {})
+        rows.append([f"{e['method']} {e['name']}".strip(), e['requests'], e['failures'],
+                     _round_cell(e['avg_ms']), _round_cell(pcts.get('0.5')), _round_cell(pcts.get('0.95')),
+                     _round_cell(pcts.get('0.99')), _round_cell(e['max_ms']), _round_cell(e['rps'])])
+    if rows:
+        section.add(table(('Endpoint', 'Req.', 'Falhas', 'Média', 'p50', 'p95', 'p99', 'Máx', 'req/s'), rows))
+    points = [p for p in report.get('history', []) if isinstance(p.get('time'), (int, float))]
+    if points:
+        first = points[0]['time']
+        xs = [p['time'] - first for p in points]
+        section.add_chart(chart('Locust: usuários e throughput', '', [
+            ('usuários', xs, [p['users'] for p in points]),
+            ('req/s', xs, [p['rps'] for p in points]),
+            ('falhas/s', xs, [p['fail_per_s'] for p in points])], max_points))
+        section.add_chart(chart('Locust: tempo de resposta (ms)', 'ms', [
+            ('p50', xs, [p['p50_ms'] for p in points]),
+            ('p95', xs, [p['p95_ms'] for p in points])], max_points))
+    return section
+
+
+# --- rendering (runs in worker processes) ------------------------------------
+def _atomic_path(path):
+    return f'{path}.{os.getpid()}.tmp'
+
+
+def render_chart(spec, path):
+    tmp = _atomic_path(path)
+    fig, ax = plt.subplots(figsize=(8, 4.2), dpi=110)
+    for line in spec['lines']:
+        ax.plot(line['x'], line['y'], label=line['name'], linewidth=1)
+    ax.set_title(spec['title'])
+    ax.set_ylabel(spec['ylabel'])
+    ax.set_xlabel('s')
+    ax.grid(alpha=0.3)
+    if len(spec['lines']) > 1:
+        ax.legend(fontsize='small')
+    fig.tight_layout()
+    fig.savefig(tmp, format='png')
+    plt.close(fig)
+    os.replace(tmp, path)
+    return path
+
+
+_TABLE_STYLE = [
+    ('FONTSIZE', (0, 0), (-1, -1), 7),
+    ('GRID', (0, 0), (-1, -1), 0.25, '#bbbbbb'),
+    ('BACKGROUND', (0, 0), (-1, 0), '#e8e8e8'),
+    ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+]
+
+
+def _flowables(spec, chart_path, styles):
+    cell = styles['BodyText'].clone('cell', fontSize=7, leading=8.5)
+    out = [Paragraph(escape(spec['title']), styles['Heading2'])]
+    for block in spec['blocks']:
+        if block['type'] == 'text':
+            out.append(Paragraph(escape(block['text']), styles[block.get('style', 'Normal')]))
+        elif block['type'] == 'table':
+            # first column wraps (long endpoint names), the others are numbers
+            data = [block['columns']] + [[Paragraph(escape(str(r[0])), cell)] + r[1:] for r in block['rows']]
+            t = Table(data, repeatRows=1, hAlign='LEFT')
+            t.setStyle(TableStyle(_TABLE_STYLE + [('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, '#f7f7f7'])]))
+            out.append(t)
+        elif block['type'] == 'chart':
+            out.append(Image(chart_path(block['key']), width=480, height=252))
+        out.append(Spacer(1, 8))
+    return out
+
+
+def render_section(spec, cache_dir, path):
+    tmp = _atomic_path(path)
+    doc = SimpleDocTemplate(tmp, pagesize=A4, title=spec['title'])
+    doc.build(_flowables(spec, lambda key: os.path.join(cache_dir, f'{key}.png'), getSampleStyleSheet()))
+    os.replace(tmp, path)
+    return path
+
+
+def _run(jobs, workers):
+    """Run [(fn, args), ...] in a process pool (sequentially without fork)."""
+    ctx = pool_context()
+    workers = min(workers or default_workers(), len(jobs))
+    if workers <= 1 or ctx is None:
+        return [fn(*a) for fn, a in jobs]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(fn, *a) for fn, a in jobs]
+        return [f.result() for f in futures]
+
+
+def build(sections, out, cache_dir=DEFAULT_CACHE_DIR, workers=None, title='Relatório de desempenho — TeaStore'):
+    """Render `sections` (Section list) into `out`; returns {'charts': (rendered, total), ...}."""
+    os.makedirs(cache_dir, exist_ok=True)
+    sections = [s for s in sections if s.blocks]
+    cover = Section(title)
+    cover.add(text(f"Gerado em {time.strftime('%Y-%m-%d %H:%M')}"))
+    cover.add(text(', '.join(s.title for s in sections)))
+    sections = [cover] + sections
+
+    charts = {}
+    for s in sections:
+        charts.update(s.charts)
+    missing = [key for key in charts if not os.path.exists(os.path.join(cache_dir, f'{key}.png'))]
+    if missing and not HAS_MATPLOTLIB:
+        print('⚠️  matplotlib não instalado: gráficos omitidos. Instale: pip install -r requirements.txt')
+        for s in sections:
+            s.blocks = [b for b in s.blocks if b.get('key') not in missing]
+        missing = []
+    # charts first: section fragments embed the PNGs
+    if missing:
+        _run([(render_chart, (charts[key], os.path.join(cache_dir, f'{key}.png'))) for key in missing], workers)
+
+    if not HAS_PYPDF:
+        # no fragment concatenation: one document, charts still come from the cache
+        print('⚠️  PyPDF2 não instalado: seções montadas num único documento (sem cache de seções).')
+        doc = SimpleDocTemplate(out, pagesize=A4, title=title)
+        styles = getSampleStyleSheet()
+        content = []
+        for s in sections:
+            content += _flowables(s.spec(), lambda key: os.path.join(cache_dir, f'{key}.png'), styles)
+            content.append(PageBreak())
+        doc.build(content[:-1])
+        return {'charts': (len(missing), len(charts)), 'sections': (len(sections), len(sections))}
+
+    # the cover changes with the date: it is never cached, the other sections are
+    fragments = []
+    section_jobs = []
+    for s in sections:
+        spec = s.spec()
+        key = artifact_key(spec)
+        path = os.path.join(cache_dir, f'{key}.pdf')
+        fragments.append(path)
+        if s is cover or not os.path.exists(path):
+            section_jobs.append((render_section, (spec, cache_dir, path)))
+    if section_jobs:
+        _run(section_jobs, workers)
+
+    writer = PdfWriter()
+    for path in fragments:
+        writer.append(path)
+    writer.add_metadata({'/Title': title})
+    tmp = _atomic_path(out)
+    with open(tmp, 'wb') as f:
+        writer.write(f)
+    os.replace(tmp, out)
+    return {'charts': (len(missing), len(charts)), 'sections': (len(section_jobs), len(sections))}
+
+
+# --- inputs ------------------------------------------------------------------
+def model_sections(model, max_points=MAX_POINTS, only=None):
+    """Sections of a run_model.RunModel (inputs it does not have are skipped)."""
+    wanted = lambda name: not only or name in only
+    sections = []
+    if model.jmeter and wanted('jmeter'):
+        sections.append(jmeter_section(model.jmeter_agg, max_points, model.jmeter_phases or None))
+    if (model.k6 or model.k6_raw) and wanted('k6'):
+        if model.k6_summary or model.k6_agg is not None:
+            sections.append(k6_section(model.k6_summary or None, model.k6_agg, max_points))
+        else:
+            print(f'⚠️  Resultados do k6 não encontrados: {model.k6 or model.k6_raw}')
+    if model.locust is not None and wanted('locust'):
+        sections.append(locust_section(model.locust, max_points))
+    columns = model.columns(only)
+    if len(columns) > 1:
+        sections.insert(0, summary_section(columns))
+    return sections
+
+
+def collect_sections(jmeter=None, k6=None, k6_raw=None, locust=None, workers=None, max_points=MAX_POINTS,
+                     only=None):
+    """Sections for the given inputs (missing files are skipped with a warning)."""
+    from run_model import RunModel
+
+    if jmeter and not os.path.exists(jmeter):
+        print(f'⚠️  JTL não encontrado: {jmeter}')
+    if (k6 or k6_raw) and not any(p and os.path.exists(p) for p in (k6, k6_raw)):
+        print(f'⚠️  Resultados do k6 não encontrados: {k6 or k6_raw}')
+    model = RunModel(jmeter, k6, k6_raw, locust, workers)
+    return model_sections(model, max_points, only)
+
+
+def main(argv=None, description='Relatório PDF unificado (JMeter, k6, Locust)', only=None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--jmeter', help='Arquivo .jtl (CSV) do JMeter')
+    parser.add_argument('--k6', help='Summary JSON do k6 (--summary-export / handleSummary)')
+    parser.add_argument('--k6-raw', help='Saída bruta do k6 (k6 run --out json=...) para grupos e séries')
+    parser.add_argument('--locust', help='Relatório do Locust: HTML, prefixo/arquivo CSV ou --json-file')
+    parser.add_argument('--out', default='relatorio.pdf', help='PDF de saída')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Cache dos artefatos renderizados')
+    parser.add_argument('--workers', type=int, default=0, help='Processos (0 = um por núcleo)')
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS, help='Pontos por linha nos gráficos')
+    args = parser.parse_args(argv)
+
+    if not HAS_REPORTLAB:
+        print('ERROR: reportlab não instalado. Pulei a geração de PDF. Instale: pip install -r requirements.txt')
+        sys.exit(0)
+    sections = collect_sections(args.jmeter, args.k6, args.k6_raw, args.locust, args.workers or None,
+                                args.max_points, only)
+    if not sections:
+        print('Nenhum resultado encontrado para o relatório.')
+        sys.exit(1)
+    start = time.time()
+    stats = build(sections, args.out, args.cache_dir, args.workers or None)
+    print(f"✅ PDF gerado: {args.out} ({time.time() - start:.1f}s; gráficos renderizados "
+          f"{stats['charts'][0]}/{stats['charts'][1]}, seções {stats['sections'][0]}/{stats['sections'][1]})")
+
+
+if __name__ == '__main__':
+    main()
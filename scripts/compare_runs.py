@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Statistical regression gate between two runs (baseline vs candidate).
+
+Each run is either a summary-unified.json written by generate_dashboard.py
+(its latency histograms), a JtlAggregate JSON, or a raw JTL/CSV (samples read
+through the columnar cache). Every endpoint, plus the aggregate, becomes a
+weighted distribution (distinct values and their counts), so the work below
+depends on the number of distinct latencies and not on the number of samples:
+
+  - bootstrap CIs of the p50/p95/p99 differences, drawing each replicate's
+    quantiles directly from their order-statistic distribution
+  - one-sided Mann-Whitney U (candidate slower), tie-corrected normal
+    approximation computed from the merged value counts
+
+An endpoint regresses when the Mann-Whitney test is significant AND the lower
+bound of the CI of some quantile difference exceeds the tolerance
+(max(--tolerance-pct of the baseline quantile, --tolerance-ms)). The exit
+code is 1 when any endpoint regresses, so CI can fail the build on it.
+
+Usage: python scripts/compare_runs.py <baseline> <candidate> [--tolerance-pct 5] [--out report.json]
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except Exception:
+    np = None
+    HAS_NUMPY = False
+
+from jtl_stream import JtlAggregate, LatencyHistogram, LOG_GAMMA, bucket_value
+
+QUANTILES = (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+AGGREGATED = 'Aggregated'
+# raw samples with more distinct values than this are binned like LatencyHistogram
+MAX_DISTINCT = 4096
+
+
+# --- loading ---------------------------------------------------------------
+def histogram_distribution(hist):
+    """(values, counts) of a LatencyHistogram, bucket values clamped to [min, max]."""
+    idx = sorted(hist.buckets)
+    values = [min(max(bucket_value(i), hist.min), hist.max) for i in idx]
+    counts = [hist.buckets[i] for i in idx]
+    if hist.zeros:
+        values.insert(0, min(0.0, hist.min))
+        counts.insert(0, hist.zeros)
+    return np.asarray(values, dtype=np.float64), np.asarray(counts, dtype=np.int64)
+
+
+def sample_distribution(samples):
+    """(values, counts) of raw samples."""
+    samples = np.asarray(samples, dtype=np.float64)
+    samples = samples[~np.isnan(samples)]
+    values, counts = np.unique(samples, return_counts=True)
+    if len(values) <= MAX_DISTINCT:
+        return values, counts
+    # too many distinct values (sub-ms timers): bin with the histogram's 1% accuracy
+    positive = samples > 0
+    idx, counts = np.unique(np.ceil(np.log(samples[positive]) / LOG_GAMMA).astype(np.int64),
+                            return_counts=True)
+    values = np.clip(2 * np.exp(idx * LOG_GAMMA) / (math.exp(LOG_GAMMA) + 1),
+                     samples[positive].min(), samples[positive].max())
+    zeros = int((~positive).sum())
+    if zeros:
+        values = np.r_[min(0.0, samples.min()), values]
+        counts = np.r_[zeros, counts]
+    return values, counts
+
+
+def _load_json(path, tool):
+    with open(path) as f:
+        data = json.load(f)
+    if 'histograms' in data:
+        # summary-unified.json: {'histograms': {tool: {'total': hist, 'labels': {label: hist}}}}
+        hists = data['histograms'].get(tool)
+        if not hists:
+            raise ValueError(f"{path}: sem histogramas para '{tool}' (gere com generate_dashboard.py)")
+        total = LatencyHistogram.from_dict(hists['total'])
+        labels = {k: LatencyHistogram.from_dict(v) for k, v in hists.get('labels', {}).items()}
+    elif 'total' in data and 'labels' in data:
+        agg = JtlAggregate.from_dict(data)
+        total = agg.total.hist
+        labels = {k: b.hist for k, b in agg.labels.items()}
+    else:
+        raise ValueError(f"{path}: JSON sem histogramas de latência")
+    dists = {label: histogram_distribution(h) for label, h in labels.items() if h.count}
+    if total.count:
+        dists[AGGREGATED] = histogram_distribution(total)
+    return dists
+
+
+def _load_samples(path, workers):
+    from results_cache import open_cache
+    table = open_cache(path, workers)
+    i_elapsed = table.index('elapsed')
+    if i_elapsed is None:
+        i_elapsed = 0
+    elapsed = np.asarray(table.column(i_elapsed), dtype=np.float64)
+    i_label = table.index('label')
+    dists = {AGGREGATED: sample_distribution(elapsed)}
+    if i_label is not None:
+        codes = np.asarray(table.column(i_label))
+        for code, label in enumerate(table.columns[i_label]['dictionary']):
+            mask = codes == code
+            if mask.any():
+                dists[label] = sample_distribution(elapsed[mask])
+    return dists
+
+
+def load_run(path, tool='jmeter', workers=None):
+    """{endpoint: (values, counts)} for a run file."""
+    if path.lower().endswith('.json'):
+        return _load_json(path, tool)
+    return _load_samples(path, workers)
+
+
+# --- statistics --------------------------------------------------------------
+def weighted_quantile(values, counts, q):
+    """Quantile of a weighted distribution (same rank convention as LatencyHistogram)."""
+    rank = q * (counts.sum() - 1)
+    return float(values[np.searchsorted(np.cumsum(counts), rank, side='right')])
+
+
+def bootstrap_quantiles(values, counts, qs, replicates, rng):
+    """(replicates, len(qs)) array of quantiles of bootstrap resamples.
+
+    The j-th smallest of n draws from a distribution is F^-1(U(j)), where U(j),
+    the j-th smallest of n uniforms, follows Beta(j, n - j + 1). Drawing that
+    Beta directly gives the exact bootstrap distribution of each quantile in
+    O(replicates * log(distinct values)), whatever the number of samples.
+    """
+    n = int(counts.sum())
+    cum = np.cumsum(counts)
+    out = np.empty((replicates, len(qs)))
+    for j, q in enumerate(qs):
+        k = int(q * (n - 1)) + 1
+        u = rng.beta(k, n - k + 1, size=replicates)
+        idx = np.searchsorted(cum, u * n, side='left')
+        out[:, j] = values[np.minimum(idx, len(values) - 1)]
+    return out
+
+
+def mann_whitney_greater(base, cand):
+    """One-sided Mann-Whitney U test that `cand` is stochastically greater.
+
+    Returns (p_value, probability that a candidate sample exceeds a baseline one).
+    """
+    (v1, c1), (v2, c2) = base, cand
+    values = np.union1d(v1, v2)
+    n1_at = np.zeros(len(values), dtype=np.float64)
+    n2_at = np.zeros(len(values), dtype=np.float64)
+    n1_at[np.searchsorted(values, v1)] = c1
+    n2_at[np.searchsorted(values, v2)] = c2
+    ties = n1_at + n2_at
+    n1, n2 = n1_at.sum(), n2_at.sum()
+    big_n = n1 + n2
+    midranks = np.cumsum(ties) - (ties - 1) / 2
+    u2 = float((n2_at * midranks).sum()) - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    tie_term = float((ties ** 3 - ties).sum()) / (big_n * (big_n - 1)) if big_n > 1 else 0.0
+    sigma = math.sqrt(n1 * n2 / 12 * ((big_n + 1) - tie_term))
+    if sigma == 0:
+        return 1.0, u2 / (n1 * n2)
+    z = (u2 - mean - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2)), u2 / (n1 * n2)
+
+
+def compare_endpoint(base, cand, args, rng):
+    qs = [q for _, q in QUANTILES]
+    boot = (bootstrap_quantiles(*cand, qs, args.replicates, rng)
+            - bootstrap_quantiles(*base, qs, args.replicates, rng))
+    tail = (1 - args.confidence) / 2
+    lows = np.quantile(boot, tail, axis=0)
+    highs = np.quantile(boot, 1 - tail, axis=0)
+    p_value, prob_slower = mann_whitney_greater(base, cand)
+    significant = p_value < args.alpha
+
+    result = {
+        'baseline_requests': int(base[1].sum()),
+        'candidate_requests': int(cand[1].sum()),
+        'mann_whitney_p': p_value,
+        'prob_candidate_slower': prob_slower,
+        'quantiles': {},
+        'regression': False,
+    }
+    for j, (key, q) in enumerate(QUANTILES):
+        b = weighted_quantile(*base, q)
+        c = weighted_quantile(*cand, q)
+        tolerance = max(abs(b) * args.tolerance_pct / 100.0, args.tolerance_ms)
+        regressed = significant and float(lows[j]) > tolerance
+        result['quantiles'][key] = {
+            'baseline_ms': b,
+            'candidate_ms': c,
+            'diff_ms': c - b,
+            'ci_low_ms': float(lows[j]),
+            'ci_high_ms': float(highs[j]),
+            'tolerance_ms': tolerance,
+            'regression': regressed,
+        }
+        result['regression'] = result['regression'] or regressed
+    return result
+
+
+def compare_runs(baseline, candidate, args):
+    rng = np.random.default_rng(args.seed)
+    report = {'endpoints': {}, 'skipped': [], 'regressions': []}
+    for name in sorted(set(baseline) & set(candidate), key=lambda n: (n == AGGREGATED, n)):
+        base, cand = baseline[name], candidate[name]
+        if base[1].sum() < args.min_samples or cand[1].sum() < args.min_samples:
+            report['skipped'].append(name)
+            continue
+        result = compare_endpoint(base, cand, args, rng)
+        report['endpoints'][name] = result
+        if result['regression']:
+            report['regressions'].append(name)
+    report['only_in_baseline'] = sorted(set(baseline) - set(candidate))
+    report['only_in_candidate'] = sorted(set(candidate) - set(baseline))
+    return report
+
+
+def print_report(report):
+    for name, r in report['endpoints'].items():
+        flag = '❌' if r['regression'] else '✅'
+        print(f"{flag} {name} (n={r['baseline_requests']}→{r['candidate_requests']}, "
+              f"Mann-Whitney p={r['mann_whitney_p']:.3g})")
+        for key, s in r['quantiles'].items():
+            mark = '  <-- regressão' if s['regression'] else ''
+            print(f"    {key}: {s['baseline_ms']:.1f} → {s['candidate_ms']:.1f} ms "
+                  f"(Δ {s['diff_ms']:+.1f}, IC [{s['ci_low_ms']:+.1f}, {s['ci_high_ms']:+.1f}], "
+                  f"tolerância {s['tolerance_ms']:.1f}){mark}")
+    if report['skipped']:
+        print(f"⚠️  Poucas amostras, ignorados: {', '.join(report['skipped'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara duas execuções e falha em regressão significativa")
+    parser.add_argument("baseline", help="summary-unified.json, JSON de agregado ou JTL/CSV da execução base")
+    parser.add_argument("candidate", help="Mesmo formato, execução candidata")
+    parser.add_argument("--tool", default="jmeter", help="Ferramenta dos histogramas em summary-unified.json")
+    parser.add_argument("--tolerance-pct", type=float, default=5.0,
+                        help="Piora tolerada, em %% do percentil da base (padrão 5)")
+    parser.add_argument("--tolerance-ms", type=float, default=0.0, help="Piora tolerada mínima em ms")
+    parser.add_argument("--alpha", type=float, default=0.01, help="Nível de significância do Mann-Whitney")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Nível dos intervalos bootstrap")
+    parser.add_argument("--replicates", type=int, default=2000, help="Réplicas bootstrap")
+    parser.add_argument("--min-samples", type=int, default=30, help="Amostras mínimas por endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=0, help="Processos para ler JTLs (0 = um por núcleo)")
+    parser.add_argument("--out", help="Relatório JSON de saída")
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        print("ERROR: numpy is required. Install with: pip install -r requirements.txt")
+        sys.exit(2)
+    for path in (args.baseline, args.candidate):
+        if not os.path.exists(path):
+            print(f"ERROR: arquivo não encontrado: {path}")
+            sys.exit(2)
+
+    baseline = load_run(args.baseline, args.tool, args.workers or None)
+    candidate = load_run(args.candidate, args.tool, args.workers or None)
+    report = compare_runs(baseline, candidate, args)
+    print_report(report)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if report['regressions']:
+        print(f"❌ Regressão significativa em: {', '.join(report['regressions'])}")
+        sys.exit(1)
+    print("✅ Nenhuma regressão significativa")
+
+
+if __name__ == '__main__':
+    main()
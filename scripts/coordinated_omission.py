@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Latency percentiles corrected for coordinated omission (Locust open model).
+
+Reads the <csv>_arrivals*.csv files written by locust-teastore/open_model.py.
+The corrected latency of a request is its response time plus the delay of
+its flow against the fixed-rate schedule, i.e. the time a real user arriving
+on schedule would have waited. Raw and corrected p50/p95/p99 are reported per
+request name and aggregated, with the achieved versus target flow rate.
+
+Usage: python scripts/coordinated_omission.py <arrivals.csv> [...] [--target-rate R] [--out file.json]
+"""
+import argparse
+import csv
+import json
+import sys
+
+from jtl_stream import LatencyHistogram
+
+QUANTILES = (('p50_ms', 0.5), ('p95_ms', 0.95), ('p99_ms', 0.99))
+
+
+class NameStats:
+    __slots__ = ('raw', 'corrected', 'delay', 'failures')
+
+    def __init__(self):
+        self.raw = LatencyHistogram()
+        self.corrected = LatencyHistogram()
+        self.delay = LatencyHistogram()
+        self.failures = 0
+
+    def add(self, response_time, delay, success):
+        self.raw.add(response_time)
+        self.corrected.add(response_time + delay)
+        self.delay.add(delay)
+        if not success:
+            self.failures += 1
+
+    def to_dict(self):
+        out = {'requests': self.raw.count, 'failures': self.failures}
+        for key, q in QUANTILES:
+            out[key] = self.raw.quantile(q)
+            out['corrected_' + key] = self.corrected.quantile(q)
+        out['schedule_delay_p95_ms'] = self.delay.quantile(0.95)
+        out['schedule_delay_max_ms'] = self.delay.max
+        return out
+
+
+def analyze(paths, target_rate=None):
+    names = {}
+    total = NameStats()
+    flows = set()
+    first = last = None
+    for path in paths:
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    rt = float(row['Response Time'])
+                    delay = float(row['Schedule Delay'])
+                    intended = float(row['Intended Start'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                success = row.get('Success', 'True') == 'True'
+                stats = names.get(row['Name'])
+                if stats is None:
+                    stats = names[row['Name']] = NameStats()
+                stats.add(rt, delay, success)
+                total.add(rt, delay, success)
+                # one flow per (file, intended start); it actually began `delay` later
+                flows.add((path, intended))
+                started = intended + delay / 1000.0
+                first = started if first is None else min(first, started)
+                last = started if last is None else max(last, started)
+
+    achieved = None
+    if flows and last is not None and last > first:
+        achieved = (len(flows) - 1) / (last - first)
+    return {
+        'target_rate': target_rate,
+        'flows': len(flows),
+        'achieved_rate': achieved,
+        'aggregated': total.to_dict(),
+        'endpoints': {name: s.to_dict() for name, s in sorted(names.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Percentis corrigidos de coordinated omission (modelo aberto)")
+    parser.add_argument("arrivals", nargs="+", help="Arquivos *_arrivals*.csv do Locust")
+    parser.add_argument("--target-rate", type=float, help="Taxa alvo (LOCUST_ARRIVAL_RATE) para comparação")
+    parser.add_argument("--out", help="JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    result = analyze(args.arrivals, args.target_rate)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+    agg = result['aggregated']
+    if agg['requests']:
+        print(f"p95 bruto: {agg['p95_ms']:.1f} ms | p95 corrigido: {agg['corrected_p95_ms']:.1f} ms",
+              file=sys.stderr)
+    if args.target_rate and result['achieved_rate'] is not None \
+            and result['achieved_rate'] < 0.95 * args.target_rate:
+        print(f"⚠️  Taxa atingida {result['achieved_rate']:.2f}/s abaixo da alvo {args.target_rate:.2f}/s: "
+              "aumente -u (pool de usuários) ou o sistema não sustenta a carga.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
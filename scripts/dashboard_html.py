@@ -0,0 +1,233 @@
+"""Self-contained interactive dashboard: one HTML file, no external assets.
+
+Per-second series are aggregated and downsampled in Python (downsample.py),
+then all of them are packed into a single float32 buffer, zlib-compressed
+and embedded as base64. The page only inflates that buffer
+(DecompressionStream) and draws the lines on canvases, so its weight and
+rendering cost depend on the point budget, not on the length of the run.
+"""
+import array
+import base64
+import html
+import json
+import sys
+import zlib
+
+from downsample import downsample
+
+MAX_POINTS = 1500
+
+CHARTS = (
+    ('rps', 'Throughput (req/s)'),
+    ('p95', 'Tempo de resposta p95 (ms)'),
+    ('errors', 'Taxa de erro (%)'),
+    ('p95_labels', 'p95 por endpoint (ms)'),
+    ('users', 'Usuários simulados (Locust)'),
+)
+
+
+class SeriesPack:
+    """(x, y) series downsampled and stored back to back in one float32 buffer."""
+
+    def __init__(self, max_points=MAX_POINTS, method='lttb'):
+        self.max_points = max_points
+        self.method = method
+        self.values = array.array('f')
+        self.series = []
+
+    def add(self, chart, tool, name, xs, ys):
+        xs, ys = downsample(xs, ys, self.max_points, self.method)
+        if not xs:
+            return
+        self.series.append({'chart': chart, 'tool': tool, 'name': name,
+                            'offset': len(self.values), 'n': len(xs)})
+        self.values.extend(xs)
+        self.values.extend(ys)
+
+    def encode(self):
+        values = self.values
+        if sys.byteorder != 'little':
+            values = array.array('f', values)
+            values.byteswap()
+        return base64.b64encode(zlib.compress(values.tobytes(), 9)).decode('ascii')
+
+
+def add_aggregate(pack, tool, agg, per_label=True):
+    """Throughput, p95 and error-rate series of a JtlAggregate (JMeter, k6)."""
+    total = agg.series()
+    xs = [x for x, _ in total]
+    width = agg.bucket_width()
+    pack.add('rps', tool, 'total', xs, [b.count / width if b else 0 for _, b in total])
+    pack.add('p95', tool, 'total', xs, [b.hist.quantile(0.95) if b else None for _, b in total])
+    pack.add('errors', tool, 'total', xs, [100.0 * b.errors / b.count if b else None for _, b in total])
+    if per_label:
+        for label in sorted(agg.label_seconds):
+            series = agg.series(label)
+            pack.add('p95_labels', tool, label, [x for x, _ in series],
+                     [b.hist.quantile(0.95) if b else None for _, b in series])
+
+
+def add_locust_history(pack, history):
+    """Series of a Locust history (locust_report's normalized 'history' list)."""
+    points = [p for p in history if isinstance(p.get('time'), (int, float)) and p.get('rps') is not None]
+    if not points:
+        return
+    first = points[0]['time']
+    xs = [p['time'] - first for p in points]
+    pack.add('rps', 'locust', 'total', xs, [p['rps'] for p in points])
+    pack.add('p95', 'locust', 'total', xs, [p['p95_ms'] for p in points])
+    pack.add('errors', 'locust', 'total', xs,
+             [100.0 * (p['fail_per_s'] or 0) / p['rps'] if p['rps'] else None for p in points])
+    pack.add('users', 'locust', 'usuários', xs, [p['users'] for p in points])
+
+
+def _fmt(value):
+    if value is None:
+        return '—'
+    if isinstance(value, float):
+        return f'{value:,.2f}'
+    return html.escape(str(value))
+
+
+def summary_table(columns, rows):
+    """HTML table: `columns` = {heading: {row key: value}}, `rows` = [(key, label)]."""
+    head = ''.join(f'<th>{html.escape(c)}</th>' for c in columns)
+    body = ''.join(
+        f'<tr><th>{html.escape(label)}</th>' + ''.join(f'<td>{_fmt(col.get(key))}</td>' for col in columns.values())
+        + '</tr>' for key, label in rows)
+    return f'<table><tr><th></th>{head}</tr>{body}</table>'
+
+
+def endpoint_table(stats, fields):
+    """HTML table of {endpoint: {field: value}} with `fields` = [(key, heading)]."""
+    head = ''.join(f'<th>{html.escape(h)}</th>' for _, h in fields)
+    body = ''.join(
+        f'<tr><td>{html.escape(name)}</td>' + ''.join(f'<td>{_fmt(row.get(k))}</td>' for k, _ in fields) + '</tr>'
+        for name, row in sorted(stats.items()))
+    return f'<table><tr><th>Endpoint</th>{head}</tr>{body}</table>'
+
+
+def render(title, sections, pack):
+    """Complete HTML page; `sections` = [(heading, html fragment)], charts first."""
+    manifest = {'charts': [{'id': c, 'title': t} for c, t in CHARTS
+                           if any(s['chart'] == c for s in pack.series)],
+                'series': pack.series}
+    body = ''.join(f'<section><h2>{html.escape(h)}</h2>{fragment}</section>' for h, fragment in sections)
+    return (_PAGE.replace('__TITLE__', html.escape(title))
+            .replace('__SECTIONS__', body)
+            .replace('__MANIFEST__', json.dumps(manifest, ensure_ascii=False).replace('</', '<\\/'))
+            .replace('__DATA__', pack.encode()))
+
+
+_PAGE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body{font-family:system-ui,sans-serif;margin:0 auto;max-width:1200px;padding:16px;color:#222}
+h1{margin-bottom:4px}section{margin:24px 0}
+table{border-collapse:collapse;font-size:13px;margin:8px 0}
+th,td{border:1px solid #ddd;padding:4px 8px;text-align:right}th:first-child,td:first-child{text-align:left}
+.chart{position:relative;margin:12px 0}.chart canvas{width:100%;height:260px;border:1px solid #eee}
+.legend span{cursor:pointer;margin-right:12px;font-size:12px;user-select:none}.legend span.off{opacity:.35}
+.tip{position:absolute;pointer-events:none;background:#fff;border:1px solid #ccc;font-size:12px;padding:4px 6px;display:none;white-space:pre}
+.warn{color:#c00;font-weight:bold}
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<div id="charts"></div>
+__SECTIONS__
+<script id="manifest" type="application/json">__MANIFEST__</script>
+<script>
+const DATA = "__DATA__";
+const COLORS = ['#1f77b4','#ff7f0e','#2ca02c','#d62728','#9467bd','#8c564b','#e377c2','#7f7f7f','#bcbd22','#17becf'];
+
+async function inflate(b64) {
+  const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+  return new Float32Array(await new Response(stream).arrayBuffer());
+}
+
+function drawChart(root, chart, series) {
+  // titles, tools and JTL labels are data: text nodes only, never innerHTML
+  const box = document.createElement('div'); box.className = 'chart';
+  box.innerHTML = '<h3></h3><div class="legend"></div><canvas></canvas><div class="tip"></div>';
+  box.querySelector('h3').textContent = chart.title;
+  root.appendChild(box);
+  const canvas = box.querySelector('canvas'), tip = box.querySelector('.tip'), legend = box.querySelector('.legend');
+  series.forEach((s, i) => {
+    s.color = COLORS[i % COLORS.length]; s.on = true;
+    const item = document.createElement('span'), swatch = document.createElement('b');
+    swatch.style.color = s.color; swatch.textContent = String.fromCharCode(9632);
+    item.append(swatch, ' ' + s.tool + ' · ' + s.name);
+    item.onclick = () => { s.on = !s.on; item.classList.toggle('off', !s.on); paint(); };
+    legend.appendChild(item);
+  });
+  const pad = {l: 56, r: 12, t: 10, b: 24};
+  let scale = null;
+  function paint() {
+    const dpr = window.devicePixelRatio || 1, w = canvas.clientWidth, h = canvas.clientHeight;
+    canvas.width = w * dpr; canvas.height = h * dpr;
+    const ctx = canvas.getContext('2d'); ctx.scale(dpr, dpr); ctx.clearRect(0, 0, w, h);
+    let x0 = Infinity, x1 = -Infinity, y1 = 0;
+    for (const s of series) if (s.on) for (let i = 0; i < s.n; i++) {
+      if (s.x[i] < x0) x0 = s.x[i]; if (s.x[i] > x1) x1 = s.x[i]; if (s.y[i] > y1) y1 = s.y[i];
+    }
+    if (!isFinite(x0)) return;
+    if (x1 === x0) x1 = x0 + 1; if (y1 === 0) y1 = 1;
+    const sx = v => pad.l + (v - x0) / (x1 - x0) * (w - pad.l - pad.r);
+    const sy = v => h - pad.b - v / y1 * (h - pad.t - pad.b);
+    scale = {x0, x1, w};
+    ctx.strokeStyle = '#eee'; ctx.fillStyle = '#666'; ctx.font = '11px sans-serif';
+    for (let k = 0; k <= 4; k++) {
+      const v = y1 * k / 4, y = sy(v);
+      ctx.beginPath(); ctx.moveTo(pad.l, y); ctx.lineTo(w - pad.r, y); ctx.stroke();
+      ctx.fillText(v.toFixed(v < 10 ? 1 : 0), 4, y + 4);
+    }
+    for (let k = 0; k <= 5; k++) {
+      const v = x0 + (x1 - x0) * k / 5;
+      ctx.fillText(Math.round(v) + ' s', sx(v) - 12, h - 6);
+    }
+    for (const s of series) {
+      if (!s.on) continue;
+      ctx.strokeStyle = s.color; ctx.lineWidth = 1.2; ctx.beginPath();
+      for (let i = 0; i < s.n; i++) (i ? ctx.lineTo : ctx.moveTo).call(ctx, sx(s.x[i]), sy(s.y[i]));
+      ctx.stroke();
+    }
+  }
+  canvas.addEventListener('mousemove', e => {
+    if (!scale) return;
+    const r = canvas.getBoundingClientRect();
+    const xv = scale.x0 + (e.clientX - r.left - pad.l) / (scale.w - pad.l - pad.r) * (scale.x1 - scale.x0);
+    const lines = [Math.round(xv) + ' s'];
+    for (const s of series) {
+      if (!s.on || !s.n) continue;
+      let lo = 0, hi = s.n - 1;
+      while (lo < hi) { const mid = (lo + hi) >> 1; if (s.x[mid] < xv) lo = mid + 1; else hi = mid; }
+      lines.push(s.tool + ' · ' + s.name + ': ' + s.y[lo].toFixed(1));
+    }
+    tip.textContent = lines.join('\\n'); tip.style.display = 'block';
+    tip.style.left = (e.clientX - r.left + 12) + 'px'; tip.style.top = (e.clientY - r.top + 30) + 'px';
+  });
+  canvas.addEventListener('mouseleave', () => { tip.style.display = 'none'; });
+  window.addEventListener('resize', paint);
+  paint();
+}
+
+(async () => {
+  const manifest = JSON.parse(document.getElementById('manifest').textContent);
+  const root = document.getElementById('charts');
+  if (!manifest.series.length) return;
+  const values = await inflate(DATA);
+  for (const s of manifest.series) {
+    s.x = values.subarray(s.offset, s.offset + s.n);
+    s.y = values.subarray(s.offset + s.n, s.offset + 2 * s.n);
+  }
+  for (const chart of manifest.charts) drawChart(root, chart, manifest.series.filter(s => s.chart === chart.id));
+})();
+</script>
+</body>
+</html>
+"""
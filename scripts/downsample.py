@@ -0,0 +1,101 @@
+"""Downsampling of (x, y) series to a fixed point budget before plotting.
+
+- lttb: Largest-Triangle-Three-Buckets, keeps the visual shape of a line.
+- minmax: keeps the min and max of every bucket, so spikes are never lost.
+
+Both return the input unchanged when it already fits the budget, so plotting
+cost is bounded by `max_points` whatever the length of the run.
+"""
+
+
+def lttb(xs, ys, max_points):
+    n = len(xs)
+    if max_points >= n or max_points < 3:
+        return list(xs), list(ys)
+    out_x = [xs[0]]
+    out_y = [ys[0]]
+    every = (n - 2) / (max_points - 2)
+    a = 0
+    for i in range(max_points - 2):
+        # average of the next bucket is the third triangle vertex
+        start = int((i + 1) * every) + 1
+        end = min(int((i + 2) * every) + 1, n)
+        span = max(1, end - start)
+        avg_x = sum(xs[start:end]) / span
+        avg_y = sum(ys[start:end]) / span
+
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best = lo
+        best_area = -1.0
+        for j in range(lo, hi):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        out_x.append(xs[best])
+        out_y.append(ys[best])
+        a = best
+    out_x.append(xs[-1])
+    out_y.append(ys[-1])
+    return out_x, out_y
+
+
+def minmax(xs, ys, max_points):
+    n = len(xs)
+    if max_points >= n or max_points < 2:
+        return list(xs), list(ys)
+    buckets = max(1, max_points // 2)
+    every = n / buckets
+    out_x = []
+    out_y = []
+    for i in range(buckets):
+        lo = int(i * every)
+        hi = max(lo + 1, int((i + 1) * every))
+        j_min = min(range(lo, hi), key=ys.__getitem__)
+        j_max = max(range(lo, hi), key=ys.__getitem__)
+        for j in sorted({j_min, j_max}):
+            out_x.append(xs[j])
+            out_y.append(ys[j])
+    return out_x, out_y
+
+
+METHODS = {'lttb': lttb, 'minmax': minmax}
+
+
+def downsample(xs, ys, max_points, method='lttb'):
+    """Downsample after dropping points whose y is None (empty buckets)."""
+    pairs = [(x, y) for x, y in zip(xs, ys) if y is not None]
+    if not pairs:
+        return [], []
+    xs, ys = [p[0] for p in pairs], [p[1] for p in pairs]
+    return METHODS[method](xs, ys, max_points)
+
+
+def downsample_runs(xs, ys, max_points, method='lttb'):
+    """Downsample keeping the gaps: each run of non-None points is reduced on
+    its own, with a share of the budget proportional to its length, and runs
+    come back separated by a None y (plotted as NaN, i.e. a break in the line)."""
+    runs = []
+    current = None
+    for x, y in zip(xs, ys):
+        if y is None:
+            current = None
+            continue
+        if current is None:
+            current = ([], [])
+            runs.append(current)
+        current[0].append(x)
+        current[1].append(y)
+    total = sum(len(r[0]) for r in runs)
+    out_x, out_y = [], []
+    for run_x, run_y in runs:
+        if out_x:
+            out_x.append(run_x[0])
+            out_y.append(None)
+        budget = max(3, round(max_points * len(run_x) / total))
+        run_x, run_y = METHODS[method](run_x, run_y, budget)
+        out_x.extend(run_x)
+        out_y.extend(run_y)
+    return out_x, out_y
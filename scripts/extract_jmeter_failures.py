@@ -1,62 +1,146 @@
 #!/usr/bin/env python3
 """Extract failures from a JMeter JTL (CSV or XML) and save response bodies as HTML files.
 
+Both formats are streamed (CSV in parallel byte-range shards, XML with
+iterparse and element clearing), so memory does not grow with the file.
+Each distinct response body is written once, named by its content hash;
+failures that returned the same error page share that file.
+
 Usage: python scripts/extract_jmeter_failures.py <jtl-file> <out-dir>
-Produces: out-dir/failure_<n>.html and out-dir/failures-summary.json
+Produces: out-dir/body_<hash>.html and out-dir/failures-summary.json
 """
 import sys
 import os
 import json
+import hashlib
+from functools import partial
 from xml.etree import ElementTree as ET
 
-
-def extract_from_csv(path, out_dir):
-    try:
-        import pandas as pd
-    except Exception:
-        print("ERROR: pandas is required to parse CSV JTL. Install with: pip install -r requirements.txt")
-        raise
-    df = pd.read_csv(path)
-    df.columns = [c.lower() for c in df.columns]
+from jtl_parallel import map_shards
+
+
+class BodyStore:
+    """Writes each distinct body once under out_dir/body_<hash>.html."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.counts = {}
+        self.first_index = {}
+
+    def add(self, index, body, n=1):
+        digest = hashlib.sha256(body.encode('utf-8', errors='ignore')).hexdigest()[:32]
+        if digest not in self.counts:
+            self.counts[digest] = 0
+            self.first_index[digest] = index
+            fname = self.path(digest)
+            if not os.path.exists(fname):
+                # tmp + rename: parallel shards may find the same body at once
+                tmp = f'{fname}.{os.getpid()}.tmp'
+                with open(tmp, 'w', encoding='utf-8', errors='ignore') as f:
+                    f.write(body)
+                os.replace(tmp, fname)
+        self.counts[digest] += n
+        return digest
+
+    def path(self, digest):
+        return os.path.join(self.out_dir, f'body_{digest}.html')
+
+    def merge(self, other):
+        for digest, n in other.counts.items():
+            if digest not in self.counts:
+                self.counts[digest] = 0
+                self.first_index[digest] = other.first_index[digest]
+            else:
+                self.first_index[digest] = min(self.first_index[digest], other.first_index[digest])
+            self.counts[digest] += n
+        return self
+
+
+def _extract_csv_shard(rows, columns, first_row, out_dir):
+    store = BodyStore(out_dir)
     # try to find responseData or success
-    resp_col = None
-    for c in df.columns:
+    resp_idx = None
+    for k, c in enumerate(columns.names):
         if 'responsedata' in c or 'response_data' in c or 'response' == c:
-            resp_col = c
-            break
-
-    success_col = None
-    for c in df.columns:
-        if c == 'success':
-            success_col = c
+            resp_idx = k
             break
+    if resp_idx is None:
+        return [], store
+    success_idx = columns.success
 
     failures = []
-    for i, row in df.iterrows():
+    for i, row in enumerate(rows, start=first_row):
         is_fail = False
-        if success_col:
-            is_fail = str(row[success_col]).strip().lower() not in ('true', '1', 't')
-        if resp_col and (is_fail or pd.notna(row[resp_col])):
-            body = str(row[resp_col]) if pd.notna(row[resp_col]) else ''
-            fname = os.path.join(out_dir, f'failure_{i+1}.html')
-            with open(fname, 'w', encoding='utf-8', errors='ignore') as f:
-                f.write(body)
-            failures.append({'index': int(i), 'file': fname})
+        if success_idx is not None and success_idx < len(row):
+            is_fail = row[success_idx].strip().lower() not in ('true', '1', 't')
+        body = row[resp_idx] if resp_idx < len(row) else ''
+        if is_fail or body:
+            failures.append({'index': int(i), 'hash': store.add(i, body)})
+
+    return failures, store
 
-    return failures
+
+def extract_from_csv(path, out_dir, workers=None):
+    # byte-range shards parsed in parallel (a single shard when response data is saved)
+    failures = []
+    store = BodyStore(out_dir)
+    for part, part_store in map_shards(path, partial(_extract_csv_shard, out_dir=out_dir),
+                                       workers, number_rows=True):
+        failures.extend(part)
+        store.merge(part_store)
+    return failures, store
+
+
+def extract_from_table(table, out_dir):
+    """Same as extract_from_csv over a results_cache.CachedTable: each distinct body is hashed once."""
+    import numpy as np
+    store = BodyStore(out_dir)
+    resp_idx = None
+    for k, c in enumerate(n.strip().lower() for n in table.names):
+        if 'responsedata' in c or 'response_data' in c or 'response' == c:
+            resp_idx = k
+            break
+    if resp_idx is None or table.columns[resp_idx]['kind'] != 'dict':
+        return [], store
+    dictionary = table.columns[resp_idx]['dictionary']
+    codes = np.asarray(table.column(resp_idx))
+    keep = codes != (dictionary.index('') if '' in dictionary else -1)
+    success_idx = table.index('success')
+    if success_idx is not None:
+        true_codes = [c for c, v in enumerate(table.columns[success_idx]['dictionary'])
+                      if v.strip().lower() in ('true', '1', 't')]
+        keep |= ~np.isin(np.asarray(table.column(success_idx)), true_codes)
+    rows = np.flatnonzero(keep)
+    kept = codes[rows]
+    uniq, first, counts = np.unique(kept, return_index=True, return_counts=True)
+    digests = {}
+    for k in np.argsort(first):
+        digests[int(uniq[k])] = store.add(int(rows[first[k]]), dictionary[uniq[k]], int(counts[k]))
+    failures = [{'index': i, 'hash': digests[c]} for i, c in zip(rows.tolist(), kept.tolist())]
+    return failures, store
 
 
 def extract_from_xml(path, out_dir):
-    tree = ET.parse(path)
-    root = tree.getroot()
+    store = BodyStore(out_dir)
     failures = []
     i = 0
-    for elem in root:
+    depth = 0
+    root = None
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            # only top-level samples; nested sub-samples stay inside their parent
+            continue
         # sample elements may be httpSample or sample
         tag = elem.tag
         if 'sample' in tag.lower() or 'httpsample' in tag.lower():
             i += 1
-            success = elem.get('s') or elem.get('success') or elem.get('success')
+            success = elem.get('s') or elem.get('success')
             # locate responseData child
             resp = None
             for child in elem:
@@ -67,12 +151,36 @@ def extract_from_xml(path, out_dir):
             if success is not None and success.lower() in ('false', '0'):
                 is_fail = True
             if is_fail or (resp and resp.strip()):
-                fname = os.path.join(out_dir, f'failure_{i}.html')
-                with open(fname, 'w', encoding='utf-8', errors='ignore') as f:
-                    f.write(resp or '')
-                failures.append({'index': i, 'file': fname})
+                failures.append({'index': i, 'hash': store.add(i, resp or '')})
+        # drop the processed sample so the tree never holds more than one
+        root.clear()
+
+    return failures, store
 
-    return failures
+
+def extract_failures(path, out_dir, workers=None, table=None):
+    """Extract the failures of `path` into out_dir; returns the failures-summary.json dict.
+
+    `table` (the columnar cache of a CSV JTL) replaces a new parse of the text.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if table is not None and table.index('success') is not None:
+        failures, store = extract_from_table(table, out_dir)
+    elif path.lower().endswith('.csv'):
+        failures, store = extract_from_csv(path, out_dir, workers)
+    else:
+        # try xml
+        failures, store = extract_from_xml(path, out_dir)
+
+    bodies = [{'hash': digest, 'file': store.path(digest), 'count': n,
+               'first_index': store.first_index[digest]}
+              for digest, n in sorted(store.counts.items(), key=lambda kv: -kv[1])]
+    summary = {'source': path, 'count': len(failures), 'distinct_bodies': len(bodies),
+               'bodies': bodies, 'failures': failures}
+    summary_path = os.path.join(out_dir, 'failures-summary.json')
+    with open(summary_path, 'w') as s:
+        json.dump(summary, s, indent=2)
+    return summary
 
 
 def main():
@@ -82,24 +190,13 @@ def main():
 
     path = sys.argv[1]
     out_dir = sys.argv[2]
-    os.makedirs(out_dir, exist_ok=True)
-    failures = []
     try:
-        if path.lower().endswith('.csv'):
-            failures = extract_from_csv(path, out_dir)
-        else:
-            # try xml
-            failures = extract_from_xml(path, out_dir)
+        summary = extract_failures(path, out_dir)
     except Exception as e:
         print('Error extracting failures:', e)
         sys.exit(2)
 
-    summary = {'source': path, 'count': len(failures), 'failures': failures}
-    summary_path = os.path.join(out_dir, 'failures-summary.json')
-    with open(summary_path, 'w') as s:
-        json.dump(summary, s, indent=2)
-
-    print('Extracted', len(failures), 'failures to', out_dir)
+    print('Extracted', summary['count'], 'failures to', out_dir, f"({summary['distinct_bodies']} distinct bodies)")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""Failure signature clustering across JMeter, k6 and Locust for triage.
+
+Every failure is reduced to a signature (endpoint, status, message) whose
+message has the variable parts masked: UUIDs, timestamps, session ids and
+tokens, hex ids, IPs, e-mails and numbers. Identical signatures are counted
+in a dict (one pass, constant work per failure; the masking is cached per
+raw message), so millions of failures cost one parse of the inputs.
+
+Near-duplicate signatures (same status, messages differing in a few words)
+are then grouped with a 64-bit SimHash over the distinct message words:
+signatures within --distance bits are merged. Candidates are found by
+splitting the hash in 16 bands of 4 bits, so only signatures sharing a band
+are compared (hashes up to 15 bits apart always share one). On the TeaStore
+messages single-word variants land 3-12 bits apart and unrelated errors 14+.
+Clusters are ranked by count, with first/last occurrence, tools and the
+endpoints hit.
+
+Sources:
+  --jtl       JMeter JTL (CSV): success=false, failureMessage or responseMessage
+  --k6-raw    k6 NDJSON (--out json): requests with expected_response=false and failed checks
+  --k6        k6 summary export: failed checks (counts only; ignored with --k6-raw)
+  --locust-csv  Locust --csv prefix: <prefix>_failures.csv and <prefix>_exceptions.csv
+                (aggregated by Locust: counts only, no timestamps)
+
+Usage: python scripts/failure_clusters.py --jtl results.jtl --k6-raw k6-raw.json \\
+           --locust-csv locust-teastore/complex [--out failure-clusters.json] [--top 20]
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from jtl_parallel import default_workers, iter_shard_lines, map_shards, pool_context
+from jtl_stream import TRUE_VALUES
+from k6_stream import _loads, parse_time_ms, plan_line_shards
+
+DEFAULT_DISTANCE = 13
+BANDS = 16
+BAND_BITS = 64 // BANDS
+# signatures compared per band bucket: keeps the grouping linear when a
+# bucket is crowded (they would have been merged with its first members)
+MAX_BUCKET_COMPARES = 32
+MAX_MESSAGE = 300
+
+# (pattern, replacement), applied in order: the specific shapes before numbers
+MASKS = [(re.compile(p, re.I), r) for p, r in (
+    (r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', '<uuid>'),
+    (r'\b\d{4}-\d{2}-\d{2}[ t]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:z|[+-]\d{2}:?\d{2})?', '<ts>'),
+    (r'\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b', '<ts>'),
+    # key names stand alone (not teastore-auth:8080); numeric values fall through to <n>
+    (r'(?<![\w-])(jsessionid|sessionid|session|sid|token|access_token|csrf|nonce|auth)([=:]\s*)(?!\d+\b)[^\s;&,"\']+',
+     r'\1\2<token>'),
+    (r'\bbearer\s+[^\s"\']+', 'Bearer <token>'),
+    (r'[\w.+-]+@[\w-]+\.[\w.-]+', '<email>'),
+    (r'\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b', '<ip>'),
+    (r'\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b', '<hex>'),
+    (r'\b(?=[\w+/=-]*\d)(?=[\w+/=-]*[a-z])[\w+/=-]{20,}', '<token>'),
+    (r'\d+(?:\.\d+)?', '<n>'),
+)]
+_SPACES = re.compile(r'\s+')
+_TOKENS = re.compile(r'<\w+>|\w+')
+_LOCUST_STATUS = re.compile(r'\b([1-5]\d\d) (?:Client|Server) Error')
+
+
+@lru_cache(maxsize=65536)
+def normalize(message):
+    """Message with ids, timestamps, tokens and numbers masked."""
+    text = message or ''
+    for pattern, repl in MASKS:
+        text = pattern.sub(repl, text)
+    return _SPACES.sub(' ', text).strip()[:MAX_MESSAGE]
+
+
+def simhash(text):
+    """64-bit SimHash of the words of `text`."""
+    # distinct words only: with bigrams, or a word repeated (teastore-image ...
+    # /image), one changed word moves several features of a short message
+    tokens = _TOKENS.findall(text.lower())
+    if not tokens:
+        return 0
+    weights = [0] * 64
+    for feature in set(tokens):
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'little')
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, w in enumerate(weights) if w > 0)
+
+
+class Signature:
+    """Counts of one (endpoint, status, masked message) signature."""
+
+    __slots__ = ('count', 'first', 'last', 'tools', 'example')
+
+    def __init__(self, example):
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.tools = {}
+        self.example = example
+
+    def add(self, tool, ts, n):
+        self.count += n
+        self.tools[tool] = self.tools.get(tool, 0) + n
+        if ts is not None:
+            self.first = ts if self.first is None else min(self.first, ts)
+            self.last = ts if self.last is None else max(self.last, ts)
+
+    def merge(self, other):
+        self.count += other.count
+        for tool, n in other.tools.items():
+            self.tools[tool] = self.tools.get(tool, 0) + n
+        for ts in (other.first, other.last):
+            if ts is not None:
+                self.first = ts if self.first is None else min(self.first, ts)
+                self.last = ts if self.last is None else max(self.last, ts)
+
+
+class FailureIndex:
+    """Exact signatures -> Signature; mergeable across shards and tools."""
+
+    def __init__(self):
+        self.signatures = {}
+
+    def add(self, tool, endpoint, status, message, ts=None, n=1):
+        key = (endpoint or '', str(status or ''), normalize(message))
+        sig = self.signatures.get(key)
+        if sig is None:
+            sig = self.signatures[key] = Signature((message or '')[:MAX_MESSAGE])
+        sig.add(tool, ts, n)
+
+    def merge(self, other):
+        for key, sig in other.signatures.items():
+            mine = self.signatures.get(key)
+            if mine is None:
+                self.signatures[key] = sig
+            else:
+                mine.merge(sig)
+        return self
+
+    @property
+    def total(self):
+        return sum(sig.count for sig in self.signatures.values())
+
+    def clusters(self, max_distance=DEFAULT_DISTANCE):
+        """Near-duplicate groups of signatures, largest first."""
+        # largest first, so crowded buckets are compared against their heads
+        keys = sorted(self.signatures, key=lambda k: -self.signatures[k].count)
+        parent = list(range(len(keys)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        hashes = {}
+        buckets = {}
+        mask = (1 << BAND_BITS) - 1
+        for i, (_, status, message) in enumerate(keys):
+            # the same masked message on several endpoints is one cluster
+            h = hashes.get((status, message))
+            if h is None:
+                h = hashes[(status, message)] = simhash(message)
+            for band in range(BANDS):
+                bucket = buckets.setdefault((status, band, h >> band * BAND_BITS & mask), [])
+                for j, hj in bucket[:MAX_BUCKET_COMPARES]:
+                    if bin(h ^ hj).count('1') <= max_distance:
+                        a, b = find(i), find(j)
+                        if a != b:
+                            parent[max(a, b)] = min(a, b)
+                bucket.append((i, h))
+
+        groups = {}
+        for i in range(len(keys)):
+            groups.setdefault(find(i), []).append(i)
+        out = []
+        for members in groups.values():
+            out.append(_cluster([(keys[i], self.signatures[keys[i]]) for i in members]))
+        out.sort(key=lambda c: -c['count'])
+        for rank, cluster in enumerate(out, 1):
+            cluster['rank'] = rank
+        return out
+
+
+def _cluster(members):
+    members.sort(key=lambda m: -m[1].count)
+    (_, status, message), top = members[0]
+    count = sum(sig.count for _, sig in members)
+    firsts = [sig.first for _, sig in members if sig.first is not None]
+    lasts = [sig.last for _, sig in members if sig.last is not None]
+    tools, endpoints, statuses = {}, {}, {}
+    for (endpoint, st, _), sig in members:
+        endpoints[endpoint] = endpoints.get(endpoint, 0) + sig.count
+        statuses[st] = statuses.get(st, 0) + sig.count
+        for tool, n in sig.tools.items():
+            tools[tool] = tools.get(tool, 0) + n
+    return {
+        'signature': message or (f'HTTP {status}' if status else '(sem mensagem)'),
+        'status': status,
+        'example': top.example,
+        'count': count,
+        'first_ms': min(firsts) if firsts else None,
+        'last_ms': max(lasts) if lasts else None,
+        'tools': tools,
+        'endpoints': dict(sorted(endpoints.items(), key=lambda kv: -kv[1])),
+        'statuses': statuses,
+        'variants': len(members),
+    }
+
+
+# --- sources -----------------------------------------------------------------
+def _jtl_failures(rows, columns, first_row):
+    index = FailureIndex()
+    names = columns.names
+    i_success = columns.success
+    if i_success is None:
+        return index
+    i_label, i_ts = columns.label, columns.timestamp
+    i_code = names.index('responsecode') if 'responsecode' in names else None
+    i_msg = names.index('responsemessage') if 'responsemessage' in names else None
+    i_fail = names.index('failuremessage') if 'failuremessage' in names else None
+
+    def cell(row, i):
+        return row[i] if i is not None and i < len(row) else ''
+
+    for row in rows:
+        if i_success >= len(row) or row[i_success].strip().lower() in TRUE_VALUES:
+            continue
+        code = cell(row, i_code)
+        message = cell(row, i_fail) or cell(row, i_msg)
+        try:
+            ts = float(cell(row, i_ts))
+        except ValueError:
+            ts = None
+        index.add('jmeter', cell(row, i_label), code, message, ts)
+    return index
+
+
+def jtl_failures(path, workers=None):
+    index = FailureIndex()
+    for part in map_shards(path, _jtl_failures, workers):
+        index.merge(part)
+    return index
+
+
+def table_failures(table):
+    """FailureIndex of a results_cache.CachedTable (failed rows grouped with numpy)."""
+    import numpy as np
+    index = FailureIndex()
+    i_success = table.index('success')
+    if i_success is None:
+        return index
+    true_codes = [c for c, s in enumerate(table.columns[i_success]['dictionary']) if s.strip().lower() in TRUE_VALUES]
+    failed = ~np.isin(np.asarray(table.column(i_success)), true_codes)
+    if not failed.any():
+        return index
+    fields = [table.index(name) for name in ('label', 'responsecode', 'failuremessage', 'responsemessage')]
+    keys = np.column_stack([np.asarray(table.column(k))[failed].astype(np.float64) if k is not None
+                            else np.zeros(int(failed.sum())) for k in fields])
+    groups, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    first = last = None
+    i_ts = table.index('timestamp')
+    if i_ts is not None and table.columns[i_ts]['kind'] == 'num':
+        ts = np.asarray(table.column(i_ts))[failed]
+        first = np.full(len(groups), np.inf)
+        last = np.full(len(groups), -np.inf)
+        np.fmin.at(first, inverse, ts)
+        np.fmax.at(last, inverse, ts)
+
+    def cell(k, value):
+        if k is None or value != value:
+            return ''
+        column = table.columns[k]
+        if column['kind'] == 'dict':
+            return column['dictionary'][int(value)]
+        return str(int(value)) if value == int(value) else str(value)
+
+    for g, key in enumerate(groups):
+        label, code, fail, msg = (cell(k, v) for k, v in zip(fields, key))
+        index.add('jmeter', label, code, fail or msg,
+                  None if first is None or not np.isfinite(first[g]) else float(first[g]), int(counts[g]))
+        if last is not None and np.isfinite(last[g]):
+            index.add('jmeter', label, code, fail or msg, float(last[g]), 0)
+    return index
+
+
+_K6_TAGS = ('"metric":"http_req_duration"', '"metric":"checks"')
+
+
+def add_k6_line(index, line):
+    """Count one k6 NDJSON line in `index` when it is a failed request or check."""
+    if '"type":"Point"' not in line or not any(tag in line for tag in _K6_TAGS):
+        return
+    # every request has one duration point; checks are 1 (passed) or 0
+    if '"http_req_duration"' in line:
+        if '"expected_response":"false"' not in line:
+            return
+    elif '"value":0' not in line:
+        return
+    try:
+        point = _loads(line)
+        data = point['data']
+        tags = data.get('tags') or {}
+    except (ValueError, KeyError, TypeError):
+        return
+    if point['metric'] == 'checks':
+        if float(data.get('value', 1)) != 0:
+            return
+        message = f"check falhou: {tags.get('check', '')}"
+    else:
+        status = tags.get('status', '')
+        # without an error tag the status alone is the signature
+        message = tags.get('error') or ('' if status and status != '0' else 'erro de rede')
+    try:
+        ts = parse_time_ms(data['time'])
+    except (KeyError, ValueError):
+        ts = None
+    endpoint = (tags.get('group') or '').lstrip(':') or tags.get('name', '')
+    index.add('k6', endpoint, tags.get('status', ''), message, ts)
+
+
+def _k6_shard(path, start, end):
+    index = FailureIndex()
+    for line in iter_shard_lines(path, start, end):
+        add_k6_line(index, line)
+    return index
+
+
+def k6_raw_failures(path, workers=None):
+    shards = plan_line_shards(path, workers or default_workers())
+    ctx = pool_context()
+    index = FailureIndex()
+    if len(shards) == 1 or ctx is None:
+        for start, end in shards:
+            index.merge(_k6_shard(path, start, end))
+        return index
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=ctx) as pool:
+        futures = [pool.submit(_k6_shard, path, start, end) for start, end in shards]
+        for future in futures:
+            index.merge(future.result())
+    return index
+
+
+def k6_summary_failures(path):
+    """Failed checks of a k6 summary export (no timestamps)."""
+    with open(path) as f:
+        summary = json.load(f)
+    index = FailureIndex()
+
+    def walk(group, name):
+        for check in group.get('checks', []) or []:
+            if check.get('fails'):
+                index.add('k6', name, '', f"check falhou: {check.get('name', '')}", None, int(check['fails']))
+        for sub in group.get('groups', []) or []:
+            walk(sub, sub.get('name', ''))
+
+    walk(summary.get('root_group', {}), '')
+    return index
+
+
+def locust_failures(prefix):
+    """Locust's aggregated failures/exceptions CSVs (counts, no timestamps)."""
+    index = FailureIndex()
+    path = f'{prefix}_failures.csv'
+    if os.path.exists(path):
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                error = row.get('Error', '')
+                match = _LOCUST_STATUS.search(error)
+                endpoint = f"{row.get('Method', '')} {row.get('Name', '')}".strip()
+                index.add('locust', endpoint, match.group(1) if match else '', error, None,
+                          int(float(row.get('Occurrences') or 1)))
+    path = f'{prefix}_exceptions.csv'
+    if os.path.exists(path):
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                index.add('locust', '(exceção)', '', row.get('Message', ''), None, int(float(row.get('Count') or 1)))
+    return index
+
+
+# --- report ------------------------------------------------------------------
+def print_clusters(clusters, total, top):
+    print(f'{total} falhas em {len(clusters)} clusters')
+    for c in clusters[:top]:
+        share = c['count'] / total if total else 0
+        tools = ', '.join(f'{t} {n}' for t, n in sorted(c['tools'].items()))
+        endpoints = ', '.join(list(c['endpoints'])[:3]) + (' …' if len(c['endpoints']) > 3 else '')
+        print(f"\n#{c['rank']} {c['count']} ({share:.1%}) status {c['status'] or '-'} [{tools}]")
+        print(f"   {c['signature']}")
+        print(f"   endpoints: {endpoints or '-'}  variantes: {c['variants']}")
+        if c['first_ms'] is not None:
+            print(f"   de {_clock(c['first_ms'])} a {_clock(c['last_ms'])}")
+
+
+def _clock(ms):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(ms / 1000)) + 'Z'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Agrupa falhas de JMeter, k6 e Locust por assinatura')
+    parser.add_argument('--jtl', action='append', default=[], help='JTL (CSV) do JMeter; pode repetir')
+    parser.add_argument('--k6-raw', action='append', default=[], help='Saída NDJSON do k6 (--out json)')
+    parser.add_argument('--k6', action='append', default=[], help='Summary export do k6 (só checks)')
+    parser.add_argument('--locust-csv', action='append', default=[], help='Prefixo --csv do Locust')
+    parser.add_argument('--distance', type=int, default=DEFAULT_DISTANCE,
+                        help='Distância máxima (bits de SimHash) para juntar assinaturas parecidas')
+    parser.add_argument('--workers', type=int, default=0, help='Processos de parsing (0 = um por núcleo)')
+    parser.add_argument('--top', type=int, default=20, help='Clusters exibidos')
+    parser.add_argument('--out', help='Grava todos os clusters neste arquivo JSON')
+    args = parser.parse_args()
+
+    workers = args.workers or None
+    index = FailureIndex()
+    for path in args.jtl:
+        if os.path.exists(path):
+            index.merge(jtl_failures(path, workers))
+    for path in args.k6_raw:
+        if os.path.exists(path):
+            index.merge(k6_raw_failures(path, workers))
+    if not args.k6_raw:
+        for path in args.k6:
+            if os.path.exists(path):
+                index.merge(k6_summary_failures(path))
+    for prefix in args.locust_csv:
+        index.merge(locust_failures(prefix))
+
+    total = index.total
+    if not total:
+        print('✅ Nenhuma falha encontrada.')
+        clusters = []
+    else:
+        clusters = index.clusters(args.distance)
+        print_clusters(clusters, total, args.top)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'total': total, 'signatures': len(index.signatures), 'clusters': clusters},
+                      f, indent=2, ensure_ascii=False)
+        print(f'\n✅ Clusters gravados em {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""Synthetic result files at realistic sizes, for benchmarking the report scripts.
+
+Writes the same formats the CI produces, with the TeaStore label mix:
+
+  jtl      JMeter JTL, CSV (same 17 columns as the CI) or XML (--xml)
+  locust   Locust --csv output: <prefix>_stats_history.csv (full history:
+           one row per endpoint per second plus Aggregated), _stats.csv and
+           _failures.csv
+  k6       k6 NDJSON (--out json): Metric declarations, then per request
+           http_reqs, http_req_duration, http_req_waiting, http_req_connecting
+           and http_req_failed points, plus one checks point; and a summary
+           export next to it (<out>-summary.json)
+
+--rows counts data rows (JTL samples, history rows, NDJSON lines) and
+accepts 1M / 10M / 100M style sizes. Requests arrive as a Poisson process at
+--rate req/s; response times are log-normal around each label's median, a
+--failure-rate fraction fails (HTTP 500 with varying ids in the message,
+404, socket timeouts). Rows are generated in numpy blocks and streamed to
+disk, so memory does not depend on --rows. The output is reproducible for a
+given --seed.
+
+Usage: python scripts/gen_results.py jtl 1M results.csv [--xml] [--failure-rate 0.02]
+       python scripts/gen_results.py locust 1M out/locust
+       python scripts/gen_results.py k6 10M k6-raw.json
+       python scripts/gen_results.py jtl 1M x.csv --labels "GET Home=30:80,GET Produto=70:120"
+"""
+import argparse
+import json
+import sys
+import time
+from xml.sax.saxutils import quoteattr
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except Exception:
+    np = None
+    HAS_NUMPY = False
+
+BLOCK = 200_000
+START_MS = 1763400000000
+# label, weight, median response time (ms), response size (bytes)
+DEFAULT_MIX = (
+    ('GET Home', 20, 80, 9100),
+    ('GET Login Page', 10, 60, 10100),
+    ('POST Login Action', 10, 150, 10400),
+    ('GET Categoria', 25, 120, 14800),
+    ('GET Produto', 25, 100, 11900),
+    ('POST Logout', 10, 50, 9000),
+)
+SIGMA = 0.55
+KEEPALIVE = 0.9  # fraction of samples reusing a connection (Connect = 0)
+# failure kinds: (share, responseCode, responseMessage, failureMessage template)
+FAILURES = (
+    (0.6, '500', 'Internal Server Error', 'Test failed: code expected to be 200; productId={id}'),
+    (0.25, '404', 'Not Found', ''),
+    (0.15, 'Non HTTP response code: java.net.SocketTimeoutException',
+     'Non HTTP response message: Read timed out', ''),
+)
+JTL_HEADER = ('timeStamp,elapsed,label,responseCode,responseMessage,threadName,dataType,success,'
+              'failureMessage,bytes,sentBytes,grpThreads,allThreads,URL,Latency,IdleTime,Connect')
+URL = 'http://localhost:8080/tools.descartes.teastore.webui/'
+
+
+def parse_rows(text):
+    """'1M' -> 1000000 ('10k', '2.5M', '100000' also accepted)."""
+    text = text.strip().lower().replace('_', '')
+    scale = {'k': 1_000, 'm': 1_000_000, 'g': 1_000_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def parse_mix(spec):
+    """'LABEL=WEIGHT[:MEDIAN_MS],...' -> mix tuples (sizes from DEFAULT_MIX or 10 kB)."""
+    if not spec:
+        return DEFAULT_MIX
+    sizes = {label: size for label, _, _, size in DEFAULT_MIX}
+    mix = []
+    for item in spec.split(','):
+        label, _, rest = item.rpartition('=')
+        weight, _, median = rest.partition(':')
+        mix.append((label.strip(), float(weight), float(median or 100), sizes.get(label.strip(), 10000)))
+    return tuple(mix)
+
+
+class Samples:
+    """Blocks of synthetic samples (numpy arrays), in timestamp order."""
+
+    def __init__(self, mix=DEFAULT_MIX, failure_rate=0.01, rate=2000.0, threads=200, seed=42):
+        self.mix = mix
+        self.failure_rate = failure_rate
+        self.rate = rate
+        self.threads = threads
+        self.rng = np.random.default_rng(seed)
+        weights = np.array([m[1] for m in mix], dtype=float)
+        self.p = weights / weights.sum()
+        self.medians = np.array([m[2] for m in mix], dtype=float)
+        self.sizes = np.array([m[3] for m in mix], dtype=float)
+        self.clock = float(START_MS)
+
+    def block(self, n):
+        rng = self.rng
+        gaps = rng.exponential(1000.0 / self.rate, n)
+        ts = self.clock + np.cumsum(gaps)
+        self.clock = float(ts[-1])
+        label = rng.choice(len(self.mix), n, p=self.p)
+        elapsed = np.maximum(1, self.medians[label] * rng.lognormal(0, SIGMA, n)).astype(np.int64)
+        failed = rng.random(n) < self.failure_rate
+        kind = np.where(failed, rng.choice(len(FAILURES), n, p=[f[0] for f in FAILURES]), -1)
+        connect = np.where(rng.random(n) < KEEPALIVE, 0, rng.integers(1, 25, n))
+        latency = np.maximum(connect, (elapsed * rng.uniform(0.6, 0.98, n)).astype(np.int64))
+        nbytes = (self.sizes[label] * rng.uniform(0.95, 1.05, n)).astype(np.int64)
+        nbytes = np.where(failed, 980, nbytes)
+        return {
+            'ts': ts.astype(np.int64), 'label': label, 'elapsed': elapsed, 'kind': kind,
+            'connect': connect, 'latency': latency, 'bytes': nbytes,
+            'thread': rng.integers(1, self.threads + 1, n), 'id': rng.integers(1, 500, n),
+        }
+
+
+def _blocks(samples, rows):
+    done = 0
+    while done < rows:
+        n = min(BLOCK, rows - done)
+        yield samples.block(n)
+        done += n
+
+
+# --- JMeter ------------------------------------------------------------------
+def write_jtl_csv(path, rows, samples):
+    labels = [m[0] for m in samples.mix]
+    fail_fields = [(code, msg, tmpl) for _, code, msg, tmpl in FAILURES]
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(JTL_HEADER + '\n')
+        for b in _blocks(samples, rows):
+            lines = []
+            for ts, li, el, kind, ct, lat, nb, th, ident in zip(
+                    b['ts'].tolist(), b['label'].tolist(), b['elapsed'].tolist(), b['kind'].tolist(),
+                    b['connect'].tolist(), b['latency'].tolist(), b['bytes'].tolist(),
+                    b['thread'].tolist(), b['id'].tolist()):
+                if kind < 0:
+                    code, msg, ok, fmsg = '200', 'OK', 'true', ''
+                else:
+                    code, msg, tmpl = fail_fields[kind]
+                    ok, fmsg = 'false', tmpl.format(id=ident)
+                lines.append(f'{ts},{el},{labels[li]},{code},{msg},Usuários 1-{th},text,{ok},{fmsg},'
+                             f'{nb},{180 + li},{samples.threads},{samples.threads},{URL},{lat},0,{ct}\n')
+            f.write(''.join(lines))
+
+
+def write_jtl_xml(path, rows, samples):
+    labels = [quoteattr(m[0]) for m in samples.mix]
+    fail_fields = [(quoteattr(code), quoteattr(msg), tmpl) for _, code, msg, tmpl in FAILURES]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<testResults version="1.2">\n')
+        for b in _blocks(samples, rows):
+            lines = []
+            for ts, li, el, kind, ct, lat, nb, th, ident in zip(
+                    b['ts'].tolist(), b['label'].tolist(), b['elapsed'].tolist(), b['kind'].tolist(),
+                    b['connect'].tolist(), b['latency'].tolist(), b['bytes'].tolist(),
+                    b['thread'].tolist(), b['id'].tolist()):
+                head = (f'<httpSample t="{el}" it="0" lt="{lat}" ct="{ct}" ts="{ts}" s="{"true" if kind < 0 else "false"}" '
+                        f'lb={labels[li]} ')
+                tail = f' tn="Usuários 1-{th}" dt="text" by="{nb}" sby="{180 + li}" ng="{samples.threads}" na="{samples.threads}"'
+                if kind < 0:
+                    lines.append(f'{head}rc="200" rm="OK"{tail}/>\n')
+                    continue
+                code, msg, tmpl = fail_fields[kind]
+                lines.append(f'{head}rc={code} rm={msg}{tail}>')
+                if tmpl:
+                    lines.append('<assertionResult><name>Response Assertion</name><failure>true</failure>'
+                                 f'<error>false</error><failureMessage>{tmpl.format(id=ident)}</failureMessage>'
+                                 '</assertionResult>')
+                lines.append(f'<responseData class="java.lang.String">&lt;html&gt;erro {ident}&lt;/html&gt;'
+                             '</responseData></httpSample>\n')
+            f.write(''.join(lines))
+        f.write('</testResults>\n')
+
+
+# --- Locust ------------------------------------------------------------------
+HISTORY_HEADER = ('Timestamp,User Count,Type,Name,Requests/s,Failures/s,50%,66%,75%,80%,90%,95%,98%,99%,'
+                  '99.9%,99.99%,100%,Total Request Count,Total Failure Count,Total Median Response Time,'
+                  'Total Average Response Time,Total Min Response Time,Total Max Response Time,'
+                  'Total Average Content Size')
+STATS_HEADER = ('Type,Name,Request Count,Failure Count,Median Response Time,Average Response Time,'
+                'Min Response Time,Max Response Time,Average Content Size,Requests/s,Failures/s,'
+                '50%,66%,75%,80%,90%,95%,98%,99%,99.9%,99.99%,100%')
+QUANTILES = (0.5, 0.66, 0.75, 0.8, 0.9, 0.95, 0.98, 0.99, 0.999, 0.9999, 1.0)
+Z = {0.5: 0.0, 0.66: 0.412, 0.75: 0.674, 0.8: 0.842, 0.9: 1.282, 0.95: 1.645, 0.98: 2.054,
+     0.99: 2.326, 0.999: 3.09, 0.9999: 3.719, 1.0: 4.265}
+
+
+def _locust_name(label):
+    method, _, name = label.partition(' ')
+    return (method, '/' + name.lower().replace(' ', '-')) if name else ('GET', '/' + label.lower())
+
+
+def write_locust(prefix, rows, samples):
+    """Full history CSV (rows = history rows), plus the final stats and failures CSVs."""
+    rng = samples.rng
+    endpoints = [_locust_name(m[0]) for m in samples.mix]
+    seconds = max(1, rows // (len(endpoints) + 1))
+    names = endpoints + [('', 'Aggregated')]
+    totals = np.zeros((len(names), 2))
+    spread = np.exp(SIGMA * np.array([Z[q] for q in QUANTILES]))
+    t0 = START_MS // 1000
+    users = max(1, samples.threads)
+    per_label = samples.rate * samples.p
+    with open(f'{prefix}_stats_history.csv', 'w', newline='') as f:
+        f.write(HISTORY_HEADER + '\n')
+        for start in range(0, seconds, 10_000):
+            n = min(10_000, seconds - start)
+            ramp = np.minimum(1.0, (np.arange(start, start + n) + 1) / 60.0)
+            # load drifts a little around the target; latency grows with it
+            load = ramp[:, None] * rng.uniform(0.9, 1.1, (n, len(endpoints)))
+            rps = per_label[None, :] * load
+            fails = rps * samples.failure_rate * rng.uniform(0.5, 1.5, (n, len(endpoints)))
+            scale = samples.medians[None, :] * (0.9 + 0.3 * load)
+            weights = rps / rps.sum(axis=1, keepdims=True)
+            # endpoints then Aggregated, as Locust writes them
+            rps = np.hstack([rps, rps.sum(axis=1, keepdims=True)])
+            fails = np.hstack([fails, fails.sum(axis=1, keepdims=True)])
+            scale = np.hstack([scale, (scale * weights).sum(axis=1, keepdims=True)]).astype(np.int64)
+            size = np.hstack([np.broadcast_to(samples.sizes, weights.shape),
+                              (samples.sizes * weights).sum(axis=1, keepdims=True)])
+            cum_req = (totals[:, 0] + np.cumsum(rps, axis=0)).astype(np.int64)
+            cum_fail = (totals[:, 1] + np.cumsum(fails, axis=0)).astype(np.int64)
+            totals[:, 0] += rps.sum(axis=0)
+            totals[:, 1] += fails.sum(axis=0)
+            pct = (scale[:, :, None] * spread).astype(np.int64).tolist()
+            u = (users * ramp).astype(np.int64).tolist()
+            lines = []
+            for i, (r_rps, r_fail, r_pct, r_med, r_req, r_tf, r_size) in enumerate(zip(
+                    rps.tolist(), fails.tolist(), pct, scale.tolist(), cum_req.tolist(), cum_fail.tolist(),
+                    size.tolist())):
+                head = f'{t0 + start + i},{u[i]},'
+                for k, (method, name) in enumerate(names):
+                    med = r_med[k]
+                    lines.append(f'{head}{method},{name},{r_rps[k]:.6f},{r_fail[k]:.6f},'
+                                 f'{",".join(map(str, r_pct[k]))},{r_req[k]},{r_tf[k]},{med},{med * 1.16:.4f},'
+                                 f'1.0,{med * 12:.4f},{r_size[k]:.1f}\n')
+            f.write(''.join(lines))
+    with open(f'{prefix}_stats.csv', 'w', newline='') as f:
+        f.write(STATS_HEADER + '\n')
+        for k, (method, name) in enumerate(endpoints):
+            med = samples.medians[k]
+            pct = ','.join(str(int(med * np.exp(SIGMA * Z[q]))) for q in QUANTILES)
+            f.write(f'{method},{name},{int(totals[k, 0])},{int(totals[k, 1])},{int(med)},{med * 1.16:.4f},'
+                    f'1.0,{med * 12:.4f},{samples.sizes[k]:.1f},{totals[k, 0] / seconds:.6f},'
+                    f'{totals[k, 1] / seconds:.6f},{pct}\n')
+        med = float((samples.medians * samples.p).sum())
+        pct = ','.join(str(int(med * np.exp(SIGMA * Z[q]))) for q in QUANTILES)
+        f.write(f',Aggregated,{int(totals[-1, 0])},{int(totals[-1, 1])},{int(med)},{med * 1.16:.4f},'
+                f'1.0,{med * 12:.4f},{float((samples.sizes * samples.p).sum()):.1f},'
+                f'{totals[-1, 0] / seconds:.6f},{totals[-1, 1] / seconds:.6f},{pct}\n')
+    with open(f'{prefix}_failures.csv', 'w', newline='') as f:
+        f.write('Method,Name,Error,Occurrences\n')
+        for k, (method, name) in enumerate(endpoints):
+            for share, code, msg, _ in FAILURES:
+                count = int(totals[k, 1] * share)
+                if count and code.isdigit():
+                    kind = 'Server' if code.startswith('5') else 'Client'
+                    f.write(f'{method},{name},"HTTPError(\'{code} {kind} Error: {msg} for url: {name}\')",{count}\n')
+                elif count:
+                    f.write(f'{method},{name},"ReadTimeout(\'Read timed out. (read timeout=30)\')",{count}\n')
+
+
+# --- k6 ----------------------------------------------------------------------
+K6_METRICS = (('http_reqs', 'counter', 'default'), ('http_req_duration', 'trend', 'time'),
+              ('http_req_waiting', 'trend', 'time'), ('http_req_connecting', 'trend', 'time'),
+              ('http_req_failed', 'rate', 'default'), ('checks', 'rate', 'default'))
+LINES_PER_REQUEST = 6
+SUMMARY_SAMPLE = 1_000_000
+
+
+def _k6_time(ms, cache={}):
+    sec, frac = divmod(ms, 1000)
+    prefix = cache.get(sec)
+    if prefix is None:
+        if len(cache) > 4096:
+            cache.clear()
+        prefix = cache[sec] = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(sec))
+    return f'{prefix}.{int(frac * 1000):06d}Z'
+
+
+def write_k6(path, rows, samples):
+    """NDJSON with `rows` lines (declarations included) and its summary export."""
+    groups = [m[0] for m in samples.mix]
+    checks = [f'{g} status 200' for g in groups]
+    requests = max(1, (rows - len(K6_METRICS)) // LINES_PER_REQUEST)
+    durations = []
+    kept = 0
+    counts = np.zeros((len(groups), 2), dtype=np.int64)
+    first = last = None
+    with open(path, 'w') as f:
+        for metric, kind, contains in K6_METRICS:
+            f.write(json.dumps({'type': 'Metric', 'data': {'name': metric, 'type': kind, 'contains': contains,
+                                                            'thresholds': [], 'submetrics': None},
+                                'metric': metric}, separators=(',', ':')) + '\n')
+        for b in _blocks(samples, requests):
+            ts = b['ts']
+            dur = b['elapsed'] * samples.rng.uniform(0.97, 1.0, len(ts))
+            wait = b['latency'].astype(float)
+            conn = b['connect'].astype(float)
+            failed = b['kind'] >= 0
+            np.add.at(counts, (b['label'], failed.astype(np.int64)), 1)
+            if kept < SUMMARY_SAMPLE:
+                durations.append(dur[:SUMMARY_SAMPLE - kept])
+                kept += len(durations[-1])
+            first = first if first is not None else int(ts[0])
+            last = int(ts[-1])
+            lines = []
+            for t, li, d, w, c, bad, kind in zip(ts.tolist(), b['label'].tolist(), dur.tolist(), wait.tolist(),
+                                                 conn.tolist(), failed.tolist(), b['kind'].tolist()):
+                stamp = _k6_time(t)
+                status = FAILURES[kind][1] if bad and FAILURES[kind][1].isdigit() else ('0' if bad else '200')
+                tags = (f'{{"expected_response":"{"false" if bad else "true"}","group":"::{groups[li]}",'
+                        f'"method":"GET","name":"{URL}","proto":"HTTP/1.1","scenario":"default","status":"{status}"}}')
+                lines.append(f'{{"metric":"http_reqs","type":"Point","data":{{"time":"{stamp}","value":1,"tags":{tags}}}}}\n'
+                             f'{{"metric":"http_req_duration","type":"Point","data":{{"time":"{stamp}","value":{d:.4f},"tags":{tags}}}}}\n'
+                             f'{{"metric":"http_req_waiting","type":"Point","data":{{"time":"{stamp}","value":{w:.4f},"tags":{tags}}}}}\n'
+                             f'{{"metric":"http_req_connecting","type":"Point","data":{{"time":"{stamp}","value":{c:.4f},"tags":{tags}}}}}\n'
+                             f'{{"metric":"http_req_failed","type":"Point","data":{{"time":"{stamp}","value":{1 if bad else 0},"tags":{tags}}}}}\n'
+                             f'{{"metric":"checks","type":"Point","data":{{"time":"{stamp}","value":{0 if bad else 1},'
+                             f'"tags":{{"check":"{checks[li]}","group":"::{groups[li]}","scenario":"default"}}}}}}\n')
+            f.write(''.join(lines))
+    sample = np.concatenate(durations)
+    span = max(1.0, (last - first) / 1000.0)
+    total, fails = int(counts.sum()), int(counts[:, 1].sum())
+    summary = {
+        'root_group': {'name': '', 'path': '', 'checks': [], 'groups': [
+            {'name': g, 'path': f'::{g}', 'groups': [], 'checks': [
+                {'name': checks[k], 'path': f'::{g}::{checks[k]}',
+                 'passes': int(counts[k, 0]), 'fails': int(counts[k, 1])}]}
+            for k, g in enumerate(groups)]},
+        'metrics': {
+            'http_req_duration': {'type': 'trend', 'contains': 'time', 'values': {
+                'avg': float(sample.mean()), 'min': float(sample.min()), 'med': float(np.median(sample)),
+                'max': float(sample.max()), 'p(90)': float(np.quantile(sample, 0.9)),
+                'p(95)': float(np.quantile(sample, 0.95))}},
+            'http_reqs': {'type': 'counter', 'contains': 'default', 'values': {'count': total, 'rate': total / span}},
+            'http_req_failed': {'type': 'rate', 'contains': 'default', 'values': {
+                'rate': fails / total, 'passes': fails, 'fails': total - fails}},
+            'checks': {'type': 'rate', 'contains': 'default', 'values': {
+                'rate': 1 - fails / total, 'passes': total - fails, 'fails': fails}},
+        },
+    }
+    summary_path = k6_summary_path(path)
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary_path
+
+
+def k6_summary_path(path):
+    return (path[:-5] if path.endswith('.json') else path) + '-summary.json'
+
+
+def generate(kind, rows, out, mix=DEFAULT_MIX, failure_rate=0.01, rate=2000.0, threads=200, seed=42, xml=False):
+    samples = Samples(mix, failure_rate, rate, threads, seed)
+    if kind == 'jtl':
+        (write_jtl_xml if xml else write_jtl_csv)(out, rows, samples)
+    elif kind == 'locust':
+        write_locust(out, rows, samples)
+    elif kind == 'k6':
+        write_k6(out, rows, samples)
+    else:
+        raise ValueError(f'tipo desconhecido: {kind}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera resultados sintéticos (JTL, Locust, k6) em escala')
+    parser.add_argument('kind', choices=('jtl', 'locust', 'k6'))
+    parser.add_argument('rows', type=parse_rows, help='Linhas de dados (ex.: 1M, 10M, 100M)')
+    parser.add_argument('out', help='Arquivo de saída (prefixo --csv para locust)')
+    parser.add_argument('--xml', action='store_true', help='JTL em XML em vez de CSV')
+    parser.add_argument('--labels', help='Mix "LABEL=PESO[:MEDIANA_MS],..." (padrão: mix do TeaStore)')
+    parser.add_argument('--failure-rate', type=float, default=0.01, help='Fração de requisições com falha')
+    parser.add_argument('--rate', type=float, default=2000.0, help='Requisições/s simuladas')
+    parser.add_argument('--threads', type=int, default=200, help='Usuários/threads simulados')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    if not HAS_NUMPY:
+        print('ERROR: numpy is required. Install with: pip install -r requirements.txt')
+        sys.exit(1)
+    started = time.perf_counter()
+    generate(args.kind, args.rows, args.out, parse_mix(args.labels), args.failure_rate, args.rate,
+             args.threads, args.seed, args.xml)
+    elapsed = time.perf_counter() - started
+    print(f'✅ {args.rows} linhas ({args.kind}) em {args.out} ({elapsed:.1f}s, {args.rows / elapsed:,.0f} linhas/s)')
+
+
+if __name__ == '__main__':
+    main()
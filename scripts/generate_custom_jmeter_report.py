@@ -1,8 +1,14 @@
-import csv
+import argparse
 import os
 from collections import defaultdict
+from functools import partial
 
-# Endpoints que devem aparecer no relatório
+import results_cache
+from jtl_parallel import map_shards
+from jtl_stream import JtlAggregate, add_rows
+from results_cache import aggregate_table
+
+# Endpoints que devem aparecer no relatório (padrão; configurável via --endpoints)
 ENDPOINTS = [
     'GET Home',
     'GET Login Page',
@@ -15,24 +21,158 @@ ENDPOINTS = [
 CSV_PATH = os.path.join('jmeter-teastore', 'results-complexos.csv')
 HTML_PATH = os.path.join('jmeter-teastore', 'report-complexos', 'index.html')
 
-def parse_jmeter_csv(csv_path):
+# Apdex: satisfied <= T, tolerating <= 4T, failed samples are frustrated
+DEFAULT_APDEX_T_MS = 500
+
+
+def _apdex_rows(rows, columns, counts, thresholds, default_t):
+    """Yield `rows` unchanged, counting satisfied / tolerating samples per label on the way."""
+    i_label = columns.label
+    for row in rows:
+        yield row
+        try:
+            elapsed = float(row[columns.elapsed])
+        except (ValueError, IndexError):
+            continue
+        if columns.failed(row):
+            continue
+        label = row[i_label] if i_label is not None and i_label < len(row) else ''
+        t = thresholds.get(label, default_t)
+        if elapsed <= t:
+            counts[label][0] += 1
+        elif elapsed <= 4 * t:
+            counts[label][1] += 1
+
+
+def _apdex_shard(rows, columns, first_row, thresholds, default_t):
+    counts = defaultdict(lambda: [0, 0])
+    for _ in _apdex_rows(rows, columns, counts, thresholds, default_t):
+        pass
+    return dict(counts)
+
+
+def _report_shard(rows, columns, first_row, thresholds, default_t):
+    # aggregate and Apdex counts from the same pass over the shard's text
+    counts = defaultdict(lambda: [0, 0])
+    agg = add_rows(JtlAggregate(), _apdex_rows(rows, columns, counts, thresholds, default_t), columns)
+    return agg, dict(counts)
+
+
+def _merge_counts(counts, part):
+    for label, (sat, tol) in part.items():
+        counts[label][0] += sat
+        counts[label][1] += tol
+
+
+def _apdex_cached(table, thresholds, default_t):
+    np = results_cache.np
+    i_elapsed = table.index('elapsed')
+    if i_elapsed is None:
+        i_elapsed = 0
+    i_label = table.index('label')
+    success = results_cache.success_codes(table)
+    labels = table.columns[i_label]['dictionary'] if i_label is not None else ['']
+    t_by_code = np.array([thresholds.get(label, default_t) for label in labels], dtype=np.float64)
+    satisfied = np.zeros(len(labels), dtype=np.int64)
+    tolerating = np.zeros(len(labels), dtype=np.int64)
+    for part in table.parts:
+        elapsed = np.asarray(table.part_column(part, i_elapsed))
+        codes = (np.asarray(table.part_column(part, i_label)) if i_label is not None
+                 else np.zeros(len(elapsed), dtype=np.int32))
+        ok = ~np.isnan(elapsed)
+        if success is not None:
+            ok &= np.isin(np.asarray(table.part_column(part, success[0])), success[1])
+        t = t_by_code[codes]
+        satisfied += np.bincount(codes[ok & (elapsed <= t)], minlength=len(labels))
+        tolerating += np.bincount(codes[ok & (elapsed > t) & (elapsed <= 4 * t)], minlength=len(labels))
+    return {label: [int(satisfied[c]), int(tolerating[c])] for c, label in enumerate(labels)}
+
+
+def _open_table(csv_path, workers):
+    if not results_cache.HAS_DEPS:
+        return None
+    try:
+        return results_cache.open_cache(csv_path, workers)
+    except (OSError, ValueError, KeyError) as e:
+        print(f'⚠️  Cache colunar indisponível para {csv_path} ({e}); lendo o texto.')
+        return None
+
+
+def apdex_counts(csv_path, thresholds, default_t, workers=None):
+    """{label: [satisfied, tolerating]} in one vectorized or streaming pass."""
+    table = _open_table(csv_path, workers)
+    if table is not None:
+        return _apdex_cached(table, thresholds, default_t)
+    counts = defaultdict(lambda: [0, 0])
+    func = partial(_apdex_shard, thresholds=thresholds, default_t=default_t)
+    for part in map_shards(csv_path, func, workers):
+        _merge_counts(counts, part)
+    return dict(counts)
+
+
+def load_report_data(csv_path, thresholds, default_t, workers=None, agg=None, table=None):
+    """(JtlAggregate, Apdex counts) of a JTL, reading its text at most once.
+
+    With the columnar cache both come from the memory-mapped columns;
+    otherwise each shard is parsed once, feeding the aggregate and the
+    Apdex counts together. An `agg` loaded elsewhere without a table only
+    needs the Apdex counts.
+    """
+    if table is None and agg is None:
+        table = _open_table(csv_path, workers)
+    if table is not None:
+        if agg is None:
+            agg = aggregate_table(table)
+        return agg, _apdex_cached(table, thresholds, default_t)
+    if agg is not None:
+        return agg, apdex_counts(csv_path, thresholds, default_t, workers)
+    agg = JtlAggregate()
+    counts = defaultdict(lambda: [0, 0])
+    func = partial(_report_shard, thresholds=thresholds, default_t=default_t)
+    for part_agg, part_counts in map_shards(csv_path, func, workers):
+        agg.merge(part_agg)
+        _merge_counts(counts, part_counts)
+    return agg, dict(counts)
+
+
+def parse_jmeter_csv(csv_path, endpoints=None, thresholds=None, default_t=DEFAULT_APDEX_T_MS,
+                     workers=None, agg=None, table=None):
+    """Per-label summary; `agg` / `table` reuse an aggregate or cached table already loaded."""
+    thresholds = thresholds or {}
     summary = defaultdict(lambda: {'count': 0, 'fail': 0, 'apdex': 1.0})
     total = 0
     fail_total = 0
-    with open(csv_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            label = row.get('label')
-            success = row.get('success') == 'true'
-            if label in ENDPOINTS:
-                summary[label]['count'] += 1
-                if not success:
-                    summary[label]['fail'] += 1
-                    fail_total += 1
-                total += 1
+    # columnar cache when fresh, otherwise parsed once in parallel byte-range shards
+    agg, apdex = load_report_data(csv_path, thresholds, default_t, workers, agg, table)
+    duration = agg.last - agg.first + 1 if agg.seconds else None
+    for label in (endpoints or sorted(agg.labels)):
+        bucket = agg.labels.get(label)
+        if bucket is None:
+            continue
+        hist = bucket.hist
+        sat, tol = apdex.get(label, (0, 0))
+        summary[label] = {
+            'count': bucket.count,
+            'fail': bucket.errors,
+            'apdex': round((sat + tol / 2) / bucket.count, 3) if bucket.count else 1.0,
+            'apdex_t': thresholds.get(label, default_t),
+            'mean': hist.mean(),
+            'p50': hist.quantile(0.5),
+            'p90': hist.quantile(0.9),
+            'p95': hist.quantile(0.95),
+            'p99': hist.quantile(0.99),
+            'throughput': bucket.count / duration if duration else None,
+        }
+        total += bucket.count
+        fail_total += bucket.errors
     return summary, total, fail_total
 
-def render_html(summary, total, fail_total):
+
+def _fmt(value, digits=1):
+    return '-' if value is None else f'{value:.{digits}f}'
+
+
+def render_html(summary, total, fail_total, endpoints=None):
     html = '''<!DOCTYPE html>
 <html lang="pt-br">
 <head>
@@ -40,7 +180,7 @@ def render_html(summary, total, fail_total):
     <title>Relatório JMeter Customizado</title>
     <style>
         body { font-family: Arial, sans-serif; margin: 2em; }
-        table { border-collapse: collapse; width: 60%; margin-bottom: 2em; }
+        table { border-collapse: collapse; width: 90%; margin-bottom: 2em; }
         th, td { border: 1px solid #ccc; padding: 8px; text-align: left; }
         th { background: #f0f0f0; }
         .pie { width: 300px; height: 300px; }
@@ -49,14 +189,15 @@ def render_html(summary, total, fail_total):
 <body>
     <h2>APDEX (Application Performance Index)</h2>
     <table>
-        <tr><th>Label</th><th>Requests</th><th>Fails</th><th>APDEX</th></tr>
+        <tr><th>Label</th><th>Requests</th><th>Fails</th><th>APDEX</th><th>T (ms)</th><th>Média (ms)</th><th>p50</th><th>p90</th><th>p95</th><th>p99</th><th>Throughput (req/s)</th></tr>
 '''
-    for label in ENDPOINTS:
+    for label in (endpoints or list(summary)):
         data = summary.get(label, {'count': 0, 'fail': 0, 'apdex': 1.0})
-        count = data['count']
-        fail = data['fail']
-        apdex = round((count - fail) / count, 3) if count else 1.0
-        html += f'<tr><td>{label}</td><td>{count}</td><td>{fail}</td><td>{apdex}</td></tr>'
+        html += (f'<tr><td>{label}</td><td>{data["count"]}</td><td>{data["fail"]}</td>'
+                 f'<td>{data["apdex"]}</td><td>{data.get("apdex_t", "-")}</td>'
+                 f'<td>{_fmt(data.get("mean"))}</td><td>{_fmt(data.get("p50"))}</td>'
+                 f'<td>{_fmt(data.get("p90"))}</td><td>{_fmt(data.get("p95"))}</td>'
+                 f'<td>{_fmt(data.get("p99"))}</td><td>{_fmt(data.get("throughput"), 2)}</td></tr>')
     html += '</table>'
     pass_pct = round(100 * (total - fail_total) / total, 2) if total else 100.0
     fail_pct = round(100 * fail_total / total, 2) if total else 0.0
@@ -67,19 +208,45 @@ def render_html(summary, total, fail_total):
       <path d="M16 16 L16 0 A16 16 0 {1 if fail_pct > 50 else 0} 1 {16 + 16 * (1 - fail_pct/100):.2f} {16 + 16 * (fail_pct/100):.2f} Z" fill="#ff6f6f" />
     </svg>
     <p><span style="color:#ff6f6f">FAIL</span>: {fail_pct}% &nbsp; <span style="color:#b6e388">PASS</span>: {pass_pct}%</p>
+    <p>APDEX: satisfeito &le; T, tolerável &le; 4T; amostras com falha contam como frustradas.</p>
     <hr>
     <p>Relatório gerado automaticamente. Apenas endpoints solicitados são exibidos.</p>
 </body>
 </html>'''
     return html
 
+
+def _parse_thresholds(items):
+    thresholds = {}
+    for item in items or []:
+        label, _, value = item.rpartition('=')
+        if not label:
+            raise SystemExit(f'--apdex-t-label espera LABEL=MS, recebido: {item}')
+        thresholds[label] = float(value)
+    return thresholds
+
+
 def main():
-    summary, total, fail_total = parse_jmeter_csv(CSV_PATH)
-    html = render_html(summary, total, fail_total)
-    os.makedirs(os.path.dirname(HTML_PATH), exist_ok=True)
-    with open(HTML_PATH, 'w', encoding='utf-8') as f:
+    parser = argparse.ArgumentParser(description="Relatório JMeter customizado (APDEX e percentis)")
+    parser.add_argument("--csv", default=CSV_PATH, help="Arquivo JTL/CSV do JMeter")
+    parser.add_argument("--out", default=HTML_PATH, help="HTML de saída")
+    parser.add_argument("--endpoints", nargs="*", default=ENDPOINTS,
+                        help="Labels exibidos (sem valores: todos os labels do JTL)")
+    parser.add_argument("--apdex-t", type=float, default=DEFAULT_APDEX_T_MS,
+                        help="Limite T do APDEX em ms para todos os labels")
+    parser.add_argument("--apdex-t-label", action="append", metavar="LABEL=MS",
+                        help="Limite T específico de um label (repetível)")
+    parser.add_argument("--workers", type=int, default=0, help="Processos de parsing (0 = um por núcleo)")
+    args = parser.parse_args()
+
+    endpoints = args.endpoints or None
+    summary, total, fail_total = parse_jmeter_csv(args.csv, endpoints, _parse_thresholds(args.apdex_t_label),
+                                                  args.apdex_t, args.workers or None)
+    html = render_html(summary, total, fail_total, endpoints)
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
         f.write(html)
-    print(f'Relatório gerado em: {HTML_PATH}')
+    print(f'Relatório gerado em: {args.out}')
 
 if __name__ == '__main__':
     main()
@@ -24,7 +24,7 @@ content = []
 content.append(Paragraph("📊 Relatório JMeter – TeaStore", styles["Heading1"]))
 content.append(Spacer(1, 12))
 
-for chart in ["response_time.png", "throughput.png", "error_rate.png"]:
+for chart in ["response_time.png", "response_time_by_label.png", "throughput.png", "error_rate.png"]:
     path = os.path.join(graphs_dir, chart)
     content.append(Image(path, width=500, height=300))
     content.append(Spacer(1, 24))
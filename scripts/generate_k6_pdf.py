@@ -1,34 +1,16 @@
-import json
 import sys
 
-# optional reportlab
-try:
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet
-    HAS_REPORTLAB = True
-except Exception:
-    HAS_REPORTLAB = False
+import build_report
 
-k6_json = sys.argv[1]
-out_pdf = sys.argv[2]
+# Seção k6 do relatório unificado (scripts/build_report.py): métricas do
+# summary export e checks em tabelas, grupos e gráficos a partir da saída bruta.
+#   python scripts/generate_k6_pdf.py k6-complex.json k6.pdf [k6-raw.json]
+if len(sys.argv) < 3:
+    print("Uso: generate_k6_pdf.py <k6-summary.json> <saida.pdf> [k6-raw.json]")
+    sys.exit(1)
 
-with open(k6_json) as f:
-    data = json.load(f)
-
-if not HAS_REPORTLAB:
-    print("ERROR: reportlab não instalado. Pulei a geração de PDF K6. Instale: pip install -r requirements.txt")
-    sys.exit(0)
-
-styles = getSampleStyleSheet()
-doc = SimpleDocTemplate(out_pdf, pagesize=A4)
-content = []
-
-content.append(Paragraph("📊 Relatório K6 – TeaStore", styles["Heading1"]))
-content.append(Spacer(1, 12))
-
-content.append(Paragraph("<pre>" + json.dumps(data, indent=2) + "</pre>", styles["Normal"]))
-
-doc.build(content)
-
-print("PDF gerado:", out_pdf)
+argv = ["--k6", sys.argv[1], "--out", sys.argv[2]]
+# optional raw point stream (k6 run --out json=...) for the per-group table
+if len(sys.argv) > 3:
+    argv += ["--k6-raw", sys.argv[3]]
+build_report.main(argv, "Relatório PDF do k6", only=("k6",))
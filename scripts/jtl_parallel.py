@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Multi-core JTL (CSV) parsing by byte-range sharding.
+
+The file is split at newline-aligned byte offsets and every shard is parsed
+in its own process. Each worker returns a partial result (by default a
+jtl_stream.JtlAggregate with counts, histograms and per-second buckets) and
+the partials are merged in the parent.
+
+Shards are cut on raw newlines, so JTLs saved with response/sampler data or
+headers (fields that may contain quoted newlines) are parsed as one shard.
+Worker processes are forked; on platforms without fork (Windows) the shards
+are processed sequentially in the calling process.
+
+Usage: python scripts/jtl_parallel.py <jtl-file> [workers]
+Produces: the jmeter_summary JSON (same keys as generate_dashboard.py) on stdout
+"""
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from jtl_stream import JtlAggregate, JtlColumns, add_rows
+
+# Below this many bytes per shard the pool overhead outweighs the gain.
+MIN_SHARD_BYTES = 8 * 1024 * 1024
+
+# Columns whose values may span several lines; such files are never sharded.
+MULTILINE_COLUMNS = ('responsedata', 'samplerdata', 'responseheaders', 'requestheaders')
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def pool_context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def plan_shards(path, workers, min_shard_bytes=MIN_SHARD_BYTES):
+    """Return (header, [(start, end), ...]) with shards aligned on line starts."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header_line = f.readline()
+        data_start = f.tell()
+        header = next(csv.reader([header_line.decode('utf-8', 'replace')]), [])
+        names = [c.strip().lower() for c in header]
+        n = max(1, min(workers, (size - data_start) // max(1, min_shard_bytes)))
+        if any(c in MULTILINE_COLUMNS for c in names):
+            n = 1
+        step = (size - data_start) // n
+        offsets = [data_start]
+        for k in range(1, n):
+            f.seek(data_start + k * step)
+            f.readline()  # advance to the start of the next line
+            pos = f.tell()
+            if offsets[-1] < pos < size:
+                offsets.append(pos)
+        offsets.append(size)
+    return header, list(zip(offsets[:-1], offsets[1:]))
+
+
+def iter_shard_lines(path, start, end):
+    """Decoded lines whose first byte lies in [start, end)."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line.decode('utf-8', 'replace')
+
+
+def count_shard_rows(path, start, end):
+    count = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(remaining, 1024 * 1024))
+            if not block:
+                break
+            count += block.count(b'\n')
+            remaining -= len(block)
+            last = block
+        if end > start and not last.endswith(b'\n'):
+            count += 1
+    return count
+
+
+def _run_shard(path, start, end, header, func, first_row):
+    rows = csv.reader(iter_shard_lines(path, start, end))
+    return func(rows, JtlColumns(header), first_row)
+
+
+def map_shards(path, func, workers=None, number_rows=False):
+    """Apply `func(rows, columns, first_row)` to every shard, in shard order.
+
+    `func` must be a module-level function (it is sent to worker processes).
+    With `number_rows`, `first_row` is the 0-based index of the shard's first
+    data row in the whole file; otherwise it is None.
+    """
+    workers = workers or default_workers()
+    header, shards = plan_shards(path, workers)
+    ctx = pool_context()
+    if len(shards) == 1 or ctx is None:
+        results = []
+        first_row = 0
+        for start, end in shards:
+            results.append(_run_shard(path, start, end, header, func,
+                                      first_row if number_rows else None))
+            if number_rows:
+                first_row += count_shard_rows(path, start, end)
+        return results
+
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=ctx) as pool:
+        first_rows = [None] * len(shards)
+        if number_rows:
+            counts = list(pool.map(count_shard_rows, [path] * len(shards),
+                                   [s for s, _ in shards], [e for _, e in shards]))
+            first_rows = [sum(counts[:k]) for k in range(len(shards))]
+        futures = [pool.submit(_run_shard, path, start, end, header, func, first_rows[k])
+                   for k, (start, end) in enumerate(shards)]
+        return [fut.result() for fut in futures]
+
+
+def _aggregate_rows(rows, columns, first_row):
+    return add_rows(JtlAggregate(), rows, columns)
+
+
+def aggregate_jtl_parallel(path, workers=None):
+    """Parallel equivalent of jtl_stream.aggregate_jtl."""
+    agg = JtlAggregate()
+    for partial in map_shards(path, _aggregate_rows, workers):
+        agg.merge(partial)
+    return agg
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: jtl_parallel.py <jtl-file> [workers]')
+        sys.exit(1)
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    agg = aggregate_jtl_parallel(sys.argv[1], workers)
+    print(json.dumps(agg.summary(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
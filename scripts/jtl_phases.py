@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""Per-endpoint breakdown of JTL response times into connection phases.
+
+JMeter writes, for every sample, `Connect` (time to open the TCP/TLS
+connection, 0 when a kept-alive connection was reused), `Latency` (time to
+the first byte, connection included) and `elapsed` (time to the last byte).
+Each sample is split into:
+
+  connect   Connect
+  server    Latency - Connect   (request sent, waiting for the first byte)
+  download  elapsed - Latency   (receiving the body)
+
+with one mergeable histogram per phase and endpoint, plus the share of
+samples that opened a new connection (Connect > 0), the mean IdleTime, the
+average payload and the bytes/s over the run. Samples without a first byte
+(Latency 0: connection refused, timeouts) only count as `no_response`.
+On loopback a new connection can take less than 1 ms and be logged as 0,
+so the new-connection share is a lower bound there.
+
+The diagnosis names the dominant phase of every endpoint: broken keep-alive
+(many new connections), server processing (TTFB) or payload transfer.
+
+Uses the columnar cache (results_cache) when numpy/pandas are installed,
+the parallel text parser (jtl_parallel) otherwise.
+
+Usage: python scripts/jtl_phases.py <jtl-file> [--workers N] [--json phases.json]
+"""
+import argparse
+import json
+
+from jtl_parallel import map_shards
+from jtl_stream import LatencyHistogram
+from results_cache import HAS_DEPS, group_histograms, np, open_cache
+
+PHASES = ('connect', 'server', 'download')
+PHASE_NAMES = {'connect': 'conexão', 'server': 'servidor (TTFB)', 'download': 'download'}
+TOTAL = 'TOTAL'
+# more new connections than this share of the samples points at keep-alive
+DEFAULT_KEEPALIVE_THRESHOLD = 0.2
+
+# flat per-label fields shared by the CLI, the dashboard and the PDF report
+FIELDS = (('requests', 'Req.'), ('new_connection_pct', 'Conex. novas %'),
+          ('connect_p95', 'Conexão p95'), ('server_p95', 'Servidor p95'), ('download_p95', 'Download p95'),
+          ('avg_kb', 'KB/amostra'), ('kb_per_s', 'KB/s'), ('dominant', 'Fase dominante'))
+
+
+class PhaseStats:
+    """Phase histograms and transfer counters of one endpoint."""
+    __slots__ = ('phases', 'samples', 'new_connections', 'no_response', 'idle', 'bytes', 'sent_bytes',
+                 'first_ts', 'last_end')
+
+    def __init__(self):
+        self.phases = {p: LatencyHistogram() for p in PHASES}
+        self.samples = 0
+        self.new_connections = 0
+        self.no_response = 0
+        self.idle = 0.0
+        self.bytes = 0.0
+        self.sent_bytes = 0.0
+        self.first_ts = None
+        self.last_end = None
+
+    def add(self, elapsed, latency, connect, idle=0.0, nbytes=0.0, sent=0.0, ts=None):
+        self.samples += 1
+        self.idle += idle
+        self.bytes += nbytes
+        self.sent_bytes += sent
+        if connect is not None:
+            self.phases['connect'].add(connect)
+            if connect > 0:
+                self.new_connections += 1
+        if latency is None or latency <= 0:
+            self.no_response += 1
+        else:
+            self.phases['server'].add(max(latency - (connect or 0), 0))
+            self.phases['download'].add(max(elapsed - latency, 0))
+        if ts is not None:
+            self._span(ts, ts + elapsed)
+
+    def _span(self, first, last):
+        if self.first_ts is None or first < self.first_ts:
+            self.first_ts = first
+        if self.last_end is None or last > self.last_end:
+            self.last_end = last
+
+    def merge(self, other):
+        for p in PHASES:
+            self.phases[p].merge(other.phases[p])
+        self.samples += other.samples
+        self.new_connections += other.new_connections
+        self.no_response += other.no_response
+        self.idle += other.idle
+        self.bytes += other.bytes
+        self.sent_bytes += other.sent_bytes
+        if other.first_ts is not None:
+            self._span(other.first_ts, other.last_end)
+        return self
+
+    def summary(self, span_s=None, has_connect=True):
+        """Percentiles per phase, mean share of each phase, transfer rates."""
+        out = {'requests': self.samples, 'no_response': self.no_response,
+               'new_connection_share': self.new_connections / self.samples if self.samples and has_connect else None,
+               'idle_ms_mean': self.idle / self.samples if self.samples else None,
+               'avg_bytes': self.bytes / self.samples if self.samples else None,
+               'avg_sent_bytes': self.sent_bytes / self.samples if self.samples else None,
+               'bytes_per_s': self.bytes / span_s if span_s else None}
+        download = self.phases['download']
+        out['download_bytes_per_s'] = (self.bytes / (download.total / 1000)
+                                       if download.total > 0 else None)
+        means = {}
+        for p in PHASES:
+            hist = self.phases[p]
+            out[p] = {'mean_ms': hist.mean(), 'p50_ms': hist.quantile(0.5),
+                      'p95_ms': hist.quantile(0.95), 'p99_ms': hist.quantile(0.99)}
+            means[p] = hist.mean() or 0.0
+        total = sum(means.values())
+        out['share'] = {p: means[p] / total for p in PHASES} if total > 0 else None
+        out['dominant'] = max(PHASES, key=means.get) if total > 0 else None
+        return out
+
+    def to_dict(self):
+        return {'phases': {p: h.to_dict() for p, h in self.phases.items()},
+                'samples': self.samples, 'new_connections': self.new_connections,
+                'no_response': self.no_response, 'idle': self.idle, 'bytes': self.bytes,
+                'sent_bytes': self.sent_bytes, 'first_ts': self.first_ts, 'last_end': self.last_end}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.phases = {p: LatencyHistogram.from_dict(data['phases'][p]) for p in PHASES}
+        for key in ('samples', 'new_connections', 'no_response', 'idle', 'bytes', 'sent_bytes',
+                    'first_ts', 'last_end'):
+            setattr(stats, key, data.get(key, getattr(stats, key)))
+        return stats
+
+
+class PhaseAggregate:
+    """PhaseStats for the whole run and per label."""
+
+    def __init__(self):
+        self.total = PhaseStats()
+        self.labels = {}
+        self.has_connect = False
+        self.has_latency = False
+
+    def add(self, label, *sample):
+        self.total.add(*sample)
+        stats = self.labels.get(label)
+        if stats is None:
+            stats = self.labels[label] = PhaseStats()
+        stats.add(*sample)
+
+    def merge(self, other):
+        self.total.merge(other.total)
+        for label, stats in other.labels.items():
+            if label in self.labels:
+                self.labels[label].merge(stats)
+            else:
+                self.labels[label] = stats
+        self.has_connect = self.has_connect or other.has_connect
+        self.has_latency = self.has_latency or other.has_latency
+        return self
+
+    @property
+    def span_s(self):
+        if self.total.first_ts is None:
+            return None
+        return max(self.total.last_end - self.total.first_ts, 1) / 1000
+
+    def summary(self):
+        """{label: PhaseStats.summary()}, with the whole run under TOTAL."""
+        span = self.span_s
+        out = {label: stats.summary(span, self.has_connect) for label, stats in sorted(self.labels.items())}
+        out[TOTAL] = self.total.summary(span, self.has_connect)
+        return out
+
+    def to_dict(self):
+        return {'total': self.total.to_dict(), 'labels': {k: v.to_dict() for k, v in self.labels.items()},
+                'has_connect': self.has_connect, 'has_latency': self.has_latency}
+
+    @classmethod
+    def from_dict(cls, data):
+        agg = cls()
+        agg.total = PhaseStats.from_dict(data['total'])
+        agg.labels = {k: PhaseStats.from_dict(v) for k, v in data.get('labels', {}).items()}
+        agg.has_connect = data.get('has_connect', False)
+        agg.has_latency = data.get('has_latency', False)
+        return agg
+
+
+# --- text path (no numpy/pandas) ---------------------------------------------
+def _num(row, i):
+    if i is None or i >= len(row):
+        return None
+    try:
+        return float(row[i])
+    except ValueError:
+        return None
+
+
+def add_phase_rows(agg, rows, columns):
+    """Feed parsed CSV rows (jtl_stream.JtlColumns positions) into `agg`."""
+    names = columns.names
+    pos = {c: names.index(c) if c in names else None
+           for c in ('latency', 'connect', 'idletime', 'bytes', 'sentbytes')}
+    agg.has_connect = agg.has_connect or pos['connect'] is not None
+    agg.has_latency = agg.has_latency or pos['latency'] is not None
+    i_label = columns.label
+    for row in rows:
+        elapsed = _num(row, columns.elapsed)
+        if elapsed is None:
+            continue
+        label = row[i_label] if i_label is not None and i_label < len(row) else ''
+        agg.add(label, elapsed, _num(row, pos['latency']), _num(row, pos['connect']),
+                _num(row, pos['idletime']) or 0.0, _num(row, pos['bytes']) or 0.0,
+                _num(row, pos['sentbytes']) or 0.0, _num(row, columns.timestamp))
+    return agg
+
+
+def _phase_rows(rows, columns, first_row):
+    return add_phase_rows(PhaseAggregate(), rows, columns)
+
+
+# --- columnar path -----------------------------------------------------------
+def _hists(codes, values, keep):
+    """{code: LatencyHistogram} of values[keep] grouped by codes[keep]."""
+    return {c: b.hist for c, b in group_histograms(codes[keep], values[keep],
+                                                   np.zeros(int(keep.sum()), dtype=bool)).items()}
+
+
+def aggregate_phases_table(table):
+    """PhaseAggregate computed from a cached JTL (vectorized per part)."""
+    agg = PhaseAggregate()
+    idx = {c: table.index(c) for c in ('elapsed', 'label', 'timestamp', 'latency', 'connect',
+                                       'idletime', 'bytes', 'sentbytes')}
+    idx = {c: (k if k is not None and table.columns[k]['kind'] == 'num' or c == 'label' else None)
+           for c, k in idx.items()}
+    if idx['elapsed'] is None:
+        return agg
+    agg.has_connect = idx['connect'] is not None
+    agg.has_latency = idx['latency'] is not None
+    labels = table.columns[idx['label']]['dictionary'] if idx['label'] is not None else ['']
+
+    for part in table.parts:
+        def col(name, default=np.nan):
+            if idx[name] is None:
+                return np.full(part['rows'], default)
+            return np.asarray(table.part_column(part, idx[name]))
+
+        elapsed = col('elapsed')
+        keep = ~np.isnan(elapsed)
+        elapsed = elapsed[keep]
+        codes = (np.asarray(table.part_column(part, idx['label']))[keep] if idx['label'] is not None
+                 else np.zeros(len(elapsed), dtype=np.int32))
+        latency, connect = col('latency')[keep], col('connect')[keep]
+        ts = col('timestamp')[keep]
+        has_ts = ~np.isnan(ts)
+        sums = {name: np.nan_to_num(col(name, 0.0)[keep]) for name in ('idletime', 'bytes', 'sentbytes')}
+
+        has_connect = ~np.isnan(connect)
+        responded = latency > 0
+        server = np.maximum(latency - np.nan_to_num(connect), 0)
+        download = np.maximum(elapsed - latency, 0)
+
+        partial = PhaseAggregate()
+        for group_codes, target in ((np.zeros(len(elapsed), dtype=np.int32), None), (codes, 'labels')):
+            width = int(group_codes.max()) + 1 if len(group_codes) else 0
+            counts = np.bincount(group_codes, minlength=width)
+            new = np.bincount(group_codes, weights=(connect > 0), minlength=width)
+            lost = np.bincount(group_codes, weights=~responded, minlength=width)
+            totals = {name: np.bincount(group_codes, weights=v, minlength=width) for name, v in sums.items()}
+            first = np.full(width, np.inf)
+            last = np.full(width, -np.inf)
+            np.minimum.at(first, group_codes[has_ts], ts[has_ts])
+            np.maximum.at(last, group_codes[has_ts], ts[has_ts] + elapsed[has_ts])
+            phase_hists = {'connect': _hists(group_codes, np.nan_to_num(connect), has_connect),
+                           'server': _hists(group_codes, server, responded),
+                           'download': _hists(group_codes, download, responded)}
+            for code in np.flatnonzero(counts).tolist():
+                stats = PhaseStats()
+                stats.samples = int(counts[code])
+                stats.new_connections = int(new[code])
+                stats.no_response = int(lost[code])
+                stats.idle = float(totals['idletime'][code])
+                stats.bytes = float(totals['bytes'][code])
+                stats.sent_bytes = float(totals['sentbytes'][code])
+                for p in PHASES:
+                    if code in phase_hists[p]:
+                        stats.phases[p] = phase_hists[p][code]
+                if np.isfinite(first[code]):
+                    stats.first_ts = float(first[code])
+                    stats.last_end = float(last[code])
+                if target is None:
+                    partial.total = stats
+                else:
+                    partial.labels[labels[code]] = stats
+        agg.merge(partial)
+    return agg
+
+
+def load_phases(path, workers=None):
+    """PhaseAggregate of a CSV JTL, through the columnar cache when available."""
+    if HAS_DEPS:
+        try:
+            return aggregate_phases_table(open_cache(path, workers))
+        except Exception as e:
+            print(f'⚠️  Cache colunar indisponível para {path} ({e}); lendo o texto.')
+    agg = PhaseAggregate()
+    for partial in map_shards(path, _phase_rows, workers):
+        agg.merge(partial)
+    return agg
+
+
+# --- reporting ---------------------------------------------------------------
+def diagnose(summary, keepalive_threshold=DEFAULT_KEEPALIVE_THRESHOLD):
+    """Short explanation of where an endpoint spends its time."""
+    notes = []
+    share = summary.get('new_connection_share')
+    if share is not None and share > keepalive_threshold:
+        notes.append(f'keep-alive: {share:.0%} das amostras abriram conexão nova')
+    if summary.get('dominant'):
+        dominant = summary['dominant']
+        notes.append(f"{PHASE_NAMES[dominant]} domina ({summary['share'][dominant]:.0%} do tempo médio)")
+    if summary.get('no_response'):
+        notes.append(f"{summary['no_response']} sem resposta")
+    return '; '.join(notes)
+
+
+def flat_rows(summary, keepalive_threshold=DEFAULT_KEEPALIVE_THRESHOLD):
+    """{label: {FIELDS key: value}} for tables, plus a 'diagnosis' text."""
+    out = {}
+    for label, s in summary.items():
+        share = s['new_connection_share']
+        out[label] = {
+            'requests': s['requests'],
+            'new_connection_pct': None if share is None else 100.0 * share,
+            'connect_p95': s['connect']['p95_ms'],
+            'server_p95': s['server']['p95_ms'],
+            'download_p95': s['download']['p95_ms'],
+            'avg_kb': None if s['avg_bytes'] is None else s['avg_bytes'] / 1024,
+            'kb_per_s': None if s['bytes_per_s'] is None else s['bytes_per_s'] / 1024,
+            'dominant': PHASE_NAMES.get(s['dominant'], '—'),
+            'diagnosis': diagnose(s, keepalive_threshold),
+        }
+    return out
+
+
+def _f(value, spec='.1f'):
+    return '-' if value is None else format(value, spec)
+
+
+def print_phases(summary, keepalive_threshold=DEFAULT_KEEPALIVE_THRESHOLD):
+    print(f"{'Label':<28} {'req':>8} {'novas%':>7} "
+          + ' '.join(f'{p + " p50/p95":>18}' for p in PHASES) + f" {'KB/amostra':>10} {'KB/s':>9}")
+    for label, s in summary.items():
+        share = s['new_connection_share']
+        phases = ' '.join(f"{_f(s[p]['p50_ms']):>8}/{_f(s[p]['p95_ms']):<9}" for p in PHASES)
+        print(f"{label[:28]:<28} {s['requests']:>8} {_f(None if share is None else 100 * share):>7} {phases} "
+              f"{_f(None if s['avg_bytes'] is None else s['avg_bytes'] / 1024):>10} "
+              f"{_f(None if s['bytes_per_s'] is None else s['bytes_per_s'] / 1024):>9}")
+    print()
+    for label, s in summary.items():
+        if label != TOTAL:
+            print(f'  {label}: {diagnose(s, keepalive_threshold)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fases de conexão, servidor e download por endpoint (JTL)')
+    parser.add_argument('jtl', help='Arquivo .jtl (CSV) do JMeter')
+    parser.add_argument('--workers', type=int, default=0, help='Processos de parsing (0 = um por núcleo)')
+    parser.add_argument('--json', help='Grava o resumo por fase neste arquivo JSON')
+    parser.add_argument('--keepalive-threshold', type=float, default=DEFAULT_KEEPALIVE_THRESHOLD,
+                        help='Fração de conexões novas acima da qual o keep-alive é apontado')
+    args = parser.parse_args()
+
+    agg = load_phases(args.jtl, args.workers or None)
+    if not agg.has_latency:
+        print('⚠️  JTL sem coluna Latency: só a fase de conexão pode ser calculada.')
+    if not agg.has_connect:
+        print('⚠️  JTL sem coluna Connect: conexões novas não podem ser contadas.')
+    summary = agg.summary()
+    print_phases(summary, args.keepalive_threshold)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f'\n✅ Resumo por fase gravado em {args.json}')
+
+
+if __name__ == '__main__':
+    main()
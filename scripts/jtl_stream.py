@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""Constant-memory streaming aggregation of JMeter JTL (CSV) results.
+
+The JTL is read row by row; only running counters and a mergeable
+log-bucketed latency histogram per label and per time bucket are kept, so
+memory depends on the number of labels, never on the size of the file. The
+time series keep at most MAX_TIME_BUCKETS buckets (one second each until
+then): past that the buckets of the run and of every label are widened
+(2 s, 4 s, ...), so soak runs stay within a fixed number of histograms.
+
+Usage: python scripts/jtl_stream.py <jtl-file>
+Produces: the jmeter_summary JSON (same keys as generate_dashboard.py) on stdout
+"""
+import csv
+import json
+import math
+import sys
+from functools import lru_cache
+
+# Relative accuracy of the quantiles returned by LatencyHistogram (1%).
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+TRUE_VALUES = ('true', '1', 't', 'y')
+
+# time buckets kept before they are widened (graphs show ~1000-1500 points)
+MAX_TIME_BUCKETS = 1800
+
+
+@lru_cache(maxsize=65536)
+def bucket_index(value):
+    """Histogram bucket holding `value` (> 0)."""
+    return math.ceil(math.log(value) / LOG_GAMMA)
+
+
+def bucket_value(index):
+    """Representative value of a bucket (relative error <= RELATIVE_ACCURACY)."""
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+class LatencyHistogram:
+    """Mergeable log-bucketed histogram of latencies.
+
+    Buckets grow geometrically, so any quantile is returned with a relative
+    error of at most RELATIVE_ACCURACY while the number of buckets stays in
+    the hundreds even for latencies spanning microseconds to minutes.
+    """
+    __slots__ = ('buckets', 'zeros', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value, n=1):
+        if value > 0:
+            idx = bucket_index(value)
+            self.buckets[idx] = self.buckets.get(idx, 0) + n
+        else:
+            self.zeros += n
+        self.count += n
+        self.total += value * n
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for idx, n in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1), None when empty."""
+        if not self.count:
+            return None
+        if q <= 0:
+            return float(self.min)
+        if q >= 1:
+            return float(self.max)
+        # same rank convention as pandas' linear quantile
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return float(min(0, self.max))
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if rank < seen:
+                return float(min(max(bucket_value(idx), self.min), self.max))
+        return float(self.max)
+
+    def to_dict(self):
+        return {
+            'buckets': {str(k): v for k, v in self.buckets.items()},
+            'zeros': self.zeros,
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls()
+        hist.buckets = {int(k): v for k, v in data.get('buckets', {}).items()}
+        hist.zeros = data.get('zeros', 0)
+        hist.count = data.get('count', 0)
+        hist.total = data.get('total', 0.0)
+        hist.min = data.get('min')
+        hist.max = data.get('max')
+        return hist
+
+
+class StatsBucket:
+    """Latency histogram plus error counter for one label or one time bucket."""
+    __slots__ = ('hist', 'errors')
+
+    def __init__(self):
+        self.hist = LatencyHistogram()
+        self.errors = 0
+
+    @property
+    def count(self):
+        return self.hist.count
+
+    def add(self, elapsed, failed):
+        self.hist.add(elapsed)
+        if failed:
+            self.errors += 1
+
+    def merge(self, other):
+        self.hist.merge(other.hist)
+        self.errors += other.errors
+        return self
+
+    def to_dict(self):
+        return {'hist': self.hist.to_dict(), 'errors': self.errors}
+
+    @classmethod
+    def from_dict(cls, data):
+        bucket = cls()
+        bucket.hist = LatencyHistogram.from_dict(data['hist'])
+        bucket.errors = data.get('errors', 0)
+        return bucket
+
+
+def _merge_buckets(mine, theirs):
+    for key, bucket in theirs.items():
+        if key in mine:
+            mine[key].merge(bucket)
+        else:
+            mine[key] = StatsBucket().merge(bucket)
+
+
+def _rebucket(seconds, width):
+    """Buckets of `seconds` merged into `width`-second buckets keyed by their start."""
+    out = {}
+    for sec, bucket in seconds.items():
+        key = sec // width * width
+        if key in out:
+            out[key].merge(bucket)
+        else:
+            out[key] = StatsBucket().merge(bucket)
+    return out
+
+
+class JtlAggregate:
+    """Running aggregate of JTL samples: totals, per label, per time bucket
+    and per label and time bucket (`width` seconds, see MAX_TIME_BUCKETS)."""
+
+    def __init__(self):
+        self.total = StatsBucket()
+        self.labels = {}
+        self.seconds = {}
+        self.label_seconds = {}
+        self.width = 1
+        # first and last second with samples: widened buckets start before / end after them
+        self.first = None
+        self.last = None
+        self.has_success = False
+        self.has_timestamp = False
+
+    def add(self, label, elapsed, failed, timestamp_ms=None):
+        self.total.add(elapsed, failed)
+        bucket = self.labels.get(label)
+        if bucket is None:
+            bucket = self.labels[label] = StatsBucket()
+        bucket.add(elapsed, failed)
+        if timestamp_ms is not None:
+            sec = int(timestamp_ms // 1000)
+            if self.first is None or sec < self.first:
+                self.first = sec
+            if self.last is None or sec > self.last:
+                self.last = sec
+            key = sec // self.width * self.width
+            if key not in self.seconds:
+                self.seconds[key] = StatsBucket()
+                if len(self.seconds) > MAX_TIME_BUCKETS:
+                    self.widen()
+                    key = sec // self.width * self.width
+            self.seconds[key].add(elapsed, failed)
+            per_label = self.label_seconds.get(label)
+            if per_label is None:
+                per_label = self.label_seconds[label] = {}
+            bucket = per_label.get(key)
+            if bucket is None:
+                bucket = per_label[key] = StatsBucket()
+            bucket.add(elapsed, failed)
+
+    def widen(self, width=None):
+        """Double `width` (or raise it to `width`) until the run fits MAX_TIME_BUCKETS.
+
+        Every label bucket lies within a run bucket, so the labels fit too.
+        """
+        width = max(width or self.width * 2, self.width)
+        while True:
+            if width != self.width:
+                self.seconds = _rebucket(self.seconds, width)
+                self.label_seconds = {label: _rebucket(seconds, width)
+                                      for label, seconds in self.label_seconds.items()}
+                self.width = width
+            if len(self.seconds) <= MAX_TIME_BUCKETS:
+                return
+            width *= 2
+
+    def merge(self, other):
+        self.total.merge(other.total)
+        _merge_buckets(self.labels, other.labels)
+        self.widen(other.width)
+        seconds = other.seconds
+        if other.width != self.width:
+            seconds = _rebucket(seconds, self.width)
+        _merge_buckets(self.seconds, seconds)
+        for label, seconds in other.label_seconds.items():
+            if other.width != self.width:
+                seconds = _rebucket(seconds, self.width)
+            _merge_buckets(self.label_seconds.setdefault(label, {}), seconds)
+        self.widen(self.width)
+        for sec in (other.first, other.last):
+            if sec is not None:
+                self.first = sec if self.first is None else min(self.first, sec)
+                self.last = sec if self.last is None else max(self.last, sec)
+        self.has_success = self.has_success or other.has_success
+        self.has_timestamp = self.has_timestamp or other.has_timestamp
+        return self
+
+    def throughput(self):
+        """Mean requests per second over the run (empty seconds count as 0)."""
+        if not self.seconds:
+            return None
+        span = self.last - self.first + 1
+        return sum(b.count for b in self.seconds.values()) / span
+
+    def series(self, label=None, bucket_seconds=1):
+        """Wall-clock time series as [(offset_s, StatsBucket or None), ...].
+
+        Offsets are relative to the first second of the whole run, so series
+        of different labels line up; buckets without samples are None.
+        Buckets come in multiples of `width` (see bucket_width).
+        """
+        if not self.seconds:
+            return []
+        seconds = self.seconds if label is None else self.label_seconds.get(label, {})
+        first = self.first
+        width = self.bucket_width(bucket_seconds)
+        n = (self.last - first) // width + 1
+        out = [None] * n
+        for sec, bucket in seconds.items():
+            # widened buckets start at a multiple of `width`, possibly before the run
+            k = max(0, (sec - first) // width)
+            if out[k] is None:
+                out[k] = StatsBucket()
+            out[k].merge(bucket)
+        return [(k * width, b) for k, b in enumerate(out)]
+
+    def bucket_width(self, bucket_seconds=1):
+        """Width in seconds of the buckets series(..., bucket_seconds) returns."""
+        width = max(1, int(bucket_seconds))
+        return -(-width // self.width) * self.width
+
+    def summary(self):
+        """Dict with the same keys generate_dashboard.py writes as jmeter_summary."""
+        total = self.total.count
+        hist = self.total.hist
+        error_rate = None
+        if self.has_success and total > 0:
+            error_rate = self.total.errors / total
+        return {
+            'tool': 'jmeter',
+            'requests': total,
+            'avg_latency_ms': hist.mean(),
+            'p50_ms': hist.quantile(0.5),
+            'p95_ms': hist.quantile(0.95),
+            'p99_ms': hist.quantile(0.99),
+            'error_rate': error_rate,
+            'throughput_rps': self.throughput() if self.has_timestamp else None,
+        }
+
+    def label_summary(self):
+        """Per-label count, errors, mean and p50/p95/p99."""
+        out = {}
+        for label, bucket in self.labels.items():
+            out[label] = {
+                'requests': bucket.count,
+                'errors': bucket.errors,
+                'avg_latency_ms': bucket.hist.mean(),
+                'p50_ms': bucket.hist.quantile(0.5),
+                'p95_ms': bucket.hist.quantile(0.95),
+                'p99_ms': bucket.hist.quantile(0.99),
+            }
+        return out
+
+    def to_dict(self):
+        return {
+            'total': self.total.to_dict(),
+            'labels': {k: v.to_dict() for k, v in self.labels.items()},
+            'seconds': {str(k): v.to_dict() for k, v in self.seconds.items()},
+            'label_seconds': {label: {str(k): v.to_dict() for k, v in seconds.items()}
+                              for label, seconds in self.label_seconds.items()},
+            'width': self.width,
+            'first': self.first,
+            'last': self.last,
+            'has_success': self.has_success,
+            'has_timestamp': self.has_timestamp,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        agg = cls()
+        agg.total = StatsBucket.from_dict(data['total'])
+        agg.labels = {k: StatsBucket.from_dict(v) for k, v in data.get('labels', {}).items()}
+        agg.seconds = {int(k): StatsBucket.from_dict(v) for k, v in data.get('seconds', {}).items()}
+        agg.label_seconds = {label: {int(k): StatsBucket.from_dict(v) for k, v in seconds.items()}
+                             for label, seconds in data.get('label_seconds', {}).items()}
+        agg.width = data.get('width', 1)
+        agg.first = data.get('first', min(agg.seconds) if agg.seconds else None)
+        agg.last = data.get('last', max(agg.seconds) if agg.seconds else None)
+        agg.has_success = data.get('has_success', False)
+        agg.has_timestamp = data.get('has_timestamp', False)
+        return agg
+
+
+class JtlColumns:
+    """Positions of the columns the aggregators need, from a JTL CSV header."""
+
+    def __init__(self, header):
+        cols = [c.strip().lower() for c in header]
+        self.names = cols
+        # same fallback as generate_dashboard.py: first column when no 'elapsed'
+        self.elapsed = cols.index('elapsed') if 'elapsed' in cols else 0
+        self.label = cols.index('label') if 'label' in cols else None
+        self.success = cols.index('success') if 'success' in cols else None
+        self.timestamp = cols.index('timestamp') if 'timestamp' in cols else None
+        self.response_code = cols.index('responsecode') if 'responsecode' in cols else None
+
+    @property
+    def has_errors(self):
+        """Whether failures can be told apart (success or responseCode column)."""
+        return self.success is not None or self.response_code is not None
+
+    def failed(self, row):
+        """success=false; without a success column, a responseCode other than 2xx."""
+        if self.success is not None:
+            return self.success < len(row) and row[self.success].strip().lower() not in TRUE_VALUES
+        if self.response_code is not None:
+            return self.response_code < len(row) and not row[self.response_code].strip().startswith('2')
+        return False
+
+
+def add_rows(agg, rows, columns):
+    """Feed parsed CSV rows into `agg`; malformed rows are skipped."""
+    i_elapsed = columns.elapsed
+    i_label = columns.label
+    i_ts = columns.timestamp
+    if columns.has_errors:
+        agg.has_success = True
+    if i_ts is not None:
+        agg.has_timestamp = True
+    for row in rows:
+        try:
+            elapsed = float(row[i_elapsed])
+        except (ValueError, IndexError):
+            continue
+        label = row[i_label] if i_label is not None and i_label < len(row) else ''
+        failed = columns.failed(row)
+        ts = None
+        if i_ts is not None and i_ts < len(row):
+            try:
+                ts = float(row[i_ts])
+            except ValueError:
+                ts = None
+        agg.add(label, elapsed, failed, ts)
+    return agg
+
+
+def aggregate_jtl(path):
+    """Single pass over a CSV JTL returning a JtlAggregate."""
+    agg = JtlAggregate()
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return agg
+        add_rows(agg, reader, JtlColumns(header))
+    return agg
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: jtl_stream.py <jtl-file>')
+        sys.exit(1)
+    agg = aggregate_jtl(sys.argv[1])
+    print(json.dumps(agg.summary(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""Streaming aggregation of k6 raw output (`k6 run --out json=k6-raw.json`).
+
+The NDJSON stream is read line by line; lines that are not Points of one of
+the HTTP timing metrics are rejected by a byte check before any JSON
+decoding (orjson when installed, json otherwise). Each metric is aggregated
+into a jtl_stream.JtlAggregate keyed by the k6 `group` tag (Login, Navigate,
+Logout; requests outside groups use the request `name`), so k6 gets the same
+per-label and per-second histograms as the JMeter JTL, in memory bounded by
+labels x seconds. A request counts as failed when k6 tagged it
+expected_response=false.
+
+Large files are split in newline-aligned byte ranges parsed in parallel, as
+for the JTL (jtl_parallel).
+
+Usage: python scripts/k6_stream.py <k6-raw.json> [workers]
+Produces: per-metric summaries (same keys as the jmeter summary) on stdout
+"""
+import calendar
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+try:
+    import orjson
+    _loads = orjson.loads
+except Exception:
+    _loads = json.loads
+
+from jtl_parallel import MIN_SHARD_BYTES, default_workers, iter_shard_lines, pool_context
+from jtl_stream import JtlAggregate
+
+METRICS = ('http_req_duration', 'http_req_waiting', 'http_req_connecting', 'http_req_tls_handshaking',
+           'http_req_blocked', 'http_req_sending', 'http_req_receiving')
+# the metric whose summary stands for "k6" in the dashboard
+MAIN_METRIC = 'http_req_duration'
+
+_POINT = '"type":"Point"'
+_METRIC_TAGS = tuple(f'"metric":"{m}"' for m in METRICS)
+
+
+@lru_cache(maxsize=4096)
+def _second(prefix, tz):
+    """Epoch second of 'YYYY-MM-DDTHH:MM:SS' in the UTC offset `tz` ('Z', '+02:00')."""
+    secs = calendar.timegm((int(prefix[0:4]), int(prefix[5:7]), int(prefix[8:10]),
+                            int(prefix[11:13]), int(prefix[14:16]), int(prefix[17:19])))
+    if tz and tz != 'Z':
+        sign = -1 if tz[0] == '+' else 1
+        secs += sign * (int(tz[1:3]) * 3600 + int(tz[4:6]) * 60)
+    return secs
+
+
+def parse_time_ms(value):
+    """Epoch milliseconds of a k6 RFC 3339 timestamp (nanosecond fraction allowed)."""
+    prefix, rest = value[:19], value[19:]
+    frac = 0.0
+    if rest.startswith('.'):
+        end = 1
+        while end < len(rest) and rest[end].isdigit():
+            end += 1
+        frac = float('0' + rest[:end])
+        rest = rest[end:]
+    return (_second(prefix, rest) + frac) * 1000
+
+
+class K6Aggregate:
+    """One JtlAggregate per k6 timing metric."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def add_lines(self, lines):
+        metrics = self.metrics
+        for line in lines:
+            if _POINT not in line or not any(tag in line for tag in _METRIC_TAGS):
+                continue
+            try:
+                point = _loads(line)
+                data = point['data']
+                value = float(data['value'])
+            except (ValueError, KeyError, TypeError):
+                continue
+            tags = data.get('tags') or {}
+            group = (tags.get('group') or '').lstrip(':')
+            label = group or tags.get('name', '')
+            failed = tags.get('expected_response') == 'false'
+            try:
+                ts = parse_time_ms(data['time'])
+            except (KeyError, ValueError):
+                ts = None
+            agg = metrics.get(point['metric'])
+            if agg is None:
+                agg = metrics[point['metric']] = JtlAggregate()
+                agg.has_success = agg.has_timestamp = True
+            agg.add(label, value, failed, ts)
+        return self
+
+    def merge(self, other):
+        for metric, agg in other.metrics.items():
+            if metric in self.metrics:
+                self.metrics[metric].merge(agg)
+            else:
+                self.metrics[metric] = agg
+        return self
+
+    @property
+    def requests(self):
+        """Aggregate of the main metric (request duration), empty when absent."""
+        return self.metrics.get(MAIN_METRIC) or JtlAggregate()
+
+    def summary(self):
+        summary = self.requests.summary()
+        summary['tool'] = 'k6'
+        return summary
+
+    def to_dict(self):
+        return {metric: agg.to_dict() for metric, agg in self.metrics.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        k6 = cls()
+        k6.metrics = {metric: JtlAggregate.from_dict(d) for metric, d in data.items()}
+        return k6
+
+
+def plan_line_shards(path, workers, min_shard_bytes=MIN_SHARD_BYTES):
+    """[(start, end), ...] byte ranges of `path` aligned on line starts."""
+    size = os.path.getsize(path)
+    n = max(1, min(workers, size // max(1, min_shard_bytes)))
+    offsets = [0]
+    with open(path, 'rb') as f:
+        for k in range(1, n):
+            f.seek(k * size // n)
+            f.readline()
+            pos = f.tell()
+            if offsets[-1] < pos < size:
+                offsets.append(pos)
+    offsets.append(size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+
+def _aggregate_shard(path, start, end):
+    return K6Aggregate().add_lines(iter_shard_lines(path, start, end))
+
+
+def aggregate_k6(path, workers=None):
+    """K6Aggregate of a k6 NDJSON output, parsed in parallel byte ranges."""
+    shards = plan_line_shards(path, workers or default_workers())
+    ctx = pool_context()
+    if len(shards) == 1 or ctx is None:
+        result = K6Aggregate()
+        for start, end in shards:
+            result.merge(_aggregate_shard(path, start, end))
+        return result
+    result = K6Aggregate()
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=ctx) as pool:
+        futures = [pool.submit(_aggregate_shard, path, start, end) for start, end in shards]
+        for future in futures:
+            result.merge(future.result())
+    return result
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: k6_stream.py <k6-raw.json> [workers]')
+        sys.exit(1)
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    k6 = aggregate_k6(sys.argv[1], workers)
+    out = {metric: agg.summary() for metric, agg in sorted(k6.metrics.items())}
+    for summary in out.values():
+        summary['tool'] = 'k6'
+    out['groups'] = k6.requests.label_summary()
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""Live metrics while a test runs, by tailing the growing JTL and Locust history.
+
+Every --interval seconds the new bytes appended to each file since the last
+poll are parsed (complete records only; a partial last line waits for the
+next poll), so each update costs O(new rows). For the JTL, per-second
+histograms of the last --window seconds (by sample timestamp) give rolling
+p50/p95/p99, throughput and error rate, overall and per label. For
+locust_stats_history.csv, whose rows are already per-window, the latest row
+per name is kept and rates are averaged over the same window.
+
+Results are published as a JSON file rewritten atomically (--out) and/or as
+Prometheus text on http://localhost:<--prometheus-port>/metrics, so a run
+that breaks early can be spotted (or scraped) while it is still going. The
+endpoint listens on 127.0.0.1 only; --bind 0.0.0.0 exposes it to a
+Prometheus running on another host.
+
+Usage: python scripts/live_tail.py --jtl results.jtl --locust-history locust-teastore/locust_stats_history.csv \\
+           [--window 60] [--interval 5] [--out live-metrics.json] [--prometheus-port 9464] [--bind 127.0.0.1]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from jtl_stream import JtlColumns, StatsBucket
+
+AGGREGATED = 'Aggregated'
+
+
+class FileTailer:
+    """Yields the CSV records appended to a file since the previous poll."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.header = None
+        self.pending = ''
+        self.partial = b''
+
+    def poll(self):
+        """(header, new rows); starts over when the file was truncated or replaced."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return self.header, []
+        if size < self.offset:
+            self.offset, self.header, self.pending, self.partial = 0, None, '', b''
+        if size == self.offset:
+            return self.header, []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = self.partial + f.read(size - self.offset)
+        self.offset = size
+        cut = data.rfind(b'\n') + 1
+        self.partial = data[cut:]
+        records = []
+        for line in data[:cut].decode('utf-8', 'replace').splitlines(keepends=True):
+            # a record ends on a newline outside quotes (responseData may hold newlines)
+            self.pending += line
+            if self.pending.count('"') % 2 == 0:
+                records.append(self.pending)
+                self.pending = ''
+        rows = list(csv.reader(records))
+        if self.header is None and rows:
+            self.header = rows.pop(0)
+        return self.header, rows
+
+
+class RollingJtl:
+    """Cumulative counters plus per-second buckets of the last `window` seconds."""
+
+    def __init__(self, window):
+        self.window = window
+        self.total = StatsBucket()
+        self.labels = {}
+        self.seconds = {}
+        self.newest = None
+
+    def add_rows(self, rows, columns):
+        for row in rows:
+            try:
+                elapsed = float(row[columns.elapsed])
+                sec = int(float(row[columns.timestamp]) // 1000) if columns.timestamp is not None else None
+            except (ValueError, IndexError):
+                continue
+            label = row[columns.label] if columns.label is not None and columns.label < len(row) else ''
+            failed = columns.failed(row)
+            self.total.add(elapsed, failed)
+            self.labels.setdefault(label, StatsBucket()).add(elapsed, failed)
+            if sec is None:
+                continue
+            if self.newest is None or sec > self.newest:
+                self.newest = sec
+            if sec > self.newest - self.window:
+                per_label = self.seconds.setdefault(sec, {})
+                per_label.setdefault(label, StatsBucket()).add(elapsed, failed)
+        if self.newest is not None:
+            for sec in [s for s in self.seconds if s <= self.newest - self.window]:
+                del self.seconds[sec]
+
+    def snapshot(self):
+        window = {}
+        for per_label in self.seconds.values():
+            for label, bucket in per_label.items():
+                for key in (AGGREGATED, label):
+                    window.setdefault(key, StatsBucket()).merge(bucket)
+        span = len(self.seconds) and (self.newest - min(self.seconds) + 1)
+        out = {}
+        for name, cumulative in [(AGGREGATED, self.total)] + sorted(self.labels.items()):
+            out[name] = _window_stats(cumulative, window.get(name), span)
+        return out
+
+
+def _window_stats(cumulative, bucket, span):
+    stats = {'requests_total': cumulative.count, 'errors_total': cumulative.errors,
+             'window_requests': 0, 'throughput_rps': 0.0, 'error_rate': None,
+             'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    if bucket is not None and bucket.count:
+        stats.update({
+            'window_requests': bucket.count,
+            'throughput_rps': bucket.count / span if span else None,
+            'error_rate': bucket.errors / bucket.count,
+            'p50_ms': bucket.hist.quantile(0.5),
+            'p95_ms': bucket.hist.quantile(0.95),
+            'p99_ms': bucket.hist.quantile(0.99),
+        })
+    return stats
+
+
+class RollingLocust:
+    """Latest Locust history row per name, with rates averaged over `window` seconds."""
+
+    def __init__(self, window):
+        self.window = window
+        self.latest = {}
+        self.rates = {}
+
+    def add_rows(self, rows, header):
+        index = {name: i for i, name in enumerate(header)}
+        for row in rows:
+            record = {name: row[i] for name, i in index.items() if i < len(row)}
+            try:
+                ts = int(record['Timestamp'])
+            except (KeyError, ValueError):
+                continue
+            name = record.get('Name') or AGGREGATED
+            self.latest[name] = record
+            rates = self.rates.setdefault(name, deque())
+            rates.append((ts, _float(record.get('Requests/s')) or 0.0, _float(record.get('Failures/s')) or 0.0))
+            while rates and rates[0][0] <= ts - self.window:
+                rates.popleft()
+
+    def snapshot(self):
+        out = {}
+        for name, record in sorted(self.latest.items()):
+            rates = self.rates.get(name) or ()
+            rps = sum(r[1] for r in rates) / len(rates) if rates else 0.0
+            fps = sum(r[2] for r in rates) / len(rates) if rates else 0.0
+            out[name] = {
+                'users': _float(record.get('User Count')),
+                'requests_total': _float(record.get('Total Request Count')),
+                'errors_total': _float(record.get('Total Failure Count')),
+                'throughput_rps': rps,
+                'error_rate': fps / rps if rps else None,
+                'p50_ms': _float(record.get('50%')),
+                'p95_ms': _float(record.get('95%')),
+                'p99_ms': _float(record.get('99%')),
+            }
+        return out
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def prometheus_text(snapshot):
+    """Prometheus exposition format of a snapshot {tool: {label: stats}}."""
+    lines = []
+    metrics = (
+        ('requests_total', 'counter', 'Requests seen since the start'),
+        ('errors_total', 'counter', 'Failed requests since the start'),
+        ('throughput_rps', 'gauge', 'Requests per second over the rolling window'),
+        ('error_rate', 'gauge', 'Failed share of the rolling window'),
+        ('users', 'gauge', 'Simulated users (Locust)'),
+    )
+    tools = {k: v for k, v in snapshot.items() if isinstance(v, dict)}
+    for key, kind, help_text in metrics:
+        name = f'teastore_live_{key}'
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for tool, labels in tools.items():
+            for label, stats in labels.items():
+                if stats.get(key) is not None:
+                    lines.append(f'{name}{{tool="{tool}",label="{_escape(label)}"}} {stats[key]}')
+    name = 'teastore_live_latency_ms'
+    lines += [f'# HELP {name} Latency quantiles over the rolling window', f'# TYPE {name} gauge']
+    for tool, labels in tools.items():
+        for label, stats in labels.items():
+            for q, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms'), ('0.99', 'p99_ms')):
+                if stats.get(key) is not None:
+                    lines.append(f'{name}{{tool="{tool}",label="{_escape(label)}",quantile="{q}"}} {stats[key]}')
+    return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+DEFAULT_BIND = '127.0.0.1'
+
+
+class MetricsServer:
+    """Serves the latest Prometheus text on /metrics from a daemon thread."""
+
+    def __init__(self, port, bind=DEFAULT_BIND):
+        self.text = ''
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = server.text.encode()
+                self.send_response(200 if self.path.startswith('/metrics') else 404)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((bind, port), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+
+def write_json(path, snapshot):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Métricas ao vivo acompanhando o JTL e o histórico do Locust")
+    parser.add_argument("--jtl", help="JTL (CSV) do JMeter sendo escrito")
+    parser.add_argument("--locust-history", help="locust_stats_history.csv sendo escrito")
+    parser.add_argument("--window", type=int, default=60, help="Janela móvel em segundos (padrão 60)")
+    parser.add_argument("--interval", type=float, default=5.0, help="Intervalo entre leituras em segundos")
+    parser.add_argument("--out", help="JSON reescrito a cada leitura")
+    parser.add_argument("--prometheus-port", type=int, help="Porta HTTP do endpoint /metrics")
+    parser.add_argument("--bind", default=DEFAULT_BIND,
+                        help=f"Interface do endpoint /metrics (padrão {DEFAULT_BIND}; 0.0.0.0 expõe em todas)")
+    parser.add_argument("--duration", type=float, help="Encerra após N segundos (padrão: até Ctrl+C)")
+    parser.add_argument("--once", action="store_true", help="Uma única leitura e sai")
+    args = parser.parse_args()
+
+    if not args.jtl and not args.locust_history:
+        parser.error("informe --jtl e/ou --locust-history")
+    if not args.out and args.prometheus_port is None and not args.once:
+        parser.error("informe --out e/ou --prometheus-port")
+
+    sources = []
+    if args.jtl:
+        sources.append(('jmeter', FileTailer(args.jtl), RollingJtl(args.window)))
+    if args.locust_history:
+        sources.append(('locust', FileTailer(args.locust_history), RollingLocust(args.window)))
+    server = MetricsServer(args.prometheus_port, args.bind) if args.prometheus_port is not None else None
+    if server:
+        print(f"✅ Métricas em http://{args.bind}:{args.prometheus_port}/metrics")
+
+    deadline = time.monotonic() + args.duration if args.duration else None
+    try:
+        while True:
+            snapshot = {'updated_at': time.time(), 'window_seconds': args.window}
+            for tool, tailer, rolling in sources:
+                header, rows = tailer.poll()
+                if rows:
+                    rolling.add_rows(rows, JtlColumns(header) if tool == 'jmeter' else header)
+                snapshot[tool] = rolling.snapshot()
+            if args.out:
+                write_json(args.out, snapshot)
+            if server:
+                server.text = prometheus_text(snapshot)
+            if args.once:
+                if not args.out:
+                    json.dump(snapshot, sys.stdout, indent=2)
+                    print()
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
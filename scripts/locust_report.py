@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""Locust results extraction from JSON, CSV or HTML reports, many at a time.
+
+Every input becomes the same dict: per-endpoint statistics with full
+percentiles, the aggregated row and the time series (users, rps, failures/s,
+current p50/p95, average). Accepted inputs:
+
+  - `--json-file` output (stats entries with their response-time histograms)
+  - `--csv` output: `<prefix>_stats.csv`, with `<prefix>_stats_history.csv`
+    next to it for the series (a prefix or either file may be given)
+  - `--html` reports: the embedded payload (`window.templateArgs = {...}` in
+    current Locust, `const V={...}` in older ones) is located by a chunked
+    scanner that matches braces outside strings, so the page is never held
+    in memory as a whole and the payload is bounded by --max-payload-mb
+
+Reports are processed in parallel, one process per file.
+
+Usage: python scripts/locust_report.py <report> [<report> ...] [--workers N] [--out locust-data.json]
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from jtl_parallel import default_workers, pool_context
+
+AGGREGATED = 'Aggregated'
+PAYLOAD_MARKERS = (b'window.templateArgs = ', b'const V=')
+CHUNK_BYTES = 1024 * 1024
+DEFAULT_MAX_PAYLOAD_MB = 256
+QUANTILES = ('0.5', '0.66', '0.75', '0.8', '0.9', '0.95', '0.98', '0.99', '0.999', '0.9999', '1.0')
+
+_CAMEL = re.compile(r'(?<=[a-z0-9])([A-Z])')
+_STRUCTURAL = re.compile(rb'[{}"\\]')
+
+
+# --- HTML payload scanner ----------------------------------------------------
+def scan_payload(path, max_bytes=DEFAULT_MAX_PAYLOAD_MB * 1024 * 1024):
+    """Text of the JSON object embedded in a Locust HTML report, or None.
+
+    The file is read in chunks; the marker is searched with a small overlap
+    between chunks, then the object is delimited by counting braces outside
+    JSON strings.
+    """
+    overlap = max(len(m) for m in PAYLOAD_MARKERS) - 1
+    with open(path, 'rb') as f:
+        window = b''
+        start = None
+        while start is None:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                return None
+            window = window[-overlap:] + chunk
+            for marker in PAYLOAD_MARKERS:
+                pos = window.find(marker)
+                if pos >= 0:
+                    start = pos + len(marker)
+                    break
+        data = window[start:]
+        parts = []
+        size = 0
+        depth = 0
+        in_string = False
+        skip = 0  # index of a character escaped by a backslash, not structural
+        while True:
+            for m in _STRUCTURAL.finditer(data, skip):
+                i = m.start()
+                if i < skip:
+                    continue
+                ch = data[i]
+                if in_string:
+                    if ch == 0x5c:
+                        skip = i + 2
+                    elif ch == 0x22:
+                        in_string = False
+                elif ch == 0x22:
+                    in_string = True
+                elif ch == 0x7b:
+                    depth += 1
+                elif ch == 0x7d:
+                    depth -= 1
+                    if depth == 0:
+                        parts.append(data[:i + 1])
+                        return b''.join(parts).decode('utf-8', 'replace')
+            parts.append(data)
+            size += len(data)
+            if size > max_bytes:
+                raise ValueError(f'{path}: payload maior que {max_bytes // (1024 * 1024)} MB')
+            # an escape on the chunk's last byte covers the first byte of the next one
+            skip = max(0, skip - len(data))
+            data = f.read(CHUNK_BYTES)
+            if not data:
+                return None
+
+
+def _snake(key):
+    return _CAMEL.sub(r'_\1', key).lower()
+
+
+def _snake_keys(value):
+    if isinstance(value, dict):
+        return {_snake(k): _snake_keys(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_snake_keys(v) for v in value]
+    return value
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _epoch(value):
+    """Epoch seconds of a history timestamp (ISO 8601, UTC when no offset); None if unparseable."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        stamp = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
+
+
+def _quantile_key(key):
+    """'0.95' for keys like 'response_time_percentile_0.95', '0.95' or '95%'; else None."""
+    key = str(key)
+    if key.endswith('%'):
+        q = _float(key[:-1])
+        return None if q is None else _fmt_q(q / 100)
+    q = _float(key.rsplit('_', 1)[-1])
+    if q is not None and 0 < q <= 1 and ('percentile' in key or key == key.rsplit('_', 1)[-1]):
+        return _fmt_q(q)
+    return None
+
+
+def _fmt_q(q):
+    return f'{q:g}' if q < 1 else '1.0'
+
+
+def from_html(path, max_payload_mb=DEFAULT_MAX_PAYLOAD_MB):
+    text = scan_payload(path, max_payload_mb * 1024 * 1024)
+    if text is None:
+        raise ValueError(f'{path}: dados do relatório Locust não encontrados')
+    data = _snake_keys(json.loads(text))
+    percentiles = {}
+    for row in data.get('response_time_statistics', []):
+        key = (row.get('method') or '', row.get('name'))
+        percentiles[key] = {q: _float(v) for k, v in row.items() if (q := _quantile_key(k))}
+    endpoints = []
+    for row in data.get('requests_statistics', []):
+        key = (row.get('method') or '', row.get('name'))
+        pcts = dict(percentiles.get(key, {}))
+        for k, v in row.items():
+            q = _quantile_key(k)
+            if q and q not in pcts:
+                pcts[q] = _float(v)
+        if row.get('median_response_time') is not None:
+            pcts.setdefault('0.5', _float(row['median_response_time']))
+        endpoints.append({
+            'name': row.get('name'),
+            'method': row.get('method') or '',
+            'requests': int(row.get('num_requests') or 0),
+            'failures': int(row.get('num_failures') or 0),
+            'avg_ms': _float(row.get('avg_response_time')),
+            'min_ms': _float(row.get('min_response_time')),
+            'max_ms': _float(row.get('max_response_time')),
+            'rps': _float(row.get('total_rps')),
+            'fail_per_s': _float(row.get('total_fail_per_sec')),
+            'percentiles': pcts,
+        })
+    history = []
+    for point in data.get('history', []):
+        # current reports store [time, value] pairs, older ones plain values
+        value = {k: (v[-1] if isinstance(v, list) and v else v) for k, v in point.items()}
+        history.append({
+            'time': _epoch(value.get('time')),
+            'users': _float(value.get('user_count')),
+            'rps': _float(value.get('current_rps')),
+            'fail_per_s': _float(value.get('current_fail_per_sec')),
+            'p50_ms': _float(value.get('response_time_percentile_0.5')),
+            'p95_ms': _float(value.get('response_time_percentile_0.95')),
+            'avg_ms': _float(value.get('total_avg_response_time')),
+        })
+    return _report(path, 'html', endpoints, history,
+                   {'start_time': data.get('start_time'), 'end_time': data.get('end_time'),
+                    'host': data.get('host')})
+
+
+# --- CSV and JSON --------------------------------------------------------------
+def _csv_prefix(path):
+    for suffix in ('_stats_history.csv', '_stats.csv'):
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def from_csv(path):
+    prefix = _csv_prefix(path)
+    endpoints = []
+    stats_csv = f'{prefix}_stats.csv'
+    if os.path.exists(stats_csv):
+        with open(stats_csv, newline='') as f:
+            for row in csv.DictReader(f):
+                name = row.get('Name') or ''
+                endpoints.append({
+                    'name': AGGREGATED if name.lower() in ('total', 'aggregated') else name,
+                    'method': row.get('Type') or '',
+                    'requests': int(_float(row.get('Request Count')) or 0),
+                    'failures': int(_float(row.get('Failure Count')) or 0),
+                    'avg_ms': _float(row.get('Average Response Time')),
+                    'min_ms': _float(row.get('Min Response Time')),
+                    'max_ms': _float(row.get('Max Response Time')),
+                    'rps': _float(row.get('Requests/s')),
+                    'fail_per_s': _float(row.get('Failures/s')),
+                    'percentiles': {q: _float(v) for k, v in row.items() if (q := _quantile_key(k))},
+                })
+    history = []
+    history_csv = f'{prefix}_stats_history.csv'
+    if os.path.exists(history_csv):
+        with open(history_csv, newline='') as f:
+            for row in csv.DictReader(f):
+                if (row.get('Name') or AGGREGATED) != AGGREGATED:
+                    continue
+                history.append({
+                    'time': _float(row.get('Timestamp')),
+                    'users': _float(row.get('User Count')),
+                    'rps': _float(row.get('Requests/s')),
+                    'fail_per_s': _float(row.get('Failures/s')),
+                    'p50_ms': _float(row.get('50%')),
+                    'p95_ms': _float(row.get('95%')),
+                    'avg_ms': _float(row.get('Total Average Response Time')),
+                })
+    if not endpoints and not history:
+        raise ValueError(f'{path}: nenhum CSV do Locust encontrado ({prefix}_stats*.csv)')
+    return _report(path, 'csv', endpoints, history)
+
+
+def _histogram_percentiles(response_times):
+    """Percentiles from Locust's {rounded_ms: count} histogram."""
+    points = sorted((float(k), n) for k, n in response_times.items())
+    total = sum(n for _, n in points)
+    out = {}
+    if not total:
+        return out
+    for q in QUANTILES:
+        target = float(q) * total
+        seen = 0
+        for value, n in points:
+            seen += n
+            if seen >= target:
+                out[q] = value
+                break
+    return out
+
+
+def from_json(path):
+    with open(path) as f:
+        entries = json.load(f)
+    endpoints = []
+    merged = {}
+    start = end = None
+    for e in entries:
+        n = e.get('num_requests', 0)
+        duration = (e.get('last_request_timestamp') or 0) - (e.get('start_time') or 0)
+        for k, c in e.get('response_times', {}).items():
+            merged[k] = merged.get(k, 0) + c
+        start = e.get('start_time') if start is None else min(start, e.get('start_time') or start)
+        end = e.get('last_request_timestamp') if end is None else max(end, e.get('last_request_timestamp') or end)
+        endpoints.append({
+            'name': e.get('name'),
+            'method': e.get('method') or '',
+            'requests': n,
+            'failures': e.get('num_failures', 0),
+            'avg_ms': e['total_response_time'] / n if n else None,
+            'min_ms': e.get('min_response_time'),
+            'max_ms': e.get('max_response_time'),
+            'rps': n / duration if duration > 0 else None,
+            'fail_per_s': e.get('num_failures', 0) / duration if duration > 0 else None,
+            'percentiles': _histogram_percentiles(e.get('response_times', {})),
+        })
+    if endpoints:
+        n = sum(e['requests'] for e in endpoints)
+        failures = sum(e['failures'] for e in endpoints)
+        duration = (end or 0) - (start or 0)
+        mins = [e['min_ms'] for e in endpoints if e['min_ms'] is not None]
+        maxs = [e['max_ms'] for e in endpoints if e['max_ms'] is not None]
+        endpoints.append({
+            'name': AGGREGATED, 'method': '', 'requests': n, 'failures': failures,
+            'avg_ms': sum(e.get('total_response_time', 0) for e in entries) / n if n else None,
+            'min_ms': min(mins) if mins else None, 'max_ms': max(maxs) if maxs else None,
+            'rps': n / duration if duration > 0 else None,
+            'fail_per_s': failures / duration if duration > 0 else None,
+            'percentiles': _histogram_percentiles(merged),
+        })
+    return _report(path, 'json', endpoints, [])
+
+
+def _report(path, fmt, endpoints, history, meta=None):
+    aggregated = next((e for e in endpoints if e['name'] == AGGREGATED), None)
+    return {'source': path, 'format': fmt, 'meta': meta or {}, 'aggregated': aggregated,
+            'endpoints': [e for e in endpoints if e['name'] != AGGREGATED], 'history': history}
+
+
+def extract(path, max_payload_mb=DEFAULT_MAX_PAYLOAD_MB):
+    """Normalized report dict for one Locust output file."""
+    lower = path.lower()
+    if lower.endswith(('.html', '.htm')):
+        return from_html(path, max_payload_mb)
+    if lower.endswith('.json'):
+        return from_json(path)
+    return from_csv(path)
+
+
+def _extract_safe(path, max_payload_mb):
+    try:
+        return extract(path, max_payload_mb)
+    except Exception as e:
+        return {'source': path, 'error': str(e)}
+
+
+def extract_many(paths, workers=None, max_payload_mb=DEFAULT_MAX_PAYLOAD_MB):
+    """Reports for `paths`, in order, extracted in parallel processes."""
+    workers = min(workers or default_workers(), len(paths))
+    ctx = pool_context()
+    if workers <= 1 or ctx is None:
+        return [_extract_safe(p, max_payload_mb) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        return list(pool.map(_extract_safe, paths, [max_payload_mb] * len(paths)))
+
+
+def print_report(report):
+    print(f"\n=== LOCUST {report['source']} ===")
+    if 'error' in report:
+        print(f"Erro ao processar: {report['error']}")
+        return
+    total = report['aggregated']
+    if total:
+        print(f"Avg Response Time: {total['avg_ms'] or 0:.0f} ms")
+        print(f"Min Response Time: {total['min_ms'] or 0:.0f} ms")
+        print(f"Max Response Time: {total['max_ms'] or 0:.0f} ms")
+        print(f"Total RPS: {total['rps'] or 0:.2f}")
+        print(f"Total Failures/s: {total['fail_per_s'] or 0:.2f}")
+        print(f"Num Requests: {total['requests']}")
+        print(f"Num Failures: {total['failures']}")
+        if total['percentiles']:
+            print('\nPercentis:')
+            for q, value in total['percentiles'].items():
+                print(f"p{float(q) * 100:g}: {value} ms")
+    print(f"Endpoints: {len(report['endpoints'])} | pontos da série temporal: {len(report['history'])}")
+
+
+def main(default_reports=None):
+    parser = argparse.ArgumentParser(description="Extrai estatísticas de relatórios do Locust (JSON, CSV ou HTML)")
+    parser.add_argument("reports", nargs="*" if default_reports else "+",
+                        help="Relatórios HTML, --json-file ou prefixo/arquivos do --csv")
+    parser.add_argument("--workers", type=int, default=0, help="Processos (0 = um por núcleo)")
+    parser.add_argument("--max-payload-mb", type=int, default=DEFAULT_MAX_PAYLOAD_MB,
+                        help="Tamanho máximo dos dados embutidos no HTML")
+    parser.add_argument("--out", help="JSON com todos os relatórios extraídos")
+    args = parser.parse_args()
+    if not args.reports:
+        args.reports = default_reports
+
+    reports = extract_many(args.reports, args.workers or None, args.max_payload_mb)
+    for report in reports:
+        print_report(report)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f"\n✅ Dados gravados em {args.out}")
+    if all('error' in r for r in reports):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
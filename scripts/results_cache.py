@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""Columnar on-disk cache of parsed CSV results (JTL, Locust stats history).
+
+The first read of `<file>` converts it into typed binary columns stored in
+`<file>.cache/`: numeric columns as float64, every other column as int32
+codes into a per-column dictionary. Column kinds are guessed from the first
+rows; a numeric guess that meets a non-numeric value later (a JMeter
+responseCode turning into "Non HTTP response code: ..." after warm-up)
+makes the conversion run again with that column as a dictionary, and JMeter's
+text columns are always dictionaries. Later reads memory-map those columns
+instead of parsing text. The cache is keyed by size + mtime and, when those
+changed, by the SHA-256 of the content, so touching a file does not force a
+rebuild while any real change does.
+
+Conversion runs in the same newline-aligned byte-range shards as
+jtl_parallel, one process per core; each shard becomes one cache part.
+Requires numpy and pandas; callers fall back to text parsing without them.
+
+Usage: python scripts/results_cache.py <csv-file> [<csv-file> ...]
+Produces: <csv-file>.cache/ next to each input
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+    import pandas as pd
+    HAS_DEPS = True
+except Exception:
+    np = None
+    pd = None
+    HAS_DEPS = False
+
+from jtl_parallel import aggregate_jtl_parallel, default_workers, plan_shards, pool_context
+from jtl_stream import JtlAggregate, StatsBucket, TRUE_VALUES, LOG_GAMMA
+
+CACHE_VERSION = 2
+MANIFEST = 'manifest.json'
+CHUNK_ROWS = 200_000
+SCHEMA_SAMPLE_ROWS = 1000
+NA_VALUES = ('', 'N/A', 'NaN', 'nan', 'null')
+# JTL columns that hold text even when the first rows look numeric
+DICT_COLUMNS = ('label', 'responsecode', 'responsemessage', 'threadname', 'datatype', 'success',
+                'failuremessage', 'url', 'hostname')
+
+
+def cache_dir_for(path):
+    return path + '.cache'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_info(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(cache_dir, manifest):
+    tmp = os.path.join(cache_dir, MANIFEST + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(cache_dir, MANIFEST))
+
+
+def is_fresh(path, manifest):
+    """True when `manifest` describes the current content of `path`."""
+    if not manifest or manifest.get('version') != CACHE_VERSION:
+        return False
+    source = manifest['source']
+    info = _source_info(path)
+    if info['size'] != source['size']:
+        return False
+    if info['mtime_ns'] == source['mtime_ns']:
+        return True
+    return file_sha256(path) == source['sha256']
+
+
+class _RangeReader:
+    """Read-only file object limited to the byte range [start, end)."""
+
+    def __init__(self, f, start, end):
+        self.f = f
+        self.remaining = end - start
+        f.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+def _infer_schema(path, header):
+    """'num' for columns whose sampled values are all numeric, else 'dict'."""
+    sample = pd.read_csv(path, dtype=str, keep_default_na=False, nrows=SCHEMA_SAMPLE_ROWS,
+                         index_col=False, on_bad_lines='skip')
+    kinds = []
+    for k in range(len(header)):
+        values = sample.iloc[:, k] if k < sample.shape[1] else pd.Series([], dtype=str)
+        present = values[~values.isin(NA_VALUES)]
+        numeric = pd.to_numeric(present, errors='coerce')
+        text = header[k].strip().lower() in DICT_COLUMNS
+        kinds.append('num' if not text and len(present) and not numeric.isna().any() else 'dict')
+    return kinds
+
+
+def _build_part(path, start, end, header, kinds, part_prefix):
+    """Convert one byte range into column files; returns (rows, dictionaries, mistyped).
+
+    `mistyped` lists the 'num' columns that held non-numeric values.
+    """
+    dictionaries = [{} if kind == 'dict' else None for kind in kinds]
+    files = [open(f'{part_prefix}.c{k}.bin', 'wb') for k in range(len(kinds))]
+    mistyped = set()
+    rows = 0
+    try:
+        with open(path, 'rb') as f:
+            reader = pd.read_csv(_RangeReader(f, start, end), header=None, names=header,
+                                 dtype=str, keep_default_na=False, index_col=False,
+                                 on_bad_lines='skip', chunksize=CHUNK_ROWS)
+            for chunk in reader:
+                rows += len(chunk)
+                for k, kind in enumerate(kinds):
+                    col = chunk.iloc[:, k].fillna('')
+                    if kind == 'num':
+                        missing = col.isin(NA_VALUES)
+                        arr = pd.to_numeric(col.where(~missing), errors='coerce')
+                        if k not in mistyped and (arr.isna() & ~missing).any():
+                            mistyped.add(k)
+                        arr.to_numpy(dtype=np.float64, na_value=np.nan).tofile(files[k])
+                    else:
+                        mapping = dictionaries[k]
+                        for value in col.unique():
+                            if value not in mapping:
+                                mapping[value] = len(mapping)
+                        col.map(mapping).to_numpy(dtype=np.int32).tofile(files[k])
+    finally:
+        for fh in files:
+            fh.close()
+    return rows, [list(d) if d is not None else None for d in dictionaries], sorted(mistyped)
+
+
+def build_cache(path, workers=None):
+    """(Re)build the columnar cache of `path` and return its manifest."""
+    cache_dir = cache_dir_for(path)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.makedirs(cache_dir)
+    source = _source_info(path)
+    source['sha256'] = file_sha256(path)
+
+    header, shards = plan_shards(path, workers or default_workers())
+    kinds = _infer_schema(path, header)
+    prefixes = [os.path.join(cache_dir, f'part-{k:04d}') for k in range(len(shards))]
+    ctx = pool_context()
+    while True:
+        args = [(path, s, e, header, kinds, p) for (s, e), p in zip(shards, prefixes)]
+        if len(shards) == 1 or ctx is None:
+            results = [_build_part(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=len(shards), mp_context=ctx) as pool:
+                results = list(pool.map(_build_part, *zip(*args)))
+        mistyped = sorted({k for _, _, bad in results for k in bad})
+        if not mistyped:
+            break
+        # the sample guessed wrong: convert again with those columns as text (at most once)
+        print(f"⚠️  {path}: colunas {', '.join(header[k] for k in mistyped)} com valores não numéricos "
+              'após a amostra; reconvertendo como texto.', file=sys.stderr)
+        for k in mistyped:
+            kinds[k] = 'dict'
+
+    # merge per-part dictionaries into one per column and remap codes in place
+    columns = []
+    for k, (name, kind) in enumerate(zip(header, kinds)):
+        column = {'name': name, 'kind': kind}
+        if kind == 'dict':
+            merged = {}
+            for (rows, dicts, _), prefix in zip(results, prefixes):
+                remap = np.empty(max(1, len(dicts[k])), dtype=np.int32)
+                for code, value in enumerate(dicts[k]):
+                    remap[code] = merged.setdefault(value, len(merged))
+                if rows and not np.array_equal(remap[:len(dicts[k])], np.arange(len(dicts[k]))):
+                    codes = np.memmap(f'{prefix}.c{k}.bin', dtype=np.int32, mode='r+', shape=(rows,))
+                    codes[:] = remap[codes]
+                    codes.flush()
+                    del codes
+            column['dictionary'] = list(merged)
+        columns.append(column)
+
+    manifest = {
+        'version': CACHE_VERSION,
+        'source': source,
+        'columns': columns,
+        'parts': [{'prefix': os.path.basename(p), 'rows': r[0]} for p, r in zip(prefixes, results)],
+    }
+    _write_manifest(cache_dir, manifest)
+    return manifest
+
+
+class CachedTable:
+    """Memory-mapped view of a cached CSV, split in parts (row groups)."""
+
+    def __init__(self, cache_dir, manifest):
+        self.cache_dir = cache_dir
+        self.manifest = manifest
+        self.columns = manifest['columns']
+        self.names = [c['name'] for c in self.columns]
+        self.parts = manifest['parts']
+
+    @property
+    def rows(self):
+        return sum(p['rows'] for p in self.parts)
+
+    def index(self, name):
+        """Position of a column, matched case-insensitively; None if absent."""
+        lowered = [n.strip().lower() for n in self.names]
+        name = name.lower()
+        return lowered.index(name) if name in lowered else None
+
+    def part_column(self, part, k):
+        """Raw array (float64 values or int32 codes) of column k in one part."""
+        dtype = np.float64 if self.columns[k]['kind'] == 'num' else np.int32
+        if not part['rows']:
+            return np.empty(0, dtype=dtype)
+        fname = os.path.join(self.cache_dir, f"{part['prefix']}.c{k}.bin")
+        return np.memmap(fname, dtype=dtype, mode='r', shape=(part['rows'],))
+
+    def column(self, k):
+        arrays = [self.part_column(p, k) for p in self.parts]
+        return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+    def to_frame(self):
+        """pandas DataFrame equivalent to reading the CSV (text columns as categoricals)."""
+        data = {}
+        for k, column in enumerate(self.columns):
+            values = self.column(k)
+            if column['kind'] == 'dict':
+                values = pd.Categorical.from_codes(values, categories=column['dictionary'])
+            data[column['name']] = values
+        return pd.DataFrame(data)
+
+
+def open_cache(path, workers=None):
+    """CachedTable for `path`, building or refreshing the cache when needed."""
+    cache_dir = cache_dir_for(path)
+    manifest = _read_manifest(cache_dir)
+    if not is_fresh(path, manifest):
+        manifest = build_cache(path, workers)
+    elif manifest['source']['mtime_ns'] != _source_info(path)['mtime_ns']:
+        # same content, new mtime: remember it to skip hashing next time
+        manifest['source'].update(_source_info(path))
+        _write_manifest(cache_dir, manifest)
+    return CachedTable(cache_dir, manifest)
+
+
+def read_frame(path, workers=None):
+    """DataFrame of a CSV, memory-mapped from its columnar cache."""
+    return open_cache(path, workers).to_frame()
+
+
+def group_histograms(groups, values, failed):
+    """{group: StatsBucket} from parallel arrays, fully vectorized."""
+    out = {}
+    if not len(groups):
+        return out
+    order = np.argsort(groups, kind='stable')
+    g, v, bad = groups[order], values[order], failed[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(g)) + 1]
+    counts = np.diff(np.r_[starts, len(g)])
+    sums = np.add.reduceat(v, starts)
+    mins = np.minimum.reduceat(v, starts)
+    maxs = np.maximum.reduceat(v, starts)
+    errors = np.add.reduceat(bad.astype(np.int64), starts)
+    zeros = np.add.reduceat((v <= 0).astype(np.int64), starts)
+
+    positive = v > 0
+    gp = g[positive]
+    idx = np.ceil(np.log(v[positive]) / LOG_GAMMA).astype(np.int64)
+    # one int64 key per (group, bucket) pair; bucket indices stay well within +-2**20
+    keys, key_counts = np.unique((gp.astype(np.int64) << 21) | (idx + (1 << 20)),
+                                 return_counts=True)
+
+    for j, group in enumerate(g[starts].tolist()):
+        bucket = StatsBucket()
+        hist = bucket.hist
+        hist.count = int(counts[j])
+        hist.total = float(sums[j])
+        hist.min = float(mins[j])
+        hist.max = float(maxs[j])
+        hist.zeros = int(zeros[j])
+        bucket.errors = int(errors[j])
+        out[group] = bucket
+    for key, n in zip(keys.tolist(), key_counts.tolist()):
+        out[key >> 21].hist.buckets[(key & ((1 << 21) - 1)) - (1 << 20)] = n
+    return out
+
+
+def success_codes(table):
+    """(column, dictionary codes of successful samples), or None when failures are unknown.
+
+    The success column when present; otherwise the responseCode, where only
+    2xx counts as success (as jtl_stream.JtlColumns.failed).
+    """
+    k = table.index('success')
+    if k is not None:
+        ok = [c for c, s in enumerate(table.columns[k]['dictionary']) if s.strip().lower() in TRUE_VALUES]
+    else:
+        k = table.index('responsecode')
+        if k is None or table.columns[k]['kind'] != 'dict':
+            return None
+        ok = [c for c, s in enumerate(table.columns[k]['dictionary']) if s.strip().startswith('2')]
+    return k, np.array(ok, dtype=np.int32)
+
+
+def aggregate_table(table):
+    """JtlAggregate computed from a cached JTL without touching its text."""
+    agg = JtlAggregate()
+    i_elapsed = table.index('elapsed')
+    if i_elapsed is None:
+        i_elapsed = 0
+    i_label = table.index('label')
+    success = success_codes(table)
+    i_ts = table.index('timestamp')
+    agg.has_success = success is not None
+    agg.has_timestamp = i_ts is not None
+    if table.columns[i_elapsed]['kind'] != 'num':
+        return agg
+
+    labels = table.columns[i_label]['dictionary'] if i_label is not None else ['']
+
+    for part in table.parts:
+        elapsed = np.asarray(table.part_column(part, i_elapsed))
+        keep = ~np.isnan(elapsed)
+        elapsed = elapsed[keep]
+        if i_label is not None:
+            label_codes = np.asarray(table.part_column(part, i_label))[keep]
+        else:
+            label_codes = np.zeros(len(elapsed), dtype=np.int32)
+        if success is not None:
+            failed = ~np.isin(np.asarray(table.part_column(part, success[0]))[keep], success[1])
+        else:
+            failed = np.zeros(len(elapsed), dtype=bool)
+
+        partial = JtlAggregate()
+        partial.total = group_histograms(np.zeros(len(elapsed), dtype=np.int8),
+                                          elapsed, failed).get(0, StatsBucket())
+        partial.labels = {labels[c]: b for c, b in
+                          group_histograms(label_codes, elapsed, failed).items()}
+        if i_ts is not None and table.columns[i_ts]['kind'] == 'num':
+            ts = np.asarray(table.part_column(part, i_ts))[keep]
+            has_ts = ~np.isnan(ts)
+            secs = np.floor_divide(ts[has_ts], 1000).astype(np.int64)
+            values, bad = elapsed[has_ts], failed[has_ts]
+            partial.seconds = group_histograms(secs, values, bad)
+            if len(secs):
+                partial.first, partial.last = int(secs.min()), int(secs.max())
+            if len(secs):
+                # (label, second) pairs packed in one key, seconds relative to the part start
+                base = int(secs.min())
+                pairs = (label_codes[has_ts].astype(np.int64) << 23) | (secs - base)
+                for key, bucket in group_histograms(pairs, values, bad).items():
+                    label = labels[key >> 23]
+                    partial.label_seconds.setdefault(label, {})[base + (key & ((1 << 23) - 1))] = bucket
+        agg.merge(partial)
+    return agg
+
+
+def load_jtl_aggregate(path, workers=None):
+    """JtlAggregate of a CSV JTL, through the columnar cache when available."""
+    if HAS_DEPS:
+        try:
+            return aggregate_table(open_cache(path, workers))
+        except Exception as e:
+            print(f'⚠️  Cache colunar indisponível para {path} ({e}); lendo o texto.')
+    return aggregate_jtl_parallel(path, workers)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: results_cache.py <csv-file> [<csv-file> ...]')
+        sys.exit(1)
+    if not HAS_DEPS:
+        print('ERROR: numpy/pandas are required for the columnar cache. Install with: pip install -r requirements.txt')
+        sys.exit(2)
+    for path in sys.argv[1:]:
+        started = time.perf_counter()
+        table = open_cache(path)
+        print(f'{path}: {table.rows} rows, {len(table.names)} columns '
+              f'({time.perf_counter() - started:.2f}s) -> {table.cache_dir}')
+
+
+if __name__ == '__main__':
+    main()
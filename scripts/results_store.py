@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""Historical results store (SQLite) for cross-run trend queries.
+
+Each CI run overwrites summary-unified.json, locust_stats.csv and the JTL;
+this store keeps one row per run, per tool and per endpoint with the
+aggregates (requests, errors, mean, p50/p90/p95/p99, max, throughput), plus
+the per-second series, so trends are SQL queries over indexed tables instead
+of re-reads of raw files:
+
+  python scripts/results_store.py record --scenario cenario-500-vus \\
+      --jmeter jmeter-teastore/results.jtl --locust-csv locust-teastore/locust --k6 k6-complex.json
+  python scripts/results_store.py query --endpoint "GET Produto" --metric p95_ms --last 50
+  python scripts/results_store.py runs --last 20
+
+Runs are keyed by --run-id (default: GITHUB_RUN_ID-GITHUB_RUN_ATTEMPT) and
+tagged with the git SHA, the scenario (cenario-100/500/1000-vus,
+cenarios-complexos) and the start time. Recording the same run id again
+replaces its rows. The database defaults to results-history.sqlite.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+DEFAULT_DB = 'results-history.sqlite'
+AGGREGATED = 'Aggregated'
+METRICS = ('requests', 'errors', 'avg_ms', 'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms',
+           'throughput_rps')
+SERIES_METRICS = ('requests', 'errors', 'avg_ms', 'p95_ms')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    git_sha     TEXT,
+    scenario    TEXT,
+    started_at  REAL,
+    recorded_at REAL
+);
+CREATE INDEX IF NOT EXISTS runs_scenario_started ON runs (scenario, started_at);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at);
+CREATE INDEX IF NOT EXISTS runs_git_sha ON runs (git_sha);
+
+CREATE TABLE IF NOT EXISTS endpoint_stats (
+    run_id         TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    tool           TEXT NOT NULL,
+    endpoint       TEXT NOT NULL,
+    requests       INTEGER,
+    errors         INTEGER,
+    avg_ms         REAL,
+    p50_ms         REAL,
+    p90_ms         REAL,
+    p95_ms         REAL,
+    p99_ms         REAL,
+    max_ms         REAL,
+    throughput_rps REAL,
+    PRIMARY KEY (run_id, tool, endpoint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS endpoint_stats_endpoint ON endpoint_stats (endpoint, tool, run_id);
+
+CREATE TABLE IF NOT EXISTS series (
+    run_id   TEXT NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    tool     TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    second   INTEGER NOT NULL,
+    -- requests and errors per second over the bucket starting at `second`
+    requests REAL,
+    errors   REAL,
+    avg_ms   REAL,
+    p95_ms   REAL,
+    PRIMARY KEY (run_id, tool, endpoint, second)
+) WITHOUT ROWID;
+"""
+
+
+def connect(path=DEFAULT_DB):
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def default_run_id():
+    run_id = os.getenv('GITHUB_RUN_ID')
+    if run_id:
+        return f"{run_id}-{os.getenv('GITHUB_RUN_ATTEMPT', '1')}"
+    return time.strftime('local-%Y%m%d-%H%M%S')
+
+
+def default_git_sha():
+    sha = os.getenv('GITHUB_SHA')
+    if sha:
+        return sha
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+# --- per-tool extraction: (endpoint rows, series rows) -------------------------
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _bucket_row(bucket, throughput=None):
+    hist = bucket.hist
+    return {
+        'requests': bucket.count,
+        'errors': bucket.errors,
+        'avg_ms': hist.mean(),
+        'p50_ms': hist.quantile(0.5),
+        'p90_ms': hist.quantile(0.9),
+        'p95_ms': hist.quantile(0.95),
+        'p99_ms': hist.quantile(0.99),
+        'max_ms': hist.max,
+        'throughput_rps': throughput,
+    }
+
+
+def jmeter_rows(agg):
+    """Endpoint and series rows from a JtlAggregate."""
+    span = None
+    if agg.seconds:
+        span = agg.last - agg.first + 1
+    endpoints = {AGGREGATED: _bucket_row(agg.total, agg.throughput())}
+    for label, bucket in agg.labels.items():
+        endpoints[label] = _bucket_row(bucket, bucket.count / span if span else None)
+    series = []
+    # long runs keep buckets of agg.width seconds: store their per-second rates
+    width = agg.width
+    for label, seconds in [(AGGREGATED, agg.seconds)] + list(agg.label_seconds.items()):
+        for sec, bucket in seconds.items():
+            series.append((label, sec, bucket.count / width, bucket.errors / width,
+                           bucket.hist.mean(), bucket.hist.quantile(0.95)))
+    return endpoints, series
+
+
+def locust_rows(prefix):
+    """Endpoint rows from <prefix>_stats.csv and series from <prefix>_stats_history.csv."""
+    endpoints = {}
+    stats_csv = f'{prefix}_stats.csv'
+    if os.path.exists(stats_csv):
+        with open(stats_csv, newline='') as f:
+            for row in csv.DictReader(f):
+                name = row.get('Name') or ''
+                if name.lower() in ('total', 'aggregated'):
+                    name = AGGREGATED
+                endpoints[name] = {
+                    'requests': int(_float(row.get('Request Count')) or 0),
+                    'errors': int(_float(row.get('Failure Count')) or 0),
+                    'avg_ms': _float(row.get('Average Response Time')),
+                    'p50_ms': _float(row.get('50%')),
+                    'p90_ms': _float(row.get('90%')),
+                    'p95_ms': _float(row.get('95%')),
+                    'p99_ms': _float(row.get('99%')),
+                    'max_ms': _float(row.get('Max Response Time')),
+                    'throughput_rps': _float(row.get('Requests/s')),
+                }
+    series = []
+    history_csv = f'{prefix}_stats_history.csv'
+    if os.path.exists(history_csv):
+        with open(history_csv, newline='') as f:
+            for row in csv.DictReader(f):
+                sec = _float(row.get('Timestamp'))
+                rps = _float(row.get('Requests/s'))
+                if sec is None or not rps:
+                    continue
+                name = row.get('Name') or AGGREGATED
+                # the Total* columns are cumulative; rates and percentiles are per window
+                series.append((name, int(sec), rps, _float(row.get('Failures/s')) or 0.0,
+                               None, _float(row.get('95%'))))
+    return endpoints, series
+
+
+def k6_rows(metrics):
+    """Aggregated endpoint row from the k6 summary export (no per-second data)."""
+    duration = (metrics.get('http_req_duration') or {}).get('values', {})
+    reqs = (metrics.get('http_reqs') or {}).get('values', {})
+    failed = (metrics.get('http_req_failed') or {}).get('values', {})
+    if not duration:
+        return {}, []
+    count = reqs.get('count')
+    errors = None
+    if count is not None and failed.get('rate') is not None:
+        errors = round(count * failed['rate'])
+    return {AGGREGATED: {
+        'requests': count,
+        'errors': errors,
+        'avg_ms': duration.get('avg'),
+        'p50_ms': duration.get('med'),
+        'p90_ms': duration.get('p(90)'),
+        'p95_ms': duration.get('p(95)'),
+        'p99_ms': duration.get('p(99)'),
+        'max_ms': duration.get('max'),
+        'throughput_rps': reqs.get('rate'),
+    }}, []
+
+
+# --- writing / querying ------------------------------------------------------
+def record_run(conn, run_id, tools, git_sha=None, scenario=None, started_at=None):
+    """Store one run; `tools` maps tool name -> (endpoint rows, series rows)."""
+    with conn:
+        conn.execute('DELETE FROM runs WHERE run_id = ?', (run_id,))
+        conn.execute('INSERT INTO runs VALUES (?, ?, ?, ?, ?)',
+                     (run_id, git_sha, scenario, started_at or time.time(), time.time()))
+        for tool, (endpoints, series) in tools.items():
+            conn.executemany(
+                f"INSERT INTO endpoint_stats VALUES (?, ?, ?, {', '.join('?' * len(METRICS))})",
+                [(run_id, tool, name) + tuple(row.get(m) for m in METRICS)
+                 for name, row in endpoints.items()])
+            conn.executemany('INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             [(run_id, tool) + tuple(s) for s in series])
+
+
+def query_trend(conn, endpoint=AGGREGATED, metric='p95_ms', tool=None, scenario=None, last=50):
+    """[(run_id, git_sha, scenario, started_at, tool, value)] of the last runs, oldest first."""
+    if metric not in METRICS:
+        raise ValueError(f'métrica desconhecida: {metric} (use {", ".join(METRICS)})')
+    sql = (f'SELECT r.run_id, r.git_sha, r.scenario, r.started_at, s.tool, s.{metric} '
+           'FROM endpoint_stats s JOIN runs r ON r.run_id = s.run_id WHERE s.endpoint = ?')
+    params = [endpoint]
+    if tool:
+        sql += ' AND s.tool = ?'
+        params.append(tool)
+    if scenario:
+        sql += ' AND r.scenario = ?'
+        params.append(scenario)
+    sql += ' ORDER BY r.started_at DESC LIMIT ?'
+    params.append(last)
+    return conn.execute(sql, params).fetchall()[::-1]
+
+
+def query_series(conn, run_id, tool, endpoint=AGGREGATED):
+    """[(second, requests/s, errors/s, avg_ms, p95_ms)] of one run."""
+    return conn.execute(f'SELECT second, {", ".join(SERIES_METRICS)} FROM series '
+                        'WHERE run_id = ? AND tool = ? AND endpoint = ? ORDER BY second',
+                        (run_id, tool, endpoint)).fetchall()
+
+
+def list_runs(conn, scenario=None, last=20):
+    sql = 'SELECT run_id, git_sha, scenario, started_at FROM runs'
+    params = []
+    if scenario:
+        sql += ' WHERE scenario = ?'
+        params.append(scenario)
+    sql += ' ORDER BY started_at DESC LIMIT ?'
+    params.append(last)
+    return conn.execute(sql, params).fetchall()
+
+
+def collect_tools(jmeter=None, locust_csv=None, k6=None, workers=None, jmeter_agg=None, k6_agg=None):
+    """{tool: (endpoint rows, series rows)} from the result files of a run.
+
+    `jmeter_agg` reuses a JtlAggregate the caller already computed for `jmeter`;
+    `k6_agg` (a k6_stream.K6Aggregate of the raw output) replaces the k6 summary
+    with per-group rows and per-second series.
+    """
+    tools = {}
+    if jmeter_agg is None and jmeter and os.path.exists(jmeter):
+        from results_cache import load_jtl_aggregate
+        jmeter_agg = load_jtl_aggregate(jmeter, workers)
+    if jmeter_agg is not None:
+        tools['jmeter'] = jmeter_rows(jmeter_agg)
+    if locust_csv:
+        endpoints, series = locust_rows(locust_csv)
+        if endpoints:
+            tools['locust'] = (endpoints, series)
+    if k6_agg is not None:
+        tools['k6'] = jmeter_rows(k6_agg.requests)
+    elif k6 and os.path.exists(k6):
+        with open(k6) as f:
+            endpoints, series = k6_rows(json.load(f).get('metrics', {}))
+        if endpoints:
+            tools['k6'] = (endpoints, series)
+    return tools
+
+
+def started_at(tools):
+    seconds = [s[1] for _, series in tools.values() for s in series]
+    return min(seconds) if seconds else None
+
+
+def _fmt_time(ts):
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(ts)) if ts else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Histórico de execuções (SQLite)")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Banco SQLite (padrão {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Grava uma execução")
+    rec.add_argument("--run-id", default=default_run_id())
+    rec.add_argument("--git-sha", default=default_git_sha())
+    rec.add_argument("--scenario", default=os.getenv("SCENARIO", "unknown"),
+                     help="cenario-100-vus, cenario-500-vus, cenario-1000-vus, cenarios-complexos")
+    rec.add_argument("--jmeter", help="JTL do JMeter")
+    rec.add_argument("--locust-csv", help="Prefixo --csv do Locust (ex.: locust-teastore/locust)")
+    rec.add_argument("--k6", help="JSON de resumo do k6 (--summary-export)")
+    rec.add_argument("--k6-raw", help="Saída bruta do k6 (--out json=...), com grupos e séries")
+    rec.add_argument("--workers", type=int, default=0, help="Processos para ler o JTL (0 = um por núcleo)")
+
+    qry = sub.add_parser("query", help="Tendência de uma métrica nas últimas execuções")
+    qry.add_argument("--endpoint", default=AGGREGATED)
+    qry.add_argument("--metric", default="p95_ms", choices=METRICS)
+    qry.add_argument("--tool")
+    qry.add_argument("--scenario")
+    qry.add_argument("--last", type=int, default=50)
+
+    runs = sub.add_parser("runs", help="Lista as execuções gravadas")
+    runs.add_argument("--scenario")
+    runs.add_argument("--last", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.command == "record":
+        k6_agg = None
+        if args.k6_raw:
+            from k6_stream import aggregate_k6
+            k6_agg = aggregate_k6(args.k6_raw, args.workers or None)
+        tools = collect_tools(args.jmeter, args.locust_csv, args.k6, args.workers or None, k6_agg=k6_agg)
+        if not tools:
+            print("ERROR: nenhum resultado encontrado para gravar")
+            sys.exit(2)
+        record_run(conn, args.run_id, tools, args.git_sha, args.scenario, started_at(tools))
+        print(f"✅ Execução {args.run_id} ({args.scenario}) gravada em {args.db}: {', '.join(tools)}")
+    elif args.command == "query":
+        started = time.perf_counter()
+        rows = query_trend(conn, args.endpoint, args.metric, args.tool, args.scenario, args.last)
+        for run_id, sha, scenario, ts, tool, value in rows:
+            value = f'{value:.1f}' if value is not None else '-'
+            print(f"{_fmt_time(ts)}  {run_id:<24} {(sha or '-')[:8]:<8} {scenario or '-':<20} "
+                  f"{tool:<7} {value}")
+        print(f"{len(rows)} execuções ({(time.perf_counter() - started) * 1000:.1f} ms)", file=sys.stderr)
+    else:
+        for run_id, sha, scenario, ts in list_runs(conn, args.scenario, args.last):
+            print(f"{_fmt_time(ts)}  {run_id:<24} {(sha or '-')[:8]:<8} {scenario or '-'}")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
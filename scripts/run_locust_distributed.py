@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Run Locust as a local master plus N workers (one per core by default).
+
+The master waits until every worker is connected before ramping up
+(--expect-workers) and writes the merged locust_stats.csv,
+locust_stats_history.csv and locust_failures.csv under the usual --csv
+prefix, so generate_dashboard.py reads them unchanged. Workers are stopped
+when the master exits, on Ctrl+C and on failure.
+
+Usage: python scripts/run_locust_distributed.py [--workers N] [-u 1000 -r 11 -t 5m]
+           [--config locust-teastore/cenario-1000-vus.conf] [-- <extra locust args>]
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+DEFAULT_LOCUSTFILE = os.path.join('locust-teastore', 'teastore_scenario.py')
+DEFAULT_CSV = os.path.join('locust-teastore', 'locust')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def config_locustfile(path):
+    """`locustfile` set in a Locust .conf file (key = value lines), or None."""
+    with open(path) as f:
+        for line in f:
+            key, sep, value = line.partition('=')
+            if sep and key.strip().replace('_', '-') == 'locustfile':
+                return value.split('#')[0].strip()
+    return None
+
+
+def build_commands(args, extra):
+    base = [sys.executable, '-m', 'locust']
+    locustfile = args.locustfile or (args.config and config_locustfile(args.config)) or DEFAULT_LOCUSTFILE
+
+    master = base + (['--config', args.config] if args.config else [])
+    master += ['-f', locustfile, '--master', '--headless', '--master-bind-host', '127.0.0.1',
+               '--master-bind-port', str(args.master_port),
+               '--expect-workers', str(args.workers),
+               '--expect-workers-max-wait', str(args.connect_timeout),
+               '--csv', args.csv]
+    if args.users is not None:
+        master += ['-u', str(args.users)]
+    if args.spawn_rate is not None:
+        master += ['-r', str(args.spawn_rate)]
+    if args.run_time:
+        master += ['-t', args.run_time]
+    if args.host:
+        master += ['--host', args.host]
+    if args.html:
+        master += ['--html', args.html]
+    master += extra
+
+    # workers get only the locustfile: the .conf files set csv/html, and a worker
+    # given those would rewrite the master's CSVs and reports with its own share
+    # (custom locustfile arguments reach the workers from the master)
+    worker = base + ['-f', locustfile, '--worker', '--master-host', '127.0.0.1',
+                     '--master-port', str(args.master_port)]
+    return master, worker
+
+
+def stop(procs, timeout=15):
+    """SIGINT first (Locust shuts down gracefully), then terminate, then kill."""
+    for p in procs:
+        if p.poll() is None:
+            p.send_signal(signal.SIGINT)
+    deadline = time.monotonic() + timeout
+    for p in procs:
+        try:
+            p.wait(max(0.1, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            p.terminate()
+    for p in procs:
+        try:
+            p.wait(5)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+
+def main():
+    argv = sys.argv[1:]
+    extra = []
+    if '--' in argv:
+        extra = argv[argv.index('--') + 1:]
+        argv = argv[:argv.index('--')]
+
+    parser = argparse.ArgumentParser(description="Locust master + workers locais com CSV consolidado")
+    parser.add_argument("-f", "--locustfile", help=f"Locustfile (padrão {DEFAULT_LOCUSTFILE})")
+    parser.add_argument("--config", help="Arquivo .conf do Locust (ex.: locust-teastore/cenario-1000-vus.conf)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Número de workers (padrão: núcleos)")
+    parser.add_argument("-u", "--users", type=int, help="Usuários (sobrescreve o .conf)")
+    parser.add_argument("-r", "--spawn-rate", type=float, help="Usuários iniciados por segundo")
+    parser.add_argument("-t", "--run-time", help="Duração (ex.: 5m)")
+    parser.add_argument("--host", help="Host alvo")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help=f"Prefixo dos CSVs consolidados (padrão {DEFAULT_CSV})")
+    parser.add_argument("--html", help="Relatório HTML do master")
+    parser.add_argument("--master-port", type=int, default=0, help="Porta do master (0 = livre)")
+    parser.add_argument("--connect-timeout", type=int, default=60,
+                        help="Segundos aguardando todos os workers conectarem")
+    args = parser.parse_args(argv)
+    args.workers = max(1, args.workers)
+    args.master_port = args.master_port or free_port()
+
+    master_cmd, worker_cmd = build_commands(args, extra)
+    print(f"🚀 Locust distribuído: 1 master + {args.workers} workers (porta {args.master_port})")
+    master = subprocess.Popen(master_cmd)
+    workers = []
+    try:
+        workers = [subprocess.Popen(worker_cmd) for _ in range(args.workers)]
+        code = master.wait()
+    except KeyboardInterrupt:
+        code = 130
+    finally:
+        stop([master] + workers)
+
+    for suffix in ('_stats.csv', '_stats_history.csv', '_failures.csv'):
+        path = args.csv + suffix
+        if os.path.exists(path):
+            print("✅ CSV consolidado:", path)
+    sys.exit(code if code is not None else 1)
+
+
+if __name__ == '__main__':
+    main()
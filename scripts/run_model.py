@@ -0,0 +1,337 @@
+"""In-memory model of one test run, shared by every report output.
+
+Each input (JMeter JTL, k6 summary export and raw output, Locust report) is
+loaded at most once, on first use, and every output (unified JSON,
+dashboard, graphs, PDFs, failure clusters, history) reads the same objects:
+
+  jmeter_table    columnar cache of the JTL (results_cache; None without numpy/pandas)
+  jmeter_agg      JtlAggregate (per label / per second histograms), from the table
+  jmeter_phases   connect / server / download summary (jtl_phases), from the table
+  k6_summary      the summary export (dict)
+  k6_agg          K6Aggregate of the raw NDJSON; when failures are wanted the
+                  same pass also fills the k6 part of `failures`
+  locust          locust_report's normalized dict (HTML, CSV prefix or JSON)
+  failures        failure_clusters.FailureIndex of the three tools
+
+Nothing heavy is imported at module level: numpy/pandas come with the
+columnar cache the first time the JTL is needed, and plotting or PDF
+libraries are left to the outputs that draw.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+
+AGGREGATED = 'Aggregated'
+# written by locust-teastore/generator_monitor.py next to Locust's --csv files
+GENERATOR_SUFFIX = '_generator_summary.json'
+
+
+def _exists(path):
+    return bool(path) and os.path.exists(path)
+
+
+def k6_column(summary):
+    """Summary-table column of a k6 summary export (used without the raw output)."""
+    from results_store import k6_rows
+    row = k6_rows((summary or {}).get('metrics', {}))[0].get(AGGREGATED, {})
+    return {'requests': row.get('requests'), 'avg_latency_ms': row.get('avg_ms'),
+            'p50_ms': row.get('p50_ms'), 'p95_ms': row.get('p95_ms'), 'p99_ms': row.get('p99_ms'),
+            'throughput_rps': row.get('throughput_rps'),
+            'error_rate': (row['errors'] / row['requests']
+                           if row.get('errors') is not None and row.get('requests') else None)}
+
+
+def locust_row(row):
+    """Summary/endpoint row of one locust_report endpoint."""
+    pcts = row.get('percentiles', {})
+    return {'requests': row['requests'], 'errors': row['failures'], 'avg_latency_ms': row['avg_ms'],
+            'min_ms': row.get('min_ms'), 'max_ms': row.get('max_ms'),
+            'p50_ms': pcts.get('0.5'), 'p95_ms': pcts.get('0.95'), 'p99_ms': pcts.get('0.99'),
+            'error_rate': row['failures'] / row['requests'] if row['requests'] else None,
+            'throughput_rps': row['rps']}
+
+
+def exact_jmeter_summary(table):
+    """jmeter summary with exact percentiles over the cached columns (numpy)."""
+    np = __import__('numpy')
+    from results_cache import success_codes
+    i_elapsed = table.index('elapsed')
+    elapsed = np.asarray(table.column(0 if i_elapsed is None else i_elapsed), dtype=np.float64)
+    total = len(elapsed)
+    summary = {'tool': 'jmeter', 'requests': total, 'avg_latency_ms': None, 'p50_ms': None, 'p95_ms': None,
+               'p99_ms': None, 'error_rate': None, 'throughput_rps': None}
+    if not total:
+        return summary
+    p50, p95, p99 = np.nanquantile(elapsed, [0.5, 0.95, 0.99])
+    summary.update(avg_latency_ms=float(np.nanmean(elapsed)), p50_ms=float(p50), p95_ms=float(p95),
+                   p99_ms=float(p99))
+    success = success_codes(table)
+    if success is not None:
+        k, ok_codes = success
+        summary['error_rate'] = 1.0 - float(np.isin(np.asarray(table.column(k)), ok_codes).mean())
+    i_ts = table.index('timestamp')
+    if i_ts is not None and table.columns[i_ts]['kind'] == 'num':
+        ts = np.asarray(table.column(i_ts))
+        ts = ts[~np.isnan(ts)]
+        if len(ts):
+            # 1 s buckets from the first to the last second, as pandas' resample('1s')
+            span = int(ts.max() // 1000 - ts.min() // 1000) + 1
+            summary['throughput_rps'] = len(ts) / span
+    return summary
+
+
+def _k6_pass(path, start, end, with_failures):
+    """K6Aggregate (and FailureIndex) of one byte range, reading its lines once."""
+    from jtl_parallel import iter_shard_lines
+    from k6_stream import K6Aggregate
+    lines = iter_shard_lines(path, start, end)
+    if not with_failures:
+        return K6Aggregate().add_lines(lines), None
+    from failure_clusters import FailureIndex, add_k6_line
+    index = FailureIndex()
+
+    def tap(lines):
+        for line in lines:
+            add_k6_line(index, line)
+            yield line
+
+    return K6Aggregate().add_lines(tap(lines)), index
+
+
+class RunModel:
+    """Inputs of one run, each parsed at most once, on first use."""
+
+    def __init__(self, jmeter=None, k6=None, k6_raw=None, locust=None, workers=None, exact=False,
+                 want_failures=False, generator_json=None):
+        self.jmeter = jmeter if _exists(jmeter) else None
+        self.k6 = k6 if _exists(k6) else None
+        self.k6_raw = k6_raw if _exists(k6_raw) else None
+        self.locust_source = locust
+        self.workers = workers
+        # exact percentiles for the JMeter summary (else from the histograms)
+        self.exact = exact
+        # read k6 failures in the same pass as the k6 aggregate
+        self.want_failures = want_failures
+        # Locust generator saturation summary; default <locust csv prefix>_generator_summary.json
+        self.generator_json = generator_json
+        self._k6_failures = None
+
+    # --- JMeter ----------------------------------------------------------------
+    @cached_property
+    def jmeter_table(self):
+        if not self.jmeter:
+            return None
+        import results_cache
+        if not results_cache.HAS_DEPS:
+            return None
+        try:
+            return results_cache.open_cache(self.jmeter, self.workers)
+        except Exception as e:
+            print(f'⚠️  Cache colunar indisponível para {self.jmeter} ({e}); lendo o texto.')
+            return None
+
+    @cached_property
+    def jmeter_agg(self):
+        if not self.jmeter:
+            return None
+        if self.jmeter_table is not None:
+            from results_cache import aggregate_table
+            return aggregate_table(self.jmeter_table)
+        from jtl_parallel import aggregate_jtl_parallel
+        return aggregate_jtl_parallel(self.jmeter, self.workers)
+
+    @cached_property
+    def jmeter_summary(self):
+        if not self.jmeter:
+            return {}
+        if self.exact and self.jmeter_table is not None:
+            return exact_jmeter_summary(self.jmeter_table)
+        return self.jmeter_agg.summary()
+
+    @cached_property
+    def jmeter_phase_agg(self):
+        if not self.jmeter:
+            return None
+        try:
+            if self.jmeter_table is not None:
+                from jtl_phases import aggregate_phases_table
+                return aggregate_phases_table(self.jmeter_table)
+            from jtl_phases import load_phases
+            return load_phases(self.jmeter, self.workers)
+        except Exception as e:
+            print('⚠️  Falha ao calcular as fases do JTL:', e)
+            return None
+
+    @cached_property
+    def jmeter_phases(self):
+        agg = self.jmeter_phase_agg
+        return agg.summary() if agg is not None and agg.has_latency else {}
+
+    # --- k6 --------------------------------------------------------------------
+    @cached_property
+    def k6_summary(self):
+        if not self.k6:
+            return {}
+        try:
+            with open(self.k6) as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    @cached_property
+    def k6_agg(self):
+        if not self.k6_raw:
+            return None
+        from jtl_parallel import default_workers, pool_context
+        from k6_stream import K6Aggregate, plan_line_shards
+        try:
+            shards = plan_line_shards(self.k6_raw, self.workers or default_workers())
+            ctx = pool_context()
+            if len(shards) == 1 or ctx is None:
+                parts = [_k6_pass(self.k6_raw, s, e, self.want_failures) for s, e in shards]
+            else:
+                with ProcessPoolExecutor(max_workers=len(shards), mp_context=ctx) as pool:
+                    futures = [pool.submit(_k6_pass, self.k6_raw, s, e, self.want_failures) for s, e in shards]
+                    parts = [f.result() for f in futures]
+        except Exception as e:
+            print('⚠️  Falha ao ler a saída bruta do k6:', e)
+            return None
+        agg = K6Aggregate()
+        failures = None
+        for part, index in parts:
+            agg.merge(part)
+            if index is not None:
+                failures = index if failures is None else failures.merge(index)
+        self._k6_failures = failures
+        return agg
+
+    @cached_property
+    def k6_stream_summary(self):
+        if self.k6_agg is None:
+            return {}
+        summary = self.k6_agg.summary()
+        summary['groups'] = self.k6_agg.requests.label_summary()
+        return summary
+
+    # --- Locust ----------------------------------------------------------------
+    @cached_property
+    def locust(self):
+        if not self.locust_source:
+            return None
+        from locust_report import extract
+        try:
+            return extract(self.locust_source)
+        except Exception as e:
+            print(f'⚠️  Falha ao ler o relatório do Locust ({self.locust_source}): {e}')
+            return None
+
+    @cached_property
+    def generator(self):
+        """Locust generator saturation (locust-teastore/generator_monitor.py)."""
+        path = self.generator_json
+        if path is None and self.locust_prefix:
+            path = f'{self.locust_prefix}{GENERATOR_SUFFIX}'
+        if not _exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    @cached_property
+    def locust_summary(self):
+        summary = {}
+        if self.locust is not None and self.locust.get('aggregated'):
+            summary = locust_row(self.locust['aggregated'])
+        if self.generator:
+            summary['generator_saturated'] = bool(self.generator.get('saturated'))
+        return summary
+
+    @cached_property
+    def locust_endpoints(self):
+        if self.locust is None:
+            return {}
+        return {f"{e['method']} {e['name']}".strip(): locust_row(e) for e in self.locust['endpoints']}
+
+    # --- derived ---------------------------------------------------------------
+    def columns(self, only=None):
+        """{tool heading: summary row} for the tools that have results (all, or those in `only`)."""
+        wanted = lambda name: not only or name in only
+        columns = {}
+        if wanted('jmeter') and self.jmeter_summary:
+            columns['JMeter'] = self.jmeter_summary
+        if wanted('k6'):
+            if self.k6_stream_summary and self.k6_agg.requests.total.count:
+                columns['k6'] = self.k6_stream_summary
+            elif self.k6_summary:
+                columns['k6'] = k6_column(self.k6_summary)
+        if wanted('locust') and self.locust_summary:
+            columns['Locust'] = self.locust_summary
+        return columns
+
+    def histograms(self):
+        """Latency histograms per label, for scripts/compare_runs.py."""
+        out = {}
+        for tool, agg in (('jmeter', self.jmeter_agg), ('k6', self.k6_agg and self.k6_agg.requests)):
+            if agg is not None:
+                out[tool] = {'total': agg.total.hist.to_dict(),
+                             'labels': {label: b.hist.to_dict() for label, b in agg.labels.items()}}
+        return out
+
+    def unified(self):
+        """The summary-unified.json document."""
+        unified = {'k6': self.k6_summary.get('metrics', {}), 'jmeter': self.jmeter_summary,
+                   'locust': self.locust_summary, 'histograms': self.histograms(),
+                   'jmeter_phases': self.jmeter_phases}
+        if self.k6_stream_summary:
+            unified['k6_stream'] = self.k6_stream_summary
+        return unified
+
+    @cached_property
+    def failures(self):
+        """FailureIndex of the JTL, the k6 raw output (or summary checks) and Locust."""
+        import failure_clusters as fc
+        index = fc.FailureIndex()
+        if self.jmeter_table is not None:
+            index.merge(fc.table_failures(self.jmeter_table))
+        elif self.jmeter:
+            index.merge(fc.jtl_failures(self.jmeter, self.workers))
+        if self.k6_raw:
+            if self.want_failures and self.k6_agg is not None and self._k6_failures is not None:
+                index.merge(self._k6_failures)
+            else:
+                index.merge(fc.k6_raw_failures(self.k6_raw, self.workers))
+        elif self.k6:
+            index.merge(fc.k6_summary_failures(self.k6))
+        prefix = self.locust_csv_prefix
+        if prefix:
+            index.merge(fc.locust_failures(prefix))
+        return index
+
+    @property
+    def locust_prefix(self):
+        """--csv prefix the Locust files would have, from the report path (HTML, CSV or JSON)."""
+        source = self.locust_source
+        if not source:
+            return None
+        from locust_report import _csv_prefix
+        for ext in ('.html', '.htm', '.json'):
+            if source.lower().endswith(ext):
+                source = source[:-len(ext)]
+        return _csv_prefix(source)
+
+    @property
+    def locust_csv_prefix(self):
+        """--csv prefix of the Locust run, when its CSVs sit next to the report."""
+        prefix = self.locust_prefix
+        if not prefix:
+            return None
+        suffixes = ('_stats.csv', '_failures.csv', '_exceptions.csv')
+        return prefix if any(os.path.exists(f'{prefix}{s}') for s in suffixes) else None
+
+    def history_tools(self):
+        """{tool: (endpoint rows, series rows)} for results_store.record_run."""
+        from results_store import collect_tools
+        return collect_tools(None, self.locust_csv_prefix, self.k6, self.workers, self.jmeter_agg, self.k6_agg)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Per-endpoint SLOs and the streaming evaluator that aborts breached runs.
+
+The SLO file (slo.json at the repository root) gives, per endpoint, a p95
+limit, an error-rate limit and the minimum number of samples before the
+endpoint is judged:
+
+  {
+    "defaults": {"p95_ms": 3000, "error_rate": 0.2, "min_samples": 100},
+    "abort_delay_seconds": 10,
+    "endpoints": {
+      "Aggregated": {"error_rate": 0.1},
+      "Login": {"p95_ms": 2000, "match": {"locust": "POST /loginAction",
+                                         "jmeter": "POST Login Action", "k6": "group:::Login"}}
+    }
+  }
+
+`match` maps the endpoint to the request name each tool reports (default:
+the endpoint key itself; for k6, a tag filter). SloEvaluator judges
+cumulative counters and is shared by every enforcement point:
+
+  - Locust: locust-teastore/slo_guard.py stops the runner on the first breach
+  - JMeter: `slo.py watch` tails the JTL and sends StopTestNow to JMeter's
+    shutdown port (UDP 4445)
+  - k6: `slo.py k6` writes the equivalent `thresholds` with abortOnFail
+    (k6 has no minimum-sample option; delayAbortEval plays that role)
+
+Usage: python scripts/slo.py k6 slo.json [--out k6-teastore/thresholds.json]
+       python scripts/slo.py watch slo.json results.jtl [--interval 2] [--jmeter-port 4445]
+"""
+import argparse
+import json
+import socket
+import sys
+import time
+
+AGGREGATED = 'Aggregated'
+DEFAULTS = {'p95_ms': None, 'error_rate': None, 'min_samples': 100}
+DEFAULT_ABORT_DELAY = 10
+
+
+def load_slo(path):
+    with open(path, encoding='utf-8') as f:
+        slo = json.load(f)
+    if not isinstance(slo.get('endpoints'), dict):
+        raise ValueError(f'{path}: "endpoints" deve ser um objeto endpoint -> limites')
+    return slo
+
+
+class SloRule:
+    __slots__ = ('endpoint', 'name', 'p95_ms', 'error_rate', 'min_samples')
+
+    def __init__(self, endpoint, name, limits):
+        self.endpoint = endpoint
+        self.name = name
+        self.p95_ms = limits.get('p95_ms')
+        self.error_rate = limits.get('error_rate')
+        self.min_samples = limits.get('min_samples') or 0
+
+
+def rules_for(slo, tool):
+    """SloRules with the defaults applied and names resolved for `tool`."""
+    defaults = dict(DEFAULTS, **slo.get('defaults', {}))
+    rules = []
+    for endpoint, limits in slo['endpoints'].items():
+        name = (limits.get('match') or {}).get(tool, endpoint)
+        rules.append(SloRule(endpoint, name, dict(defaults, **limits)))
+    return rules
+
+
+class SloEvaluator:
+    """Checks cumulative per-endpoint stats against the SLO rules of one tool."""
+
+    def __init__(self, slo, tool):
+        self.rules = rules_for(slo, tool)
+
+    def evaluate(self, stats):
+        """Breach messages for `stats` = {name: (requests, errors, p95_ms)}.
+
+        The aggregate of all requests is looked up as 'Aggregated'.
+        """
+        breaches = []
+        for rule in self.rules:
+            current = stats.get(rule.name)
+            if current is None:
+                continue
+            requests, errors, p95 = current
+            if not requests or requests < rule.min_samples:
+                continue
+            if rule.error_rate is not None and errors / requests > rule.error_rate:
+                breaches.append(f'{rule.endpoint}: taxa de erro {errors / requests:.1%} > '
+                                f'{rule.error_rate:.1%} ({errors}/{requests})')
+            if rule.p95_ms is not None and p95 is not None and p95 > rule.p95_ms:
+                breaches.append(f'{rule.endpoint}: p95 {p95:.0f} ms > {rule.p95_ms:.0f} ms '
+                                f'({requests} amostras)')
+        return breaches
+
+
+def k6_thresholds(slo):
+    """k6 `options.thresholds` equivalent to the SLO file, aborting on failure."""
+    delay = f"{slo.get('abort_delay_seconds', DEFAULT_ABORT_DELAY)}s"
+    thresholds = {}
+    for rule in rules_for(slo, 'k6'):
+        tag = '' if rule.name == AGGREGATED else f'{{{rule.name}}}'
+        if rule.p95_ms is not None:
+            thresholds.setdefault(f'http_req_duration{tag}', []).append(
+                {'threshold': f'p(95)<{rule.p95_ms}', 'abortOnFail': True, 'delayAbortEval': delay})
+        if rule.error_rate is not None:
+            thresholds.setdefault(f'http_req_failed{tag}', []).append(
+                {'threshold': f'rate<{rule.error_rate}', 'abortOnFail': True, 'delayAbortEval': delay})
+    return thresholds
+
+
+def stop_jmeter(port, host='127.0.0.1'):
+    """Ask a non-GUI JMeter to stop now through its UDP shutdown port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.sendto(b'StopTestNow', (host, port))
+
+
+def watch_jtl(slo, jtl, interval, jmeter_port, duration=None):
+    """Tail `jtl`, evaluating the SLOs every `interval` seconds; breaches or []."""
+    from jtl_stream import JtlColumns
+    from live_tail import AGGREGATED as LIVE_AGGREGATED, FileTailer, RollingJtl
+
+    evaluator = SloEvaluator(slo, 'jmeter')
+    tailer = FileTailer(jtl)
+    # cumulative counters only; the rolling window is not needed here
+    rolling = RollingJtl(window=1)
+    deadline = time.monotonic() + duration if duration else None
+    while deadline is None or time.monotonic() < deadline:
+        header, rows = tailer.poll()
+        if rows:
+            rolling.add_rows(rows, JtlColumns(header))
+            stats = {name: (b.count, b.errors, b.hist.quantile(0.95))
+                     for name, b in [(LIVE_AGGREGATED, rolling.total)] + list(rolling.labels.items())}
+            breaches = evaluator.evaluate(stats)
+            if breaches:
+                if jmeter_port:
+                    stop_jmeter(jmeter_port)
+                return breaches
+        time.sleep(interval)
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SLOs por endpoint: thresholds do k6 e vigia do JMeter")
+    sub = parser.add_subparsers(dest="command", required=True)
+    k6 = sub.add_parser("k6", help="Gera os thresholds do k6 (abortOnFail)")
+    k6.add_argument("slo", help="Arquivo de SLOs (slo.json)")
+    k6.add_argument("--out", help="JSON de saída (padrão: stdout)")
+    watch = sub.add_parser("watch", help="Acompanha o JTL e interrompe o JMeter ao violar um SLO")
+    watch.add_argument("slo", help="Arquivo de SLOs (slo.json)")
+    watch.add_argument("jtl", help="JTL (CSV) sendo escrito pelo JMeter")
+    watch.add_argument("--interval", type=float, default=2.0, help="Segundos entre avaliações")
+    watch.add_argument("--jmeter-port", type=int, default=4445,
+                       help="Porta UDP de shutdown do JMeter (0 = só reportar)")
+    watch.add_argument("--duration", type=float, help="Encerra a vigia após N segundos")
+    args = parser.parse_args()
+
+    slo = load_slo(args.slo)
+    if args.command == "k6":
+        text = json.dumps(k6_thresholds(slo), indent=2)
+        if args.out:
+            with open(args.out, 'w') as f:
+                f.write(text + '\n')
+            print(f"✅ Thresholds do k6 gravados em {args.out}")
+        else:
+            print(text)
+        return
+
+    breaches = watch_jtl(slo, args.jtl, args.interval, args.jmeter_port, args.duration)
+    if breaches:
+        print("❌ SLO violado, teste interrompido:")
+        for breach in breaches:
+            print("   -", breach)
+        sys.exit(1)
+    print("✅ Nenhum SLO violado")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""Every report of a run from one load of its results (parse once, emit many).
+
+The JTL, the k6 outputs and the Locust report are loaded once into a
+run_model.RunModel and each requested output reads that shared model, in
+place of one script per output re-parsing the same files:
+
+  --summary-json      summary-unified.json (JMeter, k6 and Locust summaries, histograms, phases)
+  --dashboard         self-contained dashboard HTML (dashboard_html)
+  --graphs DIR        JMeter time-series PNGs (unify_jmeter_graphs)
+  --custom-report     JMeter APDEX / percentile HTML (generate_custom_jmeter_report)
+  --failures DIR      JMeter failure bodies + failures-summary.json (extract_jmeter_failures)
+  --failure-clusters  failure signatures of the three tools (failure_clusters)
+  --pdf               unified PDF with cached charts and sections (build_report)
+  --history-db        append the run to the SQLite history (results_store)
+  --all DIR           all of the above with their default names in DIR
+
+Libraries are imported by the outputs that use them: a run asking only for
+the JSON summary never loads matplotlib or reportlab.
+
+Usage: ./teastore-perf --jmeter results.jtl --k6 k6-complex.json --k6-raw k6-raw.json \\
+           --locust locust-teastore/complex.html --all reports/
+"""
+import argparse
+import html
+import json
+import os
+import sys
+import time
+
+from run_model import RunModel
+
+# file names used by --all
+ALL_OUTPUTS = {
+    'summary_json': 'summary-unified.json',
+    'dashboard': 'dashboard.html',
+    'graphs': 'graphs',
+    'custom_report': 'custom-report.html',
+    'failures': 'failures',
+    'failure_clusters': 'failure-clusters.json',
+    'pdf': 'relatorio-completo.pdf',
+}
+
+SUMMARY_ROWS = [('requests', 'Requisições'), ('avg_latency_ms', 'Média (ms)'), ('p50_ms', 'p50 (ms)'),
+                ('p95_ms', 'p95 (ms)'), ('p99_ms', 'p99 (ms)'), ('error_rate', 'Taxa de erro'),
+                ('throughput_rps', 'Throughput (req/s)')]
+ENDPOINT_FIELDS = [('requests', 'Req.'), ('errors', 'Erros'), ('avg_latency_ms', 'Média'),
+                   ('p50_ms', 'p50'), ('p95_ms', 'p95'), ('p99_ms', 'p99')]
+
+
+def _parent(path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+
+# --- outputs -----------------------------------------------------------------
+def write_unified(model, path):
+    _parent(path)
+    with open(path, 'w') as f:
+        json.dump(model.unified(), f, indent=2)
+
+
+def record_history(model, db, scenario, run_id):
+    """Append the run to the history database; returns the recent p95 trend rows."""
+    import results_store
+    conn = results_store.connect(db)
+    try:
+        tools = model.history_tools()
+        if tools:
+            results_store.record_run(conn, run_id, tools, results_store.default_git_sha(), scenario,
+                                     results_store.started_at(tools))
+        return results_store.query_trend(conn, scenario=scenario, last=20)
+    finally:
+        conn.close()
+
+
+def history_table(rows):
+    cells = ''.join(
+        f"<tr><td>{html.escape(run_id)}</td><td>{html.escape((sha or '-')[:8])}</td><td>{html.escape(tool)}</td>"
+        f"<td>{'-' if p95 is None else f'{p95:.1f}'}</td></tr>"
+        for run_id, sha, _, _, tool, p95 in rows)
+    return (f'<table><tr><th>Execução</th><th>Commit</th><th>Ferramenta</th>'
+            f'<th>p95 (ms)</th></tr>{cells}</table>')
+
+
+def dashboard_page(model, history=None, scenario=None, links=None):
+    """Dashboard HTML of the model; `history` = trend rows of record_history."""
+    import dashboard_html
+
+    pack = dashboard_html.SeriesPack()
+    if model.jmeter_agg is not None:
+        dashboard_html.add_aggregate(pack, 'jmeter', model.jmeter_agg)
+    if model.k6_agg is not None:
+        dashboard_html.add_aggregate(pack, 'k6', model.k6_agg.requests)
+    if model.locust is not None:
+        dashboard_html.add_locust_history(pack, model.locust['history'])
+
+    columns = model.columns()
+    sections = [('Resumo por ferramenta',
+                 dashboard_html.summary_table({tool: columns.get(tool, {}) for tool in ('JMeter', 'k6', 'Locust')},
+                                              SUMMARY_ROWS))]
+    if model.jmeter_agg is not None and model.jmeter_agg.labels:
+        sections.append(('JMeter por label',
+                         dashboard_html.endpoint_table(model.jmeter_agg.label_summary(), ENDPOINT_FIELDS)))
+    if model.jmeter_phases:
+        import jtl_phases
+        sections.append(('JMeter por fase (conexão / servidor / download, p95 em ms)',
+                         dashboard_html.endpoint_table(jtl_phases.flat_rows(model.jmeter_phases),
+                                                       list(jtl_phases.FIELDS) + [('diagnosis', 'Diagnóstico')])))
+    if model.k6_agg is not None:
+        sections.append(('k6 por grupo',
+                         dashboard_html.endpoint_table(model.k6_agg.requests.label_summary(), ENDPOINT_FIELDS)))
+    generator_html = ''
+    if model.generator.get('saturated'):
+        generator_html = (
+            '<p class="warn">⚠️ Gerador de carga do Locust saturado '
+            f'({html.escape(", ".join(model.generator.get("saturated_nodes", [])))}): '
+            'as latências do Locust estão infladas pelo cliente, não pelo TeaStore.</p>'
+        )
+    if model.locust_endpoints or generator_html:
+        sections.append(('Locust por endpoint',
+                         generator_html + dashboard_html.endpoint_table(model.locust_endpoints, ENDPOINT_FIELDS)))
+    if history:
+        sections.append((f'Histórico — p95 agregado ({scenario})', history_table(history)))
+    sections.append(('Métricas do k6 (summary export)',
+                     f'<details><pre>{html.escape(json.dumps(model.k6_summary.get("metrics", {}), indent=2))}</pre></details>'))
+    if links:
+        items = ''.join(f'<li><a href="{html.escape(href)}">{html.escape(name)}</a></li>' for name, href in links)
+        sections.append(('Relatórios', f'<ul>{items}</ul>'))
+    return dashboard_html.render('Dashboard Consolidado — TeaStore', sections, pack)
+
+
+def write_dashboard(model, path, history=None, scenario=None, links=None):
+    page = dashboard_page(model, history, scenario, links)
+    _parent(path)
+    with open(path, 'w') as f:
+        f.write(page)
+
+
+def write_graphs(model, out_dir, bucket_seconds=1, max_points=1000):
+    import unify_jmeter_graphs
+    if not unify_jmeter_graphs.HAS_DEPS:
+        raise RuntimeError('matplotlib não instalado (pip install -r requirements.txt)')
+    unify_jmeter_graphs.render_graphs(model.jmeter_agg, out_dir, bucket_seconds, max_points)
+
+
+def write_custom_report(model, path, endpoints=None, apdex_t=None, thresholds=None):
+    import generate_custom_jmeter_report as custom
+    apdex_t = custom.DEFAULT_APDEX_T_MS if apdex_t is None else apdex_t
+    summary, total, fail_total = custom.parse_jmeter_csv(model.jmeter, endpoints, thresholds, apdex_t,
+                                                         model.workers, model.jmeter_agg, model.jmeter_table)
+    _parent(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(custom.render_html(summary, total, fail_total, endpoints))
+
+
+def write_failures(model, out_dir):
+    from extract_jmeter_failures import extract_failures
+    return extract_failures(model.jmeter, out_dir, model.workers, model.jmeter_table)
+
+
+def write_failure_clusters(model, path, distance=None, top=20):
+    import failure_clusters
+    index = model.failures
+    total = index.total
+    clusters = index.clusters(failure_clusters.DEFAULT_DISTANCE if distance is None else distance) if total else []
+    if clusters:
+        failure_clusters.print_clusters(clusters, total, top)
+    _parent(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'total': total, 'signatures': len(index.signatures), 'clusters': clusters},
+                  f, indent=2, ensure_ascii=False)
+    return total
+
+
+def write_pdf(model, path, cache_dir=None, max_points=None):
+    import build_report
+    if not build_report.HAS_REPORTLAB:
+        raise RuntimeError('reportlab não instalado (pip install -r requirements.txt)')
+    sections = build_report.model_sections(model, max_points or build_report.MAX_POINTS)
+    if not sections:
+        raise RuntimeError('nenhum resultado para o relatório')
+    _parent(path)
+    return build_report.build(sections, path, cache_dir or build_report.DEFAULT_CACHE_DIR, model.workers)
+
+
+# --- CLI ---------------------------------------------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Relatórios de desempenho do TeaStore a partir de uma única leitura')
+    inputs = parser.add_argument_group('entradas')
+    inputs.add_argument('--jmeter', help='Arquivo .jtl (CSV) do JMeter')
+    inputs.add_argument('--k6', help='Summary JSON do k6 (--summary-export)')
+    inputs.add_argument('--k6-raw', help='Saída bruta do k6 (k6 run --out json=...)')
+    inputs.add_argument('--locust', help='Relatório do Locust: HTML, prefixo/arquivo CSV ou --json-file')
+    inputs.add_argument('--generator-summary',
+                        help='Saturação do gerador do Locust (padrão: <prefixo do --locust>_generator_summary.json)')
+    inputs.add_argument('--workers', type=int, default=0, help='Processos de parsing (0 = um por núcleo)')
+    inputs.add_argument('--exact', action='store_true',
+                        help='Percentis exatos no resumo do JMeter (senão, dos histogramas)')
+    outputs = parser.add_argument_group('saídas')
+    outputs.add_argument('--all', metavar='DIR', help='Gera todas as saídas em DIR com os nomes padrão')
+    outputs.add_argument('--summary-json', help='summary-unified.json')
+    outputs.add_argument('--dashboard', help='Dashboard HTML')
+    outputs.add_argument('--graphs', metavar='DIR', help='Gráficos temporais do JMeter (PNG)')
+    outputs.add_argument('--custom-report', help='Relatório JMeter customizado (APDEX)')
+    outputs.add_argument('--failures', metavar='DIR', help='Corpos das falhas do JMeter')
+    outputs.add_argument('--failure-clusters', help='Clusters de falhas (JSON)')
+    outputs.add_argument('--pdf', help='Relatório PDF unificado')
+    outputs.add_argument('--history-db', help='Banco SQLite do histórico (scripts/results_store.py)')
+    options = parser.add_argument_group('opções')
+    options.add_argument('--scenario', default=os.getenv('SCENARIO', 'unknown'), help='Cenário gravado no histórico')
+    options.add_argument('--run-id', help='Identificador da execução no histórico')
+    options.add_argument('--endpoints', nargs='*', help='Labels do relatório customizado (padrão: todos)')
+    options.add_argument('--apdex-t', type=float, help='Limite T do APDEX em ms')
+    options.add_argument('--apdex-t-label', action='append', metavar='LABEL=MS',
+                         help='Limite T específico de um label (repetível)')
+    options.add_argument('--bucket-seconds', type=int, default=1, help='Largura dos buckets dos gráficos (s)')
+    options.add_argument('--max-points', type=int, default=1000, help='Pontos por linha nos gráficos')
+    options.add_argument('--distance', type=int, help='Distância de SimHash dos clusters de falhas')
+    options.add_argument('--cache-dir', help='Cache de gráficos e seções do PDF')
+    args = parser.parse_args(argv)
+    if args.all:
+        for dest, name in ALL_OUTPUTS.items():
+            if getattr(args, dest) is None:
+                setattr(args, dest, os.path.join(args.all, name))
+    return parser, args
+
+
+def main(argv=None):
+    parser, args = parse_args(argv)
+    model = RunModel(args.jmeter, args.k6, args.k6_raw, args.locust, args.workers or None, args.exact,
+                     want_failures=bool(args.failure_clusters), generator_json=args.generator_summary)
+
+    history = None
+    jobs = []
+    if args.summary_json:
+        jobs.append(('summary-unified.json', args.summary_json, lambda: write_unified(model, args.summary_json)))
+    if args.history_db:
+        def history_job():
+            nonlocal history
+            import results_store
+            history = record_history(model, args.history_db, args.scenario,
+                                     args.run_id or results_store.default_run_id())
+        jobs.append(('histórico', args.history_db, history_job))
+    if args.dashboard:
+        links = [(name, href) for name, href in (('JMeter Report', args.jmeter), ('Locust Report', args.locust))
+                 if href]
+        jobs.append(('dashboard', args.dashboard,
+                     lambda: write_dashboard(model, args.dashboard, history, args.scenario, links)))
+    if args.failure_clusters:
+        jobs.append(('clusters de falhas', args.failure_clusters,
+                     lambda: write_failure_clusters(model, args.failure_clusters, args.distance)))
+    if model.jmeter:
+        if args.graphs:
+            jobs.append(('gráficos JMeter', args.graphs,
+                         lambda: write_graphs(model, args.graphs, args.bucket_seconds, args.max_points)))
+        if args.custom_report:
+            from generate_custom_jmeter_report import _parse_thresholds
+            thresholds = _parse_thresholds(args.apdex_t_label)
+            jobs.append(('relatório customizado', args.custom_report,
+                         lambda: write_custom_report(model, args.custom_report, args.endpoints, args.apdex_t,
+                                                     thresholds)))
+        if args.failures:
+            jobs.append(('falhas JMeter', args.failures, lambda: write_failures(model, args.failures)))
+    elif args.graphs or args.custom_report or args.failures:
+        print('⚠️  Sem JTL do JMeter: gráficos, relatório customizado e falhas do JMeter omitidos.')
+    if args.pdf:
+        jobs.append(('PDF', args.pdf, lambda: write_pdf(model, args.pdf, args.cache_dir, args.max_points)))
+    if not jobs:
+        parser.error('nenhuma saída pedida (use --all DIR ou uma das opções de saída)')
+    for name, path in (('JMeter', args.jmeter), ('k6', args.k6), ('k6 bruto', args.k6_raw)):
+        if path and not os.path.exists(path):
+            print(f'⚠️  {name} não encontrado: {path}')
+
+    start = time.time()
+    failed = 0
+    for name, path, job in jobs:
+        t = time.time()
+        try:
+            job()
+        except Exception as e:
+            failed += 1
+            print(f'❌ {name}: {e}')
+        else:
+            print(f'✅ {name}: {path} ({time.time() - t:.1f}s)')
+    print(f'Concluído em {time.time() - start:.1f}s ({len(jobs) - failed}/{len(jobs)} saídas)')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
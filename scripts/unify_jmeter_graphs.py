@@ -1,81 +1,98 @@
-import sys
+import argparse
 import os
+import sys
 
 # optional heavy deps
 try:
-	import pandas as pd
 	import matplotlib.pyplot as plt
 	HAS_DEPS = True
 except Exception:
 	HAS_DEPS = False
 
-jtl = sys.argv[1]
-out_dir = sys.argv[2]
-
-if not HAS_DEPS:
-	print("ERROR: Missing dependencies for unify_jmeter_graphs.py (pandas, matplotlib). Install with: pip install -r requirements.txt")
-	sys.exit(2)
-
-df = pd.read_csv(jtl)
-# normalize column names to lowercase for robustness
-df.columns = [c.lower() for c in df.columns]
-
-os.makedirs(out_dir, exist_ok=True)
-
-# Response Time
-plt.figure()
-if 'elapsed' in df.columns:
-	df['elapsed'].plot()
-else:
-	# fallback to first numeric column
-	numeric_cols = df.select_dtypes(include=['number']).columns
-	if len(numeric_cols) > 0:
-		df[numeric_cols[0]].plot()
-	else:
-		raise RuntimeError('No numeric column found for response time')
-plt.title("Response Time (ms)")
-plt.ylabel("ms")
-plt.xlabel("samples")
-plt.savefig(f"{out_dir}/response_time.png")
-
-# Throughput
-plt.figure()
-ts_col = 'timestamp' if 'timestamp' in df.columns else ('timestamp' if 'timestamp' in df.columns else None)
-if ts_col is None and 'timeStamp' in df.columns:
-	ts_col = 'timestamp'
-if ts_col and ts_col in df.columns:
-	try:
-		df['timeindex'] = pd.to_datetime(df[ts_col], unit='ms')
-		df.set_index('timeindex', inplace=True)
-	except Exception:
-		# try parsing as standard datetime
-		df['timeindex'] = pd.to_datetime(df[ts_col], errors='coerce')
-		df.set_index('timeindex', inplace=True)
-else:
-	# no timestamp column; create simple index
-	df.index = range(len(df))
-df['throughput'] = 1
-try:
-	df['throughput'].resample("1s").sum().plot()
-except Exception:
-	# fallback: plot rolling sum over 50 samples
-	df['throughput'].rolling(window=min(50, len(df))).sum().plot()
-plt.title("Throughput (req/s)")
-plt.ylabel("req/s")
-plt.savefig(f"{out_dir}/throughput.png")
-
-# Error rate
-plt.figure()
-if 'success' in df.columns:
-	error_rate = (df['success'] == False).rolling(50).mean()
-else:
-	# try to infer errors from response code if present
-	if 'responsecode' in df.columns:
-		error_rate = (df['responsecode'].astype(str).str.startswith('2') == False).rolling(50).mean()
-	else:
-		error_rate = pd.Series([0]*len(df))
-error_rate.plot()
-plt.title("Error Rate (%)")
-plt.savefig(f"{out_dir}/error_rate.png")
-
-print("✅ Gráficos JMeter unificados gerados!")
+from downsample import METHODS, downsample_runs
+
+
+def render_graphs(agg, out_dir, bucket_seconds=1, max_points=1000, method="lttb"):
+	"""Response time, throughput and error-rate PNGs of a JtlAggregate in out_dir."""
+	if not agg.seconds:
+		print("⚠️  JTL sem coluna timeStamp válida; gráficos temporais ficarão vazios.")
+
+	os.makedirs(out_dir, exist_ok=True)
+	# long runs keep coarser buckets (jtl_stream.MAX_TIME_BUCKETS)
+	width = agg.bucket_width(bucket_seconds)
+
+	def plot_line(series, value, label=None, empty=None):
+		"""Plot value(bucket) over wall time, downsampled to the point budget.
+
+		Buckets without samples take `empty`; None leaves a gap in the line
+		(each run between gaps is downsampled on its own).
+		"""
+		xs = [x for x, _ in series]
+		ys = [value(b) if b else empty for _, b in series]
+		xs, ys = downsample_runs(xs, ys, max_points, method)
+		plt.plot(xs, [float("nan") if y is None else y for y in ys], label=label)
+
+	def save(name, title, ylabel):
+		plt.title(title)
+		plt.ylabel(ylabel)
+		plt.xlabel("s")
+		if plt.gca().get_legend_handles_labels()[0]:
+			plt.legend(fontsize="small")
+		plt.savefig(f"{out_dir}/{name}")
+		plt.close()
+
+	total = agg.series(bucket_seconds=width)
+	labels = sorted(agg.label_seconds)
+
+	# Response Time: percentiles of the whole run per bucket
+	plt.figure()
+	for q, name in ((0.5, "p50"), (0.95, "p95"), (0.99, "p99")):
+		plot_line(total, lambda b, q=q: b.hist.quantile(q), name)
+	plot_line(total, lambda b: b.hist.max, "max")
+	save("response_time.png", "Response Time (ms)", "ms")
+
+	# Response Time per label (p95)
+	plt.figure()
+	for label in labels:
+		plot_line(agg.series(label, width), lambda b: b.hist.quantile(0.95), label)
+	save("response_time_by_label.png", "Response Time p95 por label (ms)", "ms")
+
+	# Throughput: empty buckets are real zeros of the wall-clock axis
+	plt.figure()
+	plot_line(total, lambda b: b.count / width, "total", empty=0)
+	for label in labels:
+		plot_line(agg.series(label, width), lambda b: b.count / width, label, empty=0)
+	save("throughput.png", "Throughput (req/s)", "req/s")
+
+	# Error rate: failed share of the requests of each time bucket
+	plt.figure()
+	plot_line(total, lambda b: 100.0 * b.errors / b.count, "total")
+	for label in labels:
+		plot_line(agg.series(label, width), lambda b: 100.0 * b.errors / b.count, label)
+	save("error_rate.png", "Error Rate (%)", "%")
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Gráficos temporais do JMeter (por label)")
+	parser.add_argument("jtl", help="Arquivo .jtl (CSV) do JMeter")
+	parser.add_argument("out_dir", help="Diretório de saída dos PNGs")
+	parser.add_argument("--workers", type=int, default=0, help="Processos de parsing (0 = um por núcleo)")
+	parser.add_argument("--bucket-seconds", type=int, default=1, help="Largura de cada bucket de tempo (s)")
+	parser.add_argument("--max-points", type=int, default=1000, help="Pontos por linha após o downsampling")
+	parser.add_argument("--downsample", choices=sorted(METHODS), default="lttb", help="Método de downsampling")
+	args = parser.parse_args()
+
+	if not HAS_DEPS:
+		print("ERROR: Missing dependencies for unify_jmeter_graphs.py (matplotlib). Install with: pip install -r requirements.txt")
+		sys.exit(2)
+
+	from results_cache import load_jtl_aggregate
+
+	# JTL aggregated into per-second buckets (columnar cache, parallel parse on first use)
+	agg = load_jtl_aggregate(args.jtl, args.workers or None)
+	render_graphs(agg, args.out_dir, args.bucket_seconds, args.max_points, args.downsample)
+	print("✅ Gráficos JMeter unificados gerados!")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Concurrent readiness prober (and ordered startup) for the TeaStore stack.
+
+Replaces the fixed sleeps between `docker compose up` stages and the serial
+curl loops of the workflows. The dependency graph is read from
+docker-compose.yml (`depends_on`); every service gets its own asyncio task
+that waits for its dependencies to be ready, optionally starts the container
+(`--up`: `docker compose up -d --no-deps <service>`), then probes it with
+exponential backoff until all of its checks pass:
+
+  teastore-db           MySQL handshake on 3306 (not just an open port)
+  teastore-registry     REST API answering /rest/services/...
+  persistence, auth,    registered in the registry (/rest/services/<app>/)
+  image, recommender    and answering HTTP; persistence must list categories
+  teastore-webui        /login 200 and /home rendering the categories
+
+Independent services are started and probed at the same time, and the
+command returns as soon as the whole graph is ready (exit 0), or exits 1
+after --timeout naming the services that never became ready.
+
+Internal services publish no port, so they are reached on their container
+IP (`docker inspect`), which the host can route to on Linux (CI runners).
+The WebUI is probed through its published port (--webui-url).
+
+Usage: python3 scripts/wait_stack.py [--up] [--timeout 300] [--webui-url http://localhost:8080]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from urllib.parse import urlsplit
+
+# optional: without PyYAML the built-in graph (same as docker-compose.yml) is used
+try:
+    import yaml
+    HAS_YAML = True
+except Exception:
+    HAS_YAML = False
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPOSE_FILE = os.path.join(ROOT, 'docker-compose.yml')
+SERVICE_PORT = 8080
+
+DEPENDENCIES = {
+    'teastore-db': [],
+    'teastore-registry': ['teastore-db'],
+    'teastore-persistence': ['teastore-db', 'teastore-registry'],
+    'teastore-recommender': ['teastore-registry'],
+    'teastore-auth': ['teastore-registry'],
+    'teastore-image': ['teastore-registry'],
+    'teastore-webui': ['teastore-registry'],
+}
+
+REGISTRY_PATH = '/tools.descartes.teastore.registry/rest/services/{app}/'
+
+
+def _app(name):
+    return 'tools.descartes.teastore.' + name.split('-', 1)[1]
+
+
+def registered(service):
+    """Check that `service` appears in the registry's instance list."""
+    return ('http', 'teastore-registry', REGISTRY_PATH.format(app=_app(service)), (200,), service)
+
+
+# (kind, target service, path, accepted statuses, required substring)
+CHECKS = {
+    'teastore-db': [('mysql', 'teastore-db', 3306)],
+    'teastore-registry': [('http', 'teastore-registry', REGISTRY_PATH.format(app=_app('teastore-webui')),
+                           (200,), None)],
+    'teastore-persistence': [registered('teastore-persistence'),
+                             ('http', 'teastore-persistence',
+                              '/tools.descartes.teastore.persistence/rest/categories?start=-1&max=-1',
+                              (200,), 'categoryId')],
+    'teastore-auth': [registered('teastore-auth'),
+                      ('http', 'teastore-auth', '/tools.descartes.teastore.auth/', range(200, 500), None)],
+    'teastore-image': [registered('teastore-image'),
+                       ('http', 'teastore-image', '/tools.descartes.teastore.image/', range(200, 500), None)],
+    'teastore-recommender': [registered('teastore-recommender'),
+                             ('http', 'teastore-recommender', '/tools.descartes.teastore.recommender/',
+                              range(200, 500), None)],
+    'teastore-webui': [('http', 'webui', '/tools.descartes.teastore.webui/login', (200,), None),
+                       ('http', 'webui', '/tools.descartes.teastore.webui/home', (200,), 'Category')],
+}
+
+
+class NotReady(Exception):
+    pass
+
+
+def load_dependencies(path=COMPOSE_FILE):
+    """{service: [dependencies]} from docker-compose.yml (built-in graph without PyYAML)."""
+    if not HAS_YAML or not os.path.exists(path):
+        return dict(DEPENDENCIES)
+    with open(path) as f:
+        services = (yaml.safe_load(f) or {}).get('services', {})
+    return {name: list(spec.get('depends_on') or []) for name, spec in services.items()}
+
+
+# --- probes ------------------------------------------------------------------
+async def _run(*cmd):
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE,
+                                                stderr=asyncio.subprocess.PIPE)
+    out, err = await proc.communicate()
+    if proc.returncode:
+        raise NotReady(err.decode(errors='replace').strip() or f'{cmd[0]} saiu com {proc.returncode}')
+    return out.decode().strip()
+
+
+class Resolver:
+    """Container IP of each compose service (cached once found)."""
+
+    def __init__(self, webui_url, overrides=None):
+        parts = urlsplit(webui_url)
+        self.hosts = {'webui': (parts.hostname or 'localhost', parts.port or 80)}
+        self.hosts.update(overrides or {})
+
+    async def address(self, service, port=SERVICE_PORT):
+        if service not in self.hosts:
+            container = await _run('docker', 'compose', '-f', COMPOSE_FILE, 'ps', '-q', service)
+            if not container:
+                raise NotReady('container não criado')
+            ip = await _run('docker', 'inspect', '-f',
+                            '{{range .NetworkSettings.Networks}}{{.IPAddress}} {{end}}', container.split()[0])
+            if not ip.split():
+                raise NotReady('container sem IP (ainda iniciando?)')
+            self.hosts[service] = (ip.split()[0], None)
+        host, fixed_port = self.hosts[service]
+        return host, fixed_port or port
+
+
+async def probe_mysql(host, port, timeout):
+    """The server greeting proves mysqld accepts connections (protocol 10)."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        header = await asyncio.wait_for(reader.readexactly(5), timeout)
+    finally:
+        writer.close()
+    if header[4] == 0xff:
+        raise NotReady('MySQL recusou a conexão (ainda inicializando)')
+    if header[4] != 10:
+        raise NotReady(f'handshake inesperado do MySQL ({header[4]})')
+
+
+async def http_get(host, port, path, timeout, max_body=1 << 20):
+    """(status, body) of a plain HTTP/1.1 GET."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n'
+                     'Accept: */*\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise NotReady(f'resposta HTTP inválida: {status_line[:60]!r}')
+        body = b''
+        while len(body) < max_body:
+            chunk = await asyncio.wait_for(reader.read(65536), timeout)
+            if not chunk:
+                break
+            body += chunk
+    finally:
+        writer.close()
+    return status, body.decode('utf-8', 'replace')
+
+
+async def run_check(check, resolver, timeout):
+    kind = check[0]
+    if kind == 'mysql':
+        host, port = await resolver.address(check[1], check[2])
+        await probe_mysql(host, port, timeout)
+        return
+    _, target, path, statuses, needle = check
+    host, port = await resolver.address(target)
+    status, body = await http_get(host, port, path, timeout)
+    if status not in statuses:
+        raise NotReady(f'{path} -> HTTP {status}')
+    if needle and needle not in body:
+        raise NotReady(f'{path} ainda sem "{needle}"')
+
+
+# --- orchestration -----------------------------------------------------------
+class Orchestrator:
+    def __init__(self, graph, resolver, up=False, probe_timeout=3.0, max_backoff=3.0):
+        self.graph = graph
+        self.resolver = resolver
+        self.up = up
+        self.probe_timeout = probe_timeout
+        self.max_backoff = max_backoff
+        self.ready = {name: asyncio.Event() for name in graph}
+        self.last_error = {}
+        self.started = time.monotonic()
+
+    def _log(self, message):
+        print(f'[{time.monotonic() - self.started:6.1f}s] {message}', flush=True)
+
+    async def service(self, name):
+        for dep in self.graph[name]:
+            if dep in self.ready:
+                await self.ready[dep].wait()
+        if self.up:
+            self._log(f'▶️  docker compose up -d {name}')
+            await _run('docker', 'compose', '-f', COMPOSE_FILE, 'up', '-d', '--no-deps', name)
+        delay = 0.2
+        while True:
+            try:
+                for check in CHECKS.get(name, []):
+                    await run_check(check, self.resolver, self.probe_timeout)
+                if name not in CHECKS:
+                    await self.resolver.address(name)
+                break
+            except (NotReady, OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                self.last_error[name] = str(e) or type(e).__name__
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 1.6, self.max_backoff)
+        self.ready[name].set()
+        self._log(f'🟢 {name} pronto')
+
+    async def run(self, timeout):
+        tasks = [asyncio.ensure_future(self.service(name)) for name in self.graph]
+        done, pending = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if task.exception():
+                raise task.exception()
+        return [name for name, event in self.ready.items() if not event.is_set()]
+
+
+def _overrides(values):
+    out = {}
+    for value in values or []:
+        service, _, address = value.partition('=')
+        host, _, port = address.partition(':')
+        out[service] = (host, int(port) if port else None)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aguarda (e opcionalmente sobe) a stack do TeaStore em ordem')
+    parser.add_argument('--up', action='store_true',
+                        help='Sobe cada serviço assim que suas dependências ficam prontas')
+    parser.add_argument('--timeout', type=float, default=300, help='Tempo máximo total (s)')
+    parser.add_argument('--probe-timeout', type=float, default=3, help='Tempo máximo de cada sonda (s)')
+    parser.add_argument('--webui-url', default=f"{os.getenv('HOST', 'http://localhost')}:{os.getenv('PORT', '8080')}",
+                        help='URL publicada da WebUI')
+    parser.add_argument('--host', action='append', metavar='SERVIÇO=HOST[:PORTA]',
+                        help='Endereço fixo de um serviço (em vez do IP do container)')
+    parser.add_argument('--services', nargs='*', help='Só estes serviços (e suas dependências)')
+    args = parser.parse_args()
+
+    graph = load_dependencies()
+    if args.services:
+        wanted = set()
+        stack = list(args.services)
+        while stack:
+            name = stack.pop()
+            if name not in wanted:
+                wanted.add(name)
+                stack.extend(graph.get(name, []))
+        graph = {k: v for k, v in graph.items() if k in wanted}
+
+    orchestrator = Orchestrator(graph, Resolver(args.webui_url, _overrides(args.host)), args.up, args.probe_timeout)
+    try:
+        missing = asyncio.run(orchestrator.run(args.timeout))
+    except NotReady as e:
+        print(f'❌ Falha ao subir a stack: {e}')
+        sys.exit(1)
+    elapsed = time.monotonic() - orchestrator.started
+    if missing:
+        print(f'❌ Stack não ficou pronta em {elapsed:.0f}s:')
+        for name in missing:
+            print(f"   {name}: {orchestrator.last_error.get(name, 'aguardando dependências')}")
+        sys.exit(1)
+    print(f'✅ Stack pronta em {elapsed:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Failure clustering on real TeaStore messages (python -m pytest tests)."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from failure_clusters import DEFAULT_DISTANCE, FailureIndex, normalize, simhash  # noqa: E402
+
+# single-word variants of one failure: must end in the same cluster
+NEAR = [
+    ('Assertion failed: expected text Welcome not found in page',
+     'Assertion failed: expected text Category not found in page'),
+    ('Connection refused: connect to teastore-image:8080 /tools.descartes.teastore.image/rest/image',
+     'Connection refused: connect to teastore-auth:8080 /tools.descartes.teastore.auth/rest/auth'),
+    ('Non HTTP response code: java.net.SocketTimeoutException: Read timed out',
+     'Non HTTP response code: java.net.SocketTimeoutException: Connect timed out'),
+    ('Test failed: text expected to contain /Logout/',
+     'Test failed: text expected to contain /Welcome/'),
+    ('500 Server Error: Internal Server Error for url: http://localhost:8080/tools.descartes.teastore.webui/category',
+     '500 Server Error: Internal Server Error for url: http://localhost:8080/tools.descartes.teastore.webui/product'),
+]
+
+# different failures: must stay apart
+FAR = [
+    ('Assertion failed: expected text Welcome not found in page',
+     'Connection refused: connect to teastore-image:8080 /tools.descartes.teastore.image/rest/image'),
+    ('Non HTTP response code: java.net.SocketTimeoutException: Read timed out',
+     'Non HTTP response code: org.apache.http.NoHttpResponseException: teastore-webui:8080 failed to respond'),
+    ('Test failed: text expected to contain /Logout/',
+     'Assertion failed: expected text Welcome not found in page'),
+    ('Service Unavailable', 'Internal Server Error'),
+]
+
+
+def distance(a, b):
+    return bin(simhash(normalize(a)) ^ simhash(normalize(b))).count('1')
+
+
+def test_near_duplicates_within_distance():
+    for a, b in NEAR:
+        assert distance(a, b) <= DEFAULT_DISTANCE, (a, b)
+
+
+def test_unrelated_messages_beyond_distance():
+    for a, b in FAR:
+        assert distance(a, b) > DEFAULT_DISTANCE, (a, b)
+
+
+def test_clusters_merge_variants_only():
+    index = FailureIndex()
+    for a, b in NEAR + FAR:
+        index.add('jmeter', 'GET Home', '500', a)
+        index.add('jmeter', 'GET Home', '500', b)
+    messages = {m for pair in NEAR + FAR for m in pair}
+    assert len(index.clusters()) == len(messages) - len(NEAR)
+
+
+def test_hostnames_are_not_tokens():
+    assert normalize('connect to teastore-auth:8080') == 'connect to teastore-auth:<n>'
+    assert normalize('connect to teastore-image:8080') == 'connect to teastore-image:<n>'
+    assert normalize('GET /login;jsessionid=A1B2C3D4E5 auth=abc123') == 'GET /login;jsessionid=<token> auth=<token>'